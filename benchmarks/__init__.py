@@ -0,0 +1,16 @@
+# -*- coding: utf-8 -*-
+
+"""
+PDF解密MCP服务性能基准测试
+
+运行方式（在项目根目录）:
+    python -m benchmarks.suite --output results.json
+    python -m benchmarks.bench_batch_scaling
+    python -m benchmarks.bench_startup
+"""
+
+import os
+import sys
+
+# 添加src目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
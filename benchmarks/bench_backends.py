@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+
+"""
+PyPDF2 与 pikepdf 后端对比
+
+对同一批样本分别用每个可用后端执行 check_pdf_encryption、decrypt_pdf（默认的 clone 方式
+与 raw 方式）和 batch_decrypt_pdfs，按后端并列输出耗时。未安装 pikepdf 时只输出 PyPDF2 一列。
+
+    python -m benchmarks.bench_backends --pages 200 1000 --image-kb 32 --files 20
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from . import corpus
+from pdf_decrypt_mcp import PDFDecryptor
+from pdf_decrypt_mcp.backends import pikepdf_available
+
+BACKENDS = ["pypdf2"] + (["pikepdf"] if pikepdf_available() else [])
+
+
+def _timed(func, *args, **kwargs) -> float:
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    elapsed = time.perf_counter() - start
+    assert result["success"], result
+    return elapsed
+
+
+def _operations(workdir: str, path: str, batch_dir: str):
+    yield "check", lambda d: d.check_pdf_encryption(path)
+    yield "decrypt clone", lambda d: d.decrypt_pdf(path, os.path.join(workdir, "out.pdf"))
+    yield "decrypt raw", lambda d: d.decrypt_pdf(path, os.path.join(workdir, "out.pdf"), engine="raw")
+    yield "batch", lambda d: d.batch_decrypt_pdfs(batch_dir, max_workers=1)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, nargs="+", default=[200, 1000], help="单文件样本的页数")
+    parser.add_argument("--image-kb", type=int, default=32, help="每页图像大小（KiB）")
+    parser.add_argument("--files", type=int, default=20, help="批量样本的文件数")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="pdf-bench-")
+    decryptors = {name: PDFDecryptor(backend=name) for name in BACKENDS}
+    try:
+        batch_dir = os.path.join(workdir, "batch")
+        corpus.generate_corpus(batch_dir, args.files, pages=20)
+        for decryptor in decryptors.values():
+            # 预热：首次打开文档时才导入 pikepdf
+            decryptor.check_pdf_encryption(os.path.join(batch_dir, "doc_00000.pdf"))
+
+        print(f"{'pages':>6} {'operation':>14} " + " ".join(f"{name + ' s':>10}" for name in BACKENDS))
+        for pages in args.pages:
+            path = corpus.write_pdf(os.path.join(workdir, f"doc_{pages}.pdf"), pages=pages,
+                                    password="password", image_bytes=args.image_kb * 1024,
+                                    bookmarks_per_page=1)
+            for label, operation in _operations(workdir, path, batch_dir):
+                timings = []
+                for name in BACKENDS:
+                    for entry in os.listdir(batch_dir):
+                        if entry.endswith("_解密版.pdf"):
+                            os.remove(os.path.join(batch_dir, entry))
+                    timings.append(_timed(operation, decryptors[name]))
+                print(f"{pages:>6} {label:>14} " + " ".join(f"{t:>10.3f}" for t in timings))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+
+"""
+batch_decrypt_pdfs 并行扩展性基准
+
+对同一批加密样本分别使用 1, 2, 4, ... 个工作进程解密，输出耗时与加速比。
+
+    python -m benchmarks.bench_batch_scaling --files 200 --pages 50
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from . import corpus
+from pdf_decrypt_mcp import PDFDecryptor
+
+
+def _worker_counts(max_workers: int):
+    count = 1
+    while count < max_workers:
+        yield count
+        count *= 2
+    yield max_workers
+
+
+def _clean_outputs(directory: str) -> None:
+    for name in os.listdir(directory):
+        if name.endswith('_解密版.pdf'):
+            os.remove(os.path.join(directory, name))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--files", type=int, default=200, help="样本文件数")
+    parser.add_argument("--pages", type=int, default=50, help="每个文件的页数")
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1, help="最大工作进程数")
+    args = parser.parse_args()
+    
+    workdir = tempfile.mkdtemp(prefix="pdf-bench-")
+    try:
+        corpus.generate_corpus(workdir, args.files, pages=args.pages)
+        decryptor = PDFDecryptor(backend="pypdf2")
+        baseline = None
+        
+        print(f"{'workers':>8} {'seconds':>10} {'files/s':>10} {'speedup':>8}")
+        for workers in _worker_counts(args.max_workers):
+            _clean_outputs(workdir)
+            start = time.perf_counter()
+            result = decryptor.batch_decrypt_pdfs(workdir, max_workers=workers)
+            elapsed = time.perf_counter() - start
+            
+            assert result["decrypted_files"] == args.files, result
+            baseline = baseline or elapsed
+            print(f"{workers:>8} {elapsed:>10.2f} {args.files / elapsed:>10.1f} {baseline / elapsed:>7.2f}x")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+
+"""
+decrypt_pdf 写出方式对比：整文档克隆与逐页复制
+
+生成带大量书签（每页一章、每章若干节）和命名目标的加密样本，
+分别用 clone 与 pages 方式解密，输出耗时以及输出文件中保留下来的书签数和命名目标数。
+pages 方式丢弃书签，要处理的对象少得多；每页书签数为0的样本用于在对象数相同时比较两者。
+
+    python -m benchmarks.bench_clone --pages 500 2000 --bookmarks-per-page 0 4
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from PyPDF2 import PdfReader
+
+from . import corpus
+from pdf_decrypt_mcp import PDFDecryptor
+
+ENGINES = ("clone", "pages")
+
+
+def _count_outline(outline) -> int:
+    return sum(_count_outline(item) if isinstance(item, list) else 1 for item in outline)
+
+
+def _run(decryptor: PDFDecryptor, workdir: str, pages: int, per_page: int) -> None:
+    path = corpus.write_pdf(os.path.join(workdir, f"book_{pages}_{per_page}.pdf"), pages=pages,
+                            password="password", bookmarks_per_page=per_page)
+    for engine in ENGINES:
+        output_path = os.path.join(workdir, f"book_{pages}_{per_page}.{engine}.pdf")
+        start = time.perf_counter()
+        result = decryptor.decrypt_pdf(path, output_path, engine=engine)
+        elapsed = time.perf_counter() - start
+        assert result["success"], result
+
+        reader = PdfReader(output_path)
+        kept = _count_outline(reader.outline)
+        dests = len(reader.named_destinations)
+        print(f"{pages:>6} {pages * per_page:>10} {engine:>7} "
+              f"{elapsed:>8.2f} {kept:>7} {dests:>6}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, nargs="+", default=[500, 2000], help="各样本的页数")
+    parser.add_argument("--bookmarks-per-page", type=int, nargs="+", default=[0, 4], help="每页的书签数")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="pdf-bench-")
+    decryptor = PDFDecryptor(backend="pypdf2")
+    try:
+        print(f"{'pages':>6} {'bookmarks':>10} {'engine':>7} {'seconds':>8} {'kept':>7} {'dests':>6}")
+        for pages in args.pages:
+            for per_page in args.bookmarks_per_page:
+                _run(decryptor, workdir, pages, per_page)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+
+"""
+decrypt_pdf 峰值内存基准
+
+生成不同页数的加密“扫描件”（每页一幅图像），每个文件、每种写出方式在独立子进程中解密，
+输出子进程的峰值RSS。pages 方式的峰值随页数线性增长，stream 方式应基本保持不变。
+峰值RSS 读取 /proc/self/status 或 resource 模块；两者都没有的平台（如Windows）跳过本基准。
+
+    python -m benchmarks.bench_memory --pages 100 500 1000 3000 --image-kb 64
+"""
+
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Optional
+
+from . import corpus
+
+ENGINES = ("pages", "stream")
+
+
+def _peak_rss_kib() -> Optional[int]:
+    """当前进程的峰值RSS（KiB），无法测量时返回None
+
+    Linux 上优先读取 /proc/self/status 的 VmHWM：exec 之后的 ru_maxrss 会继承父进程的峰值。
+    resource 只在类Unix平台上存在，用到时才导入。
+    """
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def _child(input_path: str, engine: str) -> None:
+    """子进程：解密一个文件并输出峰值RSS（KiB）与耗时"""
+    from pdf_decrypt_mcp import PDFDecryptor
+
+    start = time.perf_counter()
+    result = PDFDecryptor(backend="pypdf2").decrypt_pdf(input_path, f"{input_path}.{engine}.out", engine=engine)
+    elapsed = time.perf_counter() - start
+    assert result["success"], result
+    print(_peak_rss_kib(), elapsed)
+
+
+def _measure(input_path: str, engine: str):
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_memory", "--child", input_path, engine],
+        cwd=root, check=True, capture_output=True, text=True,
+    ).stdout.split()
+    return int(output[0]) / 1024, float(output[1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, nargs="+", default=[100, 500, 1000], help="各样本的页数")
+    parser.add_argument("--image-kb", type=int, default=64, help="每页图像大小（KiB）")
+    parser.add_argument("--child", nargs=2, metavar=("PATH", "ENGINE"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        _child(*args.child)
+        return
+    if _peak_rss_kib() is None:
+        print("跳过：当前平台既没有 /proc/self/status 也没有 resource 模块，无法测量峰值RSS")
+        return
+
+    workdir = tempfile.mkdtemp(prefix="pdf-bench-")
+    try:
+        print(f"{'pages':>6} {'file MiB':>9} " + " ".join(f"{e + ' MiB':>12} {e + ' s':>9}" for e in ENGINES))
+        for pages in args.pages:
+            path = corpus.write_pdf(os.path.join(workdir, f"scan_{pages}.pdf"), pages=pages,
+                                    password="password", image_bytes=args.image_kb * 1024)
+            size = os.path.getsize(path) / (1024 * 1024)
+            columns = []
+            for engine in ENGINES:
+                rss, elapsed = _measure(path, engine)
+                columns.append(f"{rss:>12.1f} {elapsed:>9.2f}")
+            print(f"{pages:>6} {size:>9.1f} " + " ".join(columns))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+
+"""
+decrypt_pdf 各写出方式的CPU时间与输出大小
+
+对图像密集的加密样本分别用每种写出方式解密，输出CPU时间和输出/输入大小比。
+安装了 pikepdf 时额外生成使用对象流的 AES-256 样本：raw 方式原样保留对象流，
+其余方式需要解压并展开对象流。
+
+    python -m benchmarks.bench_raw --pages 300 1000 --image-kb 64
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from . import corpus
+from pdf_decrypt_mcp import PDFDecryptor
+from pdf_decrypt_mcp.pdf_decryptor import ENGINES
+
+
+def _samples(workdir: str, pages: int, image_kb: int):
+    plain = corpus.write_pdf(os.path.join(workdir, f"scan_{pages}.pdf"), pages=pages,
+                             image_bytes=image_kb * 1024, bookmarks_per_page=1)
+    rc4 = corpus.write_pdf(os.path.join(workdir, f"scan_{pages}_rc4.pdf"), pages=pages,
+                           password="password", image_bytes=image_kb * 1024, bookmarks_per_page=1)
+    yield "rc4", rc4
+    objstm = corpus.resave_with_object_streams(plain, os.path.join(workdir, f"scan_{pages}_objstm.pdf"))
+    if objstm is not None:
+        yield "aes256+objstm", objstm
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, nargs="+", default=[300, 1000], help="各样本的页数")
+    parser.add_argument("--image-kb", type=int, default=64, help="每页图像大小（KiB）")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="pdf-bench-")
+    decryptor = PDFDecryptor(backend="pypdf2")
+    try:
+        print(f"{'pages':>6} {'sample':>14} {'engine':>7} {'cpu s':>8} {'size ratio':>11}")
+        for pages in args.pages:
+            for label, path in _samples(workdir, pages, args.image_kb):
+                input_size = os.path.getsize(path)
+                for engine in ENGINES:
+                    output_path = f"{path}.{engine}.out"
+                    start = time.process_time()
+                    result = decryptor.decrypt_pdf(path, output_path, engine=engine)
+                    elapsed = time.process_time() - start
+                    assert result["success"], result
+                    ratio = os.path.getsize(output_path) / input_size
+                    print(f"{pages:>6} {label:>14} {engine:>7} {elapsed:>8.2f} {ratio:>11.3f}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
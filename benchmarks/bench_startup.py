@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+
+"""
+服务器冷启动基准
+
+uvx 按需启动服务器，每个会话都要等待启动完成。本基准测量：
+
+- 导入开销：用 -X importtime 分别导入 mcp 服务器运行时（下限）和 pdf_decrypt_mcp.server，
+  只在后者中出现的模块的自身耗时之和即本项目增加的导入时间
+- 握手后加载的模块：在内存会话中完成 initialize 与 list_tools 后，PDF与加密库不应已加载
+- 端到端：启动真实的stdio服务器，从启动进程到收到 tools/list 响应的时间
+
+导入开销超过 --budget-ms，或握手时已加载 PDF/加密库时以非零状态退出。
+
+    python -m benchmarks.bench_startup --repeat 5 --budget-ms 60
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List, Tuple
+
+# 服务器运行时本身需要的模块，作为导入时间的下限
+FLOOR_STATEMENT = "import mcp.server.lowlevel, mcp.server.models, mcp.server.stdio, mcp.types"
+
+# 第一次工具调用之前不应加载的库
+DEFERRED_MODULES = ("PyPDF2", "Crypto", "pikepdf", "pdf_decrypt_mcp.pdf_decryptor", "pdf_decrypt_mcp.backends")
+
+# 在内存会话中完成握手，输出已加载的延迟模块
+HANDSHAKE_SCRIPT = """
+import asyncio, json, sys
+from mcp.shared.memory import create_connected_server_and_client_session
+from pdf_decrypt_mcp import server
+
+async def handshake():
+    async with create_connected_server_and_client_session(server.server) as session:
+        tools = await session.list_tools()
+    return [tool.name for tool in tools.tools]
+
+tools = asyncio.run(handshake())
+print(json.dumps({
+    "tools": tools,
+    "loaded": [name for name in %r if name in sys.modules],
+}))
+"""
+
+
+def _env() -> Dict[str, str]:
+    src = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [src, env.get("PYTHONPATH")]))
+    return env
+
+
+def import_times(statement: str) -> Dict[str, Tuple[int, int]]:
+    """在新进程中执行导入语句，返回 模块 → (自身耗时, 累计耗时)，单位微秒"""
+    completed = subprocess.run([sys.executable, "-X", "importtime", "-c", statement],
+                               env=_env(), check=True, capture_output=True, text=True)
+    times = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        if self_us.strip().isdigit():
+            times[name.strip()] = (int(self_us), int(cumulative_us))
+    return times
+
+
+def import_overhead(repeat: int = 1) -> Tuple[float, List[Tuple[str, int]]]:
+    """本项目在mcp运行时之外增加的导入时间（毫秒，取中位数）以及最近一次的最慢模块"""
+    overheads = []
+    added: List[Tuple[str, int]] = []
+    for _ in range(repeat):
+        floor = import_times(FLOOR_STATEMENT)
+        ours = import_times("import pdf_decrypt_mcp.server")
+        added = sorted(((name, times[0]) for name, times in ours.items() if name not in floor),
+                       key=lambda item: -item[1])
+        overheads.append(sum(self_us for _, self_us in added) / 1000)
+    return statistics.median(overheads), added
+
+
+def modules_after_handshake() -> Dict[str, List[str]]:
+    completed = subprocess.run([sys.executable, "-c", HANDSHAKE_SCRIPT % (DEFERRED_MODULES,)],
+                               env=_env(), check=True, capture_output=True, text=True)
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def _send(process: subprocess.Popen, message: Dict) -> None:
+    process.stdin.write(json.dumps(message) + "\n")
+    process.stdin.flush()
+
+
+def _receive(process: subprocess.Popen, request_id: int) -> Dict:
+    while True:
+        line = process.stdout.readline()
+        if not line:
+            raise RuntimeError("服务器在响应前退出")
+        message = json.loads(line)
+        if message.get("id") == request_id:
+            return message
+
+
+def stdio_handshake_ms() -> float:
+    """启动stdio服务器，返回从启动到收到 tools/list 响应的毫秒数"""
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-c", "from pdf_decrypt_mcp import main; main()"],
+        env=_env(), stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+        text=True, encoding="utf-8",
+    )
+    try:
+        _send(process, {"jsonrpc": "2.0", "id": 1, "method": "initialize", "params": {
+            "protocolVersion": "2024-11-05",
+            "capabilities": {},
+            "clientInfo": {"name": "bench-startup", "version": "0"},
+        }})
+        _receive(process, 1)
+        _send(process, {"jsonrpc": "2.0", "method": "notifications/initialized"})
+        _send(process, {"jsonrpc": "2.0", "id": 2, "method": "tools/list"})
+        _receive(process, 2)
+        return (time.perf_counter() - start) * 1000
+    finally:
+        process.stdin.close()
+        try:
+            process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5, help="重复次数，取中位数")
+    parser.add_argument("--budget-ms", type=float, default=60.0, help="本项目导入开销的上限（毫秒）")
+    parser.add_argument("--top", type=int, default=10, help="列出最慢的新增模块数")
+    args = parser.parse_args()
+
+    overhead, added = import_overhead(args.repeat)
+    print(f"导入开销（mcp运行时之外）: {overhead:.1f} ms，预算 {args.budget_ms:.1f} ms")
+    for name, self_us in added[:args.top]:
+        print(f"  {name:<48} {self_us / 1000:>8.2f} ms")
+
+    handshake = modules_after_handshake()
+    print(f"握手后已加载的延迟模块: {', '.join(handshake['loaded']) or '无'}（{len(handshake['tools'])} 个工具）")
+
+    runs = [stdio_handshake_ms() for _ in range(args.repeat)]
+    print(f"stdio 启动到 tools/list 响应: 中位数 {statistics.median(runs):.1f} ms，最小 {min(runs):.1f} ms")
+
+    if overhead > args.budget_ms or handshake["loaded"]:
+        print("超出启动预算", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
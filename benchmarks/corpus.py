@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+
+"""
+基准测试用的加密PDF样本生成
+
+样本内容由 seed 决定，同样的参数在任何机器上生成同样的页面、图像和书签，
+基准结果可以在不同提交之间比较。
+
+加密方式（SCHEMES）：
+- none: 不加密
+- rc4-40 / rc4-128: RC4（PyPDF2 生成）
+- owner-only: 用户密码为空、只设置所有者密码的RC4-128（PyPDF2 生成）
+- aes-128 / aes-256-r5 / aes-256-r6: AES（需要 pikepdf，PyPDF2 3.x 无法写出AES加密）
+"""
+
+import os
+import random
+import tempfile
+import warnings
+from typing import List, Optional
+
+from PyPDF2 import PageObject, PdfWriter
+from PyPDF2.generic import DecodedStreamObject, DictionaryObject, NameObject, NumberObject
+
+# 加密方式 → (生成工具, 参数)
+SCHEMES = {
+    "none": (None, None),
+    "rc4-40": ("pypdf2", {"use_128bit": False}),
+    "rc4-128": ("pypdf2", {"use_128bit": True}),
+    "owner-only": ("pypdf2", {"use_128bit": True, "owner_only": True}),
+    "aes-128": ("pikepdf", {"R": 4, "aes": True}),
+    "aes-256-r5": ("pikepdf", {"R": 5}),
+    "aes-256-r6": ("pikepdf", {"R": 6}),
+}
+
+
+def pikepdf_available() -> bool:
+    try:
+        import pikepdf  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def scheme_available(scheme: str) -> bool:
+    """当前环境能否生成该加密方式的样本"""
+    tool, _ = SCHEMES[scheme]
+    return tool != "pikepdf" or pikepdf_available()
+
+
+def _random_bytes(rng: random.Random, size: int) -> bytes:
+    return rng.getrandbits(8 * size).to_bytes(size, "little") if size else b""
+
+
+def _add_scanned_image(writer: PdfWriter, page, image_bytes: int, rng: random.Random) -> None:
+    """给页面加一幅随机内容的灰度图像（模拟扫描件），图像数据约 image_bytes 字节"""
+    side = max(1, int(image_bytes ** 0.5))
+    image = DecodedStreamObject()
+    image.set_data(_random_bytes(rng, side * side))
+    image.update({
+        NameObject("/Type"): NameObject("/XObject"),
+        NameObject("/Subtype"): NameObject("/Image"),
+        NameObject("/Width"): NumberObject(side),
+        NameObject("/Height"): NumberObject(side),
+        NameObject("/ColorSpace"): NameObject("/DeviceGray"),
+        NameObject("/BitsPerComponent"): NumberObject(8),
+    })
+    content = DecodedStreamObject()
+    content.set_data(b"q 595 0 0 842 0 0 cm /Im0 Do Q")
+    page[NameObject("/Resources")] = DictionaryObject({
+        NameObject("/XObject"): DictionaryObject({
+            NameObject("/Im0"): writer._add_object(image.flate_encode())
+        })
+    })
+    page[NameObject("/Contents")] = writer._add_object(content.flate_encode())
+
+
+def _add_bookmarks(writer: PdfWriter, pages: int, per_page: int) -> None:
+    """每页一个章书签，其下 per_page-1 个节书签，并给每章加一个命名目标"""
+    for index in range(pages):
+        chapter = writer.add_outline_item(f"第{index + 1}章", index)
+        for section in range(per_page - 1):
+            writer.add_outline_item(f"{index + 1}.{section + 1} 节", index, parent=chapter)
+        writer.add_named_destination(f"chapter-{index + 1}", index)
+
+
+def _encrypt_with_pikepdf(path: str, password: str, options: dict, object_streams: bool) -> None:
+    import pikepdf
+
+    tmp_path = f"{path}.tmp"
+    with pikepdf.open(path) as pdf, warnings.catch_warnings():
+        # qpdf 提示 R5 已弃用，但仍需要这种样本
+        warnings.simplefilter("ignore", UserWarning)
+        mode = pikepdf.ObjectStreamMode.generate if object_streams else pikepdf.ObjectStreamMode.preserve
+        pdf.save(tmp_path, encryption=pikepdf.Encryption(owner=password, user=password, **options),
+                 object_stream_mode=mode)
+    os.replace(tmp_path, path)
+
+
+def write_pdf(path: str, pages: int = 1, password: Optional[str] = None,
+              image_bytes: int = 0, bookmarks_per_page: int = 0, scheme: str = "rc4-128",
+              image_density: float = 1.0, seed: int = 0, object_streams: bool = False) -> str:
+    """
+    生成一个PDF文件
+
+    Args:
+        path: 输出路径
+        pages: 页数
+        password: 密码，为None时不加密；owner-only 方式下作为所有者密码
+        image_bytes: 每幅图像的数据大小（字节），0表示不带图像
+        bookmarks_per_page: 每页书签数，大于0时同时生成命名目标和文档标题
+        scheme: 加密方式，见 SCHEMES
+        image_density: 带图像的页面比例（0~1）
+        seed: 随机种子，决定图像内容和带图像的页面
+        object_streams: 是否使用对象流（仅 pikepdf 生成的AES样本）
+    """
+    if scheme not in SCHEMES:
+        raise ValueError(f"未知的加密方式: {scheme}")
+    tool, options = SCHEMES[scheme]
+    if password is None:
+        tool = None
+
+    rng = random.Random(seed)
+    writer = PdfWriter()
+    for _ in range(pages):
+        page = PageObject.create_blank_page(width=595, height=842)
+        if image_bytes and rng.random() < image_density:
+            _add_scanned_image(writer, page, image_bytes, rng)
+        writer.add_page(page)
+    if bookmarks_per_page:
+        _add_bookmarks(writer, pages, bookmarks_per_page)
+        writer.add_metadata({"/Title": f"{pages}页样本"})
+    if tool == "pypdf2":
+        if options.get("owner_only"):
+            writer.encrypt("", owner_password=password, use_128bit=options["use_128bit"])
+        else:
+            writer.encrypt(password, use_128bit=options["use_128bit"])
+    with open(path, 'wb') as f:
+        writer.write(f)
+
+    if tool == "pikepdf":
+        _encrypt_with_pikepdf(path, password, options, object_streams)
+    return path
+
+
+def generate_corpus(directory: str, count: int, pages: int = 20,
+                    password: Optional[str] = "password", scheme: str = "rc4-128",
+                    **kwargs) -> List[str]:
+    """在directory中生成count个PDF文件（默认RC4-128加密），其余参数见 write_pdf"""
+    os.makedirs(directory, exist_ok=True)
+    return [
+        write_pdf(os.path.join(directory, f"doc_{i:05d}.pdf"), pages=pages, password=password,
+                  scheme=scheme, seed=i, **kwargs)
+        for i in range(count)
+    ]
+
+
+def resave_with_object_streams(path: str, output_path: str, password: str = "password") -> Optional[str]:
+    """
+    用 pikepdf 把PDF另存为 AES-256 加密、使用对象流和交叉引用流的文件
+
+    PyPDF2 只能写出传统交叉引用表和RC4加密；未安装 pikepdf 时返回None。
+    """
+    if not pikepdf_available():
+        return None
+    fd, tmp_path = tempfile.mkstemp(suffix=".pdf", dir=os.path.dirname(output_path) or None)
+    os.close(fd)
+    with open(path, 'rb') as src, open(tmp_path, 'wb') as dst:
+        dst.write(src.read())
+    _encrypt_with_pikepdf(tmp_path, password, SCHEMES["aes-256-r6"][1], object_streams=True)
+    os.replace(tmp_path, output_path)
+    return output_path
@@ -0,0 +1,241 @@
+# -*- coding: utf-8 -*-
+
+"""
+可复现的基准测试套件
+
+按给定的页数、图像大小、图像密度和加密方式生成确定性的样本集，对每个后端计时：
+
+- check_pdf_encryption（完整解析与 fast 快速探测）
+- decrypt_pdf
+- batch_decrypt_pdfs
+- 服务器工具路径（handle_call_tool 调用 decrypt_pdf 与 batch_decrypt_pdfs，含JSON序列化）
+
+每项重复 --repeat 次，记录每次耗时、最小值与中位数，结果写成JSON。
+用 --compare 指定另一次运行的结果文件，可按相同的键比较中位数，超过阈值的变慢视为回归。
+
+    python -m benchmarks.suite --output results.json
+    python -m benchmarks.suite --output new.json --compare results.json --threshold 0.2
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from . import corpus
+from pdf_decrypt_mcp import PDFDecryptor
+from pdf_decrypt_mcp.backends import pikepdf_available
+
+PASSWORD = "password"
+
+# 批量样本每个文件的页数
+BATCH_PAGES = 10
+
+
+def _git_commit() -> Optional[str]:
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=root, check=True,
+                              capture_output=True, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _versions() -> Dict[str, Optional[str]]:
+    import PyPDF2
+
+    versions = {"python": platform.python_version(), "PyPDF2": PyPDF2.__version__, "pikepdf": None}
+    if pikepdf_available():
+        import pikepdf
+        versions["pikepdf"] = pikepdf.__version__
+    return versions
+
+
+def _sample_path(corpus_dir: str, scheme: str, pages: int, args: argparse.Namespace) -> str:
+    name = (f"{scheme}_{pages}p_{args.image_kb}k_{args.image_density:g}"
+            f"_b{args.bookmarks_per_page}{'_objstm' if args.object_streams else ''}.pdf")
+    path = os.path.join(corpus_dir, name)
+    if not os.path.exists(path):
+        corpus.write_pdf(path, pages=pages, password=PASSWORD, scheme=scheme,
+                         image_bytes=args.image_kb * 1024, image_density=args.image_density,
+                         bookmarks_per_page=args.bookmarks_per_page, seed=pages,
+                         object_streams=args.object_streams)
+    return path
+
+
+def _batch_dir(corpus_dir: str, scheme: str, args: argparse.Namespace) -> str:
+    directory = os.path.join(corpus_dir, f"batch_{scheme}_{args.batch_files}_{args.image_kb}k_"
+                                         f"{args.image_density:g}{'_objstm' if args.object_streams else ''}")
+    if not os.path.isdir(directory):
+        corpus.generate_corpus(directory, args.batch_files, pages=BATCH_PAGES, scheme=scheme,
+                               password=PASSWORD, image_bytes=args.image_kb * 1024,
+                               image_density=args.image_density, object_streams=args.object_streams)
+    return directory
+
+
+def _clean_batch_outputs(directory: str) -> None:
+    for name in os.listdir(directory):
+        if name.endswith("_解密版.pdf"):
+            os.remove(os.path.join(directory, name))
+
+
+def _call_tool(name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+    from pdf_decrypt_mcp import server
+
+    result = asyncio.run(server.handle_call_tool(name, arguments))
+    return json.loads(result.content[0].text)
+
+
+def _operations(decryptor: PDFDecryptor, sample: str, batch_dir: str,
+                output_dir: str) -> Iterator[Tuple[str, Callable[[], Dict[str, Any]]]]:
+    output_path = os.path.join(output_dir, "out.pdf")
+
+    def batch() -> Dict[str, Any]:
+        _clean_batch_outputs(batch_dir)
+        return decryptor.batch_decrypt_pdfs(batch_dir, max_workers=1)
+
+    def tool_batch() -> Dict[str, Any]:
+        _clean_batch_outputs(batch_dir)
+        return _call_tool("batch_decrypt_pdfs", {"directory": batch_dir, "max_workers": 1})
+
+    yield "check_pdf_encryption", lambda: decryptor.check_pdf_encryption(sample)
+    yield "check_pdf_encryption_fast", lambda: decryptor.check_pdf_encryption(sample, fast=True)
+    yield "decrypt_pdf", lambda: decryptor.decrypt_pdf(sample, output_path)
+    yield "tool:decrypt_pdf", lambda: _call_tool("decrypt_pdf", {"input_path": sample, "output_path": output_path})
+    yield "batch_decrypt_pdfs", batch
+    yield "tool:batch_decrypt_pdfs", tool_batch
+
+
+def _time(operation: Callable[[], Dict[str, Any]], repeat: int) -> List[float]:
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = operation()
+        runs.append(time.perf_counter() - start)
+        if not result.get("success"):
+            raise RuntimeError(f"基准操作失败: {result.get('error')}")
+    return runs
+
+
+def run_suite(args: argparse.Namespace, corpus_dir: str, output_dir: str) -> List[Dict[str, Any]]:
+    from pdf_decrypt_mcp import server
+
+    records = []
+    for backend in args.backends:
+        decryptor = PDFDecryptor(backend=backend)
+        # 工具路径使用同一个后端
+        server.pdf_decryptor = decryptor
+        for scheme in args.schemes:
+            batch_dir = _batch_dir(corpus_dir, scheme, args)
+            for pages in args.pages:
+                sample = _sample_path(corpus_dir, scheme, pages, args)
+                for operation, func in _operations(decryptor, sample, batch_dir, output_dir):
+                    # 批量操作与页数无关，只在第一个页数下计时
+                    if "batch" in operation and pages != args.pages[0]:
+                        continue
+                    func()  # 预热
+                    runs = _time(func, args.repeat)
+                    size = BATCH_PAGES if "batch" in operation else pages
+                    files = args.batch_files if "batch" in operation else 1
+                    record = {
+                        "key": f"{operation}/{scheme}/{files}x{size}p/{backend}",
+                        "operation": operation,
+                        "scheme": scheme,
+                        "pages": size,
+                        "files": files,
+                        "backend": backend,
+                        "runs": runs,
+                        "min": min(runs),
+                        "median": statistics.median(runs),
+                    }
+                    records.append(record)
+                    print(f"{record['key']:<56} {record['median'] * 1000:>10.2f} ms", flush=True)
+    return records
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> bool:
+    """按键比较中位数，输出比值；有回归时返回False"""
+    previous = {record["key"]: record for record in baseline["results"]}
+    ok = True
+    print(f"\n{'key':<56} {'baseline ms':>12} {'current ms':>11} {'ratio':>7}")
+    for record in results["results"]:
+        before = previous.get(record["key"])
+        if before is None:
+            continue
+        ratio = record["median"] / before["median"] if before["median"] else float("inf")
+        regression = ratio > 1 + threshold
+        ok = ok and not regression
+        print(f"{record['key']:<56} {before['median'] * 1000:>12.2f} {record['median'] * 1000:>11.2f} "
+              f"{ratio:>6.2f}x{' !' if regression else ''}")
+    return ok
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    available = [scheme for scheme in corpus.SCHEMES if scheme != "none" and corpus.scheme_available(scheme)]
+    parser.add_argument("--schemes", nargs="+", default=available, choices=list(corpus.SCHEMES),
+                        help="加密方式（默认为当前环境可生成的全部加密方式）")
+    parser.add_argument("--pages", type=int, nargs="+", default=[10, 200], help="单文件样本的页数")
+    parser.add_argument("--image-kb", type=int, default=32, help="每幅图像的大小（KiB）")
+    parser.add_argument("--image-density", type=float, default=0.5, help="带图像的页面比例")
+    parser.add_argument("--bookmarks-per-page", type=int, default=1, help="每页书签数")
+    parser.add_argument("--object-streams", action="store_true", help="AES样本使用对象流")
+    parser.add_argument("--batch-files", type=int, default=20, help="批量样本的文件数")
+    parser.add_argument("--repeat", type=int, default=3, help="每项重复次数")
+    parser.add_argument("--backends", nargs="+", default=["pypdf2"] + (["pikepdf"] if pikepdf_available() else []),
+                        choices=["pypdf2", "pikepdf"], help="要测试的后端")
+    parser.add_argument("--corpus-dir", help="样本目录（保留并在下次运行时复用，默认使用临时目录）")
+    parser.add_argument("--output", help="结果JSON文件路径（默认输出到标准输出）")
+    parser.add_argument("--compare", help="与之比较的基线结果JSON文件")
+    parser.add_argument("--threshold", type=float, default=0.2, help="中位数变慢超过该比例视为回归")
+    args = parser.parse_args()
+
+    for scheme in args.schemes:
+        if not corpus.scheme_available(scheme):
+            parser.error(f"加密方式 {scheme} 需要安装 pikepdf")
+
+    corpus_dir = args.corpus_dir or tempfile.mkdtemp(prefix="pdf-bench-corpus-")
+    os.makedirs(corpus_dir, exist_ok=True)
+    output_dir = tempfile.mkdtemp(prefix="pdf-bench-out-")
+    try:
+        records = run_suite(args, corpus_dir, output_dir)
+    finally:
+        shutil.rmtree(output_dir, ignore_errors=True)
+        if not args.corpus_dir:
+            shutil.rmtree(corpus_dir, ignore_errors=True)
+
+    results = {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": time.time(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "versions": _versions(),
+            "parameters": {key: value for key, value in vars(args).items()
+                           if key not in ("output", "compare", "corpus_dir")},
+        },
+        "results": records,
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    else:
+        json.dump(results, sys.stdout, ensure_ascii=False, indent=2)
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        if not compare(results, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -23,7 +23,7 @@ setup(
     ],
     entry_points={
         "console_scripts": [
-            "pdf-decrypt-mcp=pdf_decrypt_mcp.server:main",
+            "pdf-decrypt-mcp=pdf_decrypt_mcp:main",
         ],
     },
     python_requires=">=3.8",
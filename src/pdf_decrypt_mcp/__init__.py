@@ -9,18 +9,25 @@ PDF解密MCP服务
 - 单个PDF文件解密
 - 批量PDF文件解密
 - 列出PDF文件
+- 监视目录，自动解密新出现的PDF文件
 """
 
 __version__ = "1.0.0"
 __author__ = "PDF Decrypt Service"
 __email__ = "decrypt@example.com"
 
-from .pdf_decryptor import PDFDecryptor
+# PDFDecryptor 与服务器都延迟导入：启动服务器时 PyPDF2 在第一次工具调用前不加载
+def __getattr__(name):
+    if name == "PDFDecryptor":
+        from .pdf_decryptor import PDFDecryptor
+        return PDFDecryptor
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
-# 延迟导入server以避免导入问题
 def main():
-    """主函数入口点"""
-    from .server_fixed import main as server_main
-    return server_main()
+    """主函数入口点：默认运行stdio MCP服务器，watch 子命令监视目录，见 cli 模块"""
+    from .cli import main as cli_main
+    cli_main()
+
 
-__all__ = ["PDFDecryptor", "main"]
\ No newline at end of file
+__all__ = ["PDFDecryptor", "main"]
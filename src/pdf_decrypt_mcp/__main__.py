@@ -0,0 +1,7 @@
+# -*- coding: utf-8 -*-
+
+"""python -m pdf_decrypt_mcp 与 pdf-decrypt-mcp 命令相同"""
+
+from .cli import main
+
+main()
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+按文件大小的准入控制
+
+解析并重写一个PDF时，读取器与写出器会同时持有文件内容、解压后的流和每个对象的Python对象，
+几个GB级的文件同时解密就可能耗尽内存。解密前先按文件大小和对象数估算内存开销，
+在全局内存预算内准入，超出预算的请求排队等待，小文件仍然可以并行处理。
+
+排队按先来先服务：一个大文件在等待时，后到的小文件不会插队，大文件不会被饿死。
+估算超过整个预算的文件在没有其他任务运行时单独执行。
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+from .probe import read_object_count
+
+logger = logging.getLogger(__name__)
+
+# 全局内存预算（字节），设置为0禁用准入控制；默认物理内存的一半
+MEMORY_BUDGET_ENV = "PDF_DECRYPT_MEMORY_BUDGET"
+# 无法读取物理内存大小时的默认预算
+FALLBACK_MEMORY_BUDGET = 2 * 1024 * 1024 * 1024
+
+# 估算参数：文件内容在读取器和写出器中约各有一份，外加解压后的流
+SIZE_FACTOR = 3
+# 每个已解析对象的Python对象开销
+OBJECT_COST = 2 * 1024
+# 读不到对象数时按平均对象大小推算
+AVERAGE_OBJECT_SIZE = 4 * 1024
+# 与文件无关的固定开销
+BASE_COST = 4 * 1024 * 1024
+
+
+def estimate_cost(path: Optional[str], size: Optional[int] = None) -> int:
+    """
+    估算解密一个文件所需的内存（字节）
+
+    Args:
+        path: PDF文件路径；为None时（内存中的文档）只按size估算
+        size: 文件大小（可选，未提供时stat；文件不存在时只计固定开销）
+    """
+    if size is None:
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return BASE_COST
+    objects = read_object_count(path) if path is not None else None
+    if objects is None:
+        objects = size // AVERAGE_OBJECT_SIZE
+    return BASE_COST + size * SIZE_FACTOR + objects * OBJECT_COST
+
+
+def default_budget() -> int:
+    try:
+        return os.sysconf("SC_PHYS_PAGES") * os.sysconf("SC_PAGE_SIZE") // 2
+    except (AttributeError, ValueError, OSError):
+        return FALLBACK_MEMORY_BUDGET
+
+
+class MemoryBudget:
+    """线程安全的内存预算：按估算开销准入，超出时按先来先服务排队"""
+
+    def __init__(self, limit: int):
+        """
+        Args:
+            limit: 预算（字节）
+        """
+        if limit < 1:
+            raise ValueError(f"limit 必须大于0: {limit}")
+        self.limit = limit
+        self._condition = threading.Condition()
+        self._waiters: Deque[object] = deque()
+        self.in_use = 0
+        self.running = 0
+        self.peak = 0
+        self.admitted = 0
+        self.queued = 0
+        self.wait_seconds = 0.0
+
+    @classmethod
+    def from_env(cls) -> Optional["MemoryBudget"]:
+        """根据环境变量 PDF_DECRYPT_MEMORY_BUDGET 创建预算，为0时返回None"""
+        try:
+            limit = int(os.environ.get(MEMORY_BUDGET_ENV, default_budget()))
+        except ValueError as e:
+            logger.warning(f"内存预算配置无效，使用默认值: {e}")
+            limit = default_budget()
+        if limit <= 0:
+            return None
+        return cls(limit)
+
+    def _fits(self, cost: int) -> bool:
+        return self.in_use + cost <= self.limit or self.running == 0
+
+    def _grant(self, cost: int) -> None:
+        self.in_use += cost
+        self.running += 1
+        self.admitted += 1
+        self.peak = max(self.peak, self.in_use)
+
+    def try_acquire(self, cost: int) -> Optional[int]:
+        """不等待地申请预算，成功时返回实际占用的字节数，否则返回None"""
+        cost = min(cost, self.limit)
+        with self._condition:
+            if self._waiters or not self._fits(cost):
+                return None
+            self._grant(cost)
+            return cost
+
+    def acquire(self, cost: int) -> int:
+        """申请预算，不足时排队等待；返回实际占用的字节数，需要用 release 归还"""
+        cost = min(cost, self.limit)
+        with self._condition:
+            if not self._waiters and self._fits(cost):
+                self._grant(cost)
+                return cost
+            ticket = object()
+            self._waiters.append(ticket)
+            self.queued += 1
+            start = time.perf_counter()
+            try:
+                while self._waiters[0] is not ticket or not self._fits(cost):
+                    self._condition.wait()
+            finally:
+                self._waiters.remove(ticket)
+                self._condition.notify_all()
+            self.wait_seconds += time.perf_counter() - start
+            self._grant(cost)
+            return cost
+
+    def release(self, cost: int) -> None:
+        with self._condition:
+            self.in_use -= cost
+            self.running -= 1
+            self._condition.notify_all()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._condition:
+            return {
+                "limit_bytes": self.limit,
+                "in_use_bytes": self.in_use,
+                "peak_bytes": self.peak,
+                "running": self.running,
+                "waiting": len(self._waiters),
+                "admitted": self.admitted,
+                "queued": self.queued,
+                "wait_seconds": round(self.wait_seconds, 3),
+            }
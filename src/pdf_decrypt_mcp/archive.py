@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+把批量解密结果直接写入归档文件
+
+批量解密的 output_archive 选项把每个解密后的文档作为一个成员写入 ZIP 或 tar 文件，
+不在磁盘上生成中间的 _解密版.pdf 文件。写出器的输出经过固定大小的缓冲区直接进入归档：
+
+- zip: 写出器的输出先进入有上限的临时缓冲（超过 ARCHIVE_SPOOL_SIZE 时转存到临时文件），
+  解密成功后才打开 zip 成员并以 deflate 压缩写入
+- tar: 先写出占位的成员头，内容直接写入归档，写完后回到成员头处填入实际大小；
+  成员头使用GNU格式，其长度只取决于成员名，不随内容大小变化
+
+某个成员写出失败时不留下不完整的成员：zip 不打开该成员，tar 截断回该成员之前的位置。
+未加密的文件与批量解密写磁盘时一样被跳过，不写入归档。
+"""
+
+import io
+import os
+import shutil
+import tarfile
+import tempfile
+import time
+import zipfile
+from contextlib import contextmanager
+from typing import BinaryIO, Iterator, List, Optional
+
+# 支持的归档格式，按文件扩展名选择
+ARCHIVE_FORMATS = ("zip", "tar")
+# 写入归档前缓冲的最大字节数
+ARCHIVE_BUFFER_SIZE = 1024 * 1024
+# zip 成员写入前在内存中暂存的最大字节数，更大的成员转存到临时文件
+ARCHIVE_SPOOL_SIZE = 32 * 1024 * 1024
+
+
+def archive_format(path: str) -> str:
+    """
+    按扩展名判断归档格式
+
+    Raises:
+        ValueError: 扩展名不是 .zip 或 .tar
+    """
+    extension = os.path.splitext(path)[1].lower().lstrip(".")
+    if extension not in ARCHIVE_FORMATS:
+        raise ValueError(f"不支持的归档格式: {path}，扩展名应为 {' 或 '.join('.' + f for f in ARCHIVE_FORMATS)}")
+    return extension
+
+
+class PositionWriter(io.RawIOBase):
+    """
+    记录已写出字节数的缓冲写入器
+
+    写出器需要 tell() 计算对象偏移，zip 成员流不支持 seek；这里按写入量自行计数，
+    并把小块写入合并到最多 buffer_size 字节后再交给下层。继承 io.RawIOBase，pikepdf 才接受它作为输出流。
+    """
+
+    def __init__(self, raw: BinaryIO, buffer_size: int = ARCHIVE_BUFFER_SIZE):
+        super().__init__()
+        self.raw = raw
+        self.buffer_size = buffer_size
+        self.position = 0
+        self._buffer: List[bytes] = []
+        self._buffered = 0
+
+    def write(self, data: bytes) -> int:
+        size = len(data)
+        self._buffer.append(bytes(data))
+        self._buffered += size
+        self.position += size
+        if self._buffered >= self.buffer_size:
+            self.flush()
+        return size
+
+    def tell(self) -> int:
+        return self.position
+
+    def flush(self) -> None:
+        if self._buffer:
+            self.raw.write(b"".join(self._buffer))
+            self._buffer = []
+            self._buffered = 0
+
+    def close(self) -> None:
+        # 丢弃未写出的缓冲：正常完成的成员在关闭前已 flush，出错的成员不应再写入归档
+        self._buffer = []
+        self._buffered = 0
+        super().close()
+
+    def writable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return False
+
+
+class ArchiveWriter:
+    """逐个写入成员的 ZIP/tar 归档，同一时刻只能打开一个成员"""
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: 归档文件路径，格式由扩展名 .zip/.tar 决定，已存在时覆盖
+        """
+        self.path = path
+        self.format = archive_format(path)
+        self.members: List[str] = []
+        self._zip: Optional[zipfile.ZipFile] = None
+        self._tar: Optional[BinaryIO] = None
+        if self.format == "zip":
+            self._zip = zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED, allowZip64=True)
+        else:
+            self._tar = open(path, "wb")
+
+    def __enter__(self) -> "ArchiveWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    @contextmanager
+    def entry(self, name: str) -> Iterator[PositionWriter]:
+        """打开名为name的成员，产出可写入的流；退出时完成成员，出错时撤销该成员"""
+        name = name.replace(os.sep, "/")
+        if self._zip is not None:
+            with self._zip_entry(name) as output:
+                yield output
+        else:
+            with self._tar_entry(name) as output:
+                yield output
+        self.members.append(name)
+
+    @contextmanager
+    def _zip_entry(self, name: str) -> Iterator[PositionWriter]:
+        # zipfile 没有删除成员的接口：先写入暂存区，写出成功后才创建成员
+        with tempfile.SpooledTemporaryFile(max_size=ARCHIVE_SPOOL_SIZE) as spool:
+            with PositionWriter(spool) as output:
+                yield output
+                output.flush()
+            spool.seek(0)
+            info = zipfile.ZipInfo(name, time.localtime()[:6])
+            info.compress_type = zipfile.ZIP_DEFLATED
+            with self._zip.open(info, "w", force_zip64=True) as member:
+                shutil.copyfileobj(spool, member, ARCHIVE_BUFFER_SIZE)
+
+    @contextmanager
+    def _tar_entry(self, name: str) -> Iterator[PositionWriter]:
+        fileobj = self._tar
+        start = fileobj.tell()
+        info = tarfile.TarInfo(name)
+        info.mtime = int(time.time())
+        info.mode = 0o644
+        fileobj.write(b"\0" * len(self._tar_header(info)))
+        try:
+            with PositionWriter(fileobj) as output:
+                yield output
+                output.flush()
+            info.size = output.position
+            remainder = info.size % tarfile.BLOCKSIZE
+            if remainder:
+                fileobj.write(b"\0" * (tarfile.BLOCKSIZE - remainder))
+            end = fileobj.tell()
+            fileobj.seek(start)
+            fileobj.write(self._tar_header(info))
+            fileobj.seek(end)
+        except BaseException:
+            fileobj.seek(start)
+            fileobj.truncate()
+            raise
+
+    @staticmethod
+    def _tar_header(info: tarfile.TarInfo) -> bytes:
+        return info.tobuf(tarfile.GNU_FORMAT, "utf-8", "surrogateescape")
+
+    def close(self) -> None:
+        if self._zip is not None:
+            self._zip.close()
+            self._zip = None
+        elif self._tar is not None:
+            # 归档结尾的两个空块，并补齐到记录大小，与 tarfile 一致
+            fileobj = self._tar
+            fileobj.write(b"\0" * (tarfile.BLOCKSIZE * 2))
+            remainder = fileobj.tell() % tarfile.RECORDSIZE
+            if remainder:
+                fileobj.write(b"\0" * (tarfile.RECORDSIZE - remainder))
+            fileobj.close()
+            self._tar = None
@@ -0,0 +1,439 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+PDF处理后端
+
+PDFDecryptor 通过后端打开文档、判断加密状态、尝试密码、读取元数据并写出解密结果。
+
+- pypdf2: 纯Python实现，随项目安装，支持全部写出方式（clone/stream/raw/pages）
+- pikepdf: 基于C++的qpdf，安装 pikepdf 后自动使用，大文件上明显更快
+
+选择顺序：PDFDecryptor 的 backend 参数 > 环境变量 PDF_DECRYPT_BACKEND > auto。
+auto 在能导入 pikepdf 时使用 pikepdf，否则使用 pypdf2。pikepdf 只在真正打开文档时导入。
+"""
+
+import hashlib
+import importlib.util
+import io
+import os
+from contextlib import contextmanager
+from typing import Any, BinaryIO, Dict, Iterator, Optional, Union
+
+from PyPDF2 import PdfReader, PdfWriter
+from PyPDF2.errors import FileNotDecryptedError
+
+from .clone_writer import write_cloned_document
+from .probe import describe_encryption, probe_encryption, read_encryption_ids
+from .stream_writer import DEFAULT_MEMORY_LIMIT, write_decrypted_stream, write_raw
+from .timings import StageTimer
+
+# 设置为 auto/pypdf2/pikepdf 选择后端
+BACKEND_ENV = "PDF_DECRYPT_BACKEND"
+BACKENDS = ("auto", "pypdf2", "pikepdf")
+
+
+def _raw_bytes(value: Any) -> bytes:
+    """PDF字符串对象的原始字节（文本字符串取解码前的字节）"""
+    original = getattr(value, "original_bytes", None)
+    if original is not None:
+        return bytes(original)
+    if isinstance(value, bytes):
+        return bytes(value)
+    return str(value).encode("latin-1", errors="replace")
+
+
+def _fingerprint_of(values) -> str:
+    digest = hashlib.sha256()
+    for value in values:
+        digest.update(value)
+        digest.update(b"\x00")
+    return f"id:{digest.hexdigest()}"
+
+
+@contextmanager
+def _output_file(output: Union[str, BinaryIO]) -> Iterator[BinaryIO]:
+    """输出为路径时以写模式打开，为可写流时直接使用"""
+    if isinstance(output, str):
+        with open(output, 'wb') as output_file:
+            yield output_file
+    else:
+        yield output
+
+
+class BufferReader(io.RawIOBase):
+    """内存中PDF的只读可定位流：按需从memoryview中复制读取的部分，不复制整个文档"""
+
+    def __init__(self, data: memoryview):
+        super().__init__()
+        self._data = data
+        self._position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: Any) -> int:
+        size = max(0, min(len(buffer), len(self._data) - self._position))
+        buffer[:size] = self._data[self._position:self._position + size]
+        self._position += size
+        return size
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence == io.SEEK_END:
+            offset += len(self._data)
+        if offset < 0:
+            raise ValueError(f"negative seek position {offset}")
+        self._position = offset
+        return offset
+
+    def tell(self) -> int:
+        return self._position
+
+    def close(self) -> None:
+        # 不再引用调用方的缓冲区，PDF库在关闭后仍持有本流时也不会延长其生命周期
+        self._data = None
+        super().close()
+
+    def __repr__(self) -> str:
+        # pikepdf 在错误信息中引用输入流
+        return "<memory>"
+
+
+def _info_record(pages: Optional[int], file_size: int, info: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    info = info or {}
+    return {
+        "pages": pages,
+        "title": info.get("title") or "未知",
+        "author": info.get("author") or "未知",
+        "creator": info.get("creator") or "未知",
+        "producer": info.get("producer") or "未知",
+        "file_size": file_size
+    }
+
+
+class PdfDocument:
+    """
+    后端打开的PDF文档
+
+    在检查加密状态、尝试密码和写出之间传递同一个文档对象，
+    使批量处理中每个文件只打开、解析一次。使用完毕后需要关闭。
+    打开（open）、解析交叉引用表（xref_parse）、复制页面（page_copy）和写出（write）的耗时记在 timer 中。
+    data 不为None时从内存中的缓冲区读取文档，path 只用于日志和结果中的名称。
+    """
+
+    backend_name = ""
+
+    def __init__(self, path: str, timer: Optional[StageTimer] = None,
+                 data: Optional[memoryview] = None):
+        self.path = path
+        self.data = data
+        self.timer = timer if timer is not None else StageTimer()
+        self.stat = os.stat(path) if data is None else None
+        self.is_encrypted = False
+
+    def __enter__(self) -> "PdfDocument":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    @property
+    def file_size(self) -> int:
+        return len(self.data) if self.data is not None else self.stat.st_size
+
+    def _source(self) -> Union[str, BinaryIO]:
+        """交给PDF库打开的输入：文件路径，或内存中缓冲区的只读流"""
+        return BufferReader(self.data) if self.data is not None else self.path
+
+    def close(self) -> None:
+        pass
+
+    def try_password(self, password: str) -> bool:
+        """用密码解密文档，成功返回True"""
+        raise NotImplementedError
+
+    def write_decrypted(self, output: Union[str, BinaryIO], engine: str = "clone",
+                        memory_limit: int = DEFAULT_MEMORY_LIMIT) -> None:
+        """把已解密的文档写到output（文件路径，或支持 write/tell 的可写流）"""
+        raise NotImplementedError
+
+    def metadata(self) -> Dict[str, Any]:
+        """页数与文档信息；用户密码非空且尚未解密时页数和元数据未知"""
+        raise NotImplementedError
+
+    def encryption_info(self) -> Optional[Dict[str, Any]]:
+        """/Encrypt 字典中的加密参数，未加密时返回None"""
+        if not self.is_encrypted:
+            return None
+        probe = probe_encryption(self.path) if self.data is None else None
+        if probe is not None and probe["encryption"]:
+            return probe["encryption"]
+        # 交叉引用流等快速探测不支持的文件：PyPDF2 无需密码即可读取 /Encrypt 字典
+        with PyPDF2Document(self.path, data=self.data) as document:
+            return document.encryption_info()
+
+    def fingerprint(self) -> str:
+        """
+        文档指纹：trailer /ID 与 /Encrypt 中 /O、/U 的哈希；
+        缺少 /ID 时退回到文件内容哈希
+        """
+        values = read_encryption_ids(self.path) if self.is_encrypted and self.data is None else None
+        if values is not None:
+            return _fingerprint_of(values)
+        return self._content_fingerprint()
+
+    def _content_fingerprint(self) -> str:
+        if self.data is not None:
+            return f"sha256:{hashlib.sha256(self.data).hexdigest()}"
+        digest = hashlib.sha256()
+        with open(self.path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(chunk)
+        return f"sha256:{digest.hexdigest()}"
+
+
+class PyPDF2Document(PdfDocument):
+    """
+    PyPDF2 打开的文档
+
+    reader直接读取打开的文件而不是把整个文件读入内存。
+    """
+
+    backend_name = "pypdf2"
+
+    def __init__(self, path: str, timer: Optional[StageTimer] = None,
+                 data: Optional[memoryview] = None):
+        super().__init__(path, timer, data)
+        with self.timer.stage("open"):
+            self._file = open(path, 'rb') if data is None else BufferReader(data)
+        try:
+            with self.timer.stage("xref_parse"):
+                self.reader = PdfReader(self._file)
+            self.is_encrypted = self.reader.is_encrypted
+        except Exception:
+            self._file.close()
+            raise
+
+    def close(self) -> None:
+        self._file.close()
+
+    def try_password(self, password: str) -> bool:
+        try:
+            return bool(self.reader.decrypt(password))
+        except Exception:
+            return False
+
+    def write_decrypted(self, output: Union[str, BinaryIO], engine: str = "clone",
+                        memory_limit: int = DEFAULT_MEMORY_LIMIT) -> None:
+        reader = self.reader
+        if engine == "pages":
+            with self.timer.stage("page_copy"):
+                writer = PdfWriter()
+                for page in reader.pages:
+                    writer.add_page(page)
+            with self.timer.stage("write"), _output_file(output) as output_file:
+                writer.write(output_file)
+            return
+
+        with self.timer.stage("write"), _output_file(output) as output_file:
+            if engine == "clone":
+                write_cloned_document(reader, output_file)
+            elif engine == "stream":
+                write_decrypted_stream(reader, output_file, memory_limit)
+            else:
+                write_raw(reader, output_file, memory_limit)
+
+    def metadata(self) -> Dict[str, Any]:
+        reader = self.reader
+        try:
+            metadata = reader.metadata
+            info = {}
+            if metadata:
+                info = {
+                    "title": metadata.title,
+                    "author": metadata.author,
+                    "creator": metadata.creator,
+                    "producer": metadata.producer,
+                }
+            return _info_record(len(reader.pages), self.file_size, info)
+        except FileNotDecryptedError:
+            return _info_record(None, self.file_size)
+
+    def encryption_info(self) -> Optional[Dict[str, Any]]:
+        if not self.is_encrypted:
+            return None
+        return describe_encryption(self.reader.trailer["/Encrypt"].get_object())
+
+    def fingerprint(self) -> str:
+        trailer = self.reader.trailer
+        id_entry = trailer.get("/ID")
+        if self.is_encrypted and id_entry:
+            encrypt = trailer["/Encrypt"].get_object()
+            return _fingerprint_of(
+                _raw_bytes(value) for value in (id_entry[0], encrypt.get("/O"), encrypt.get("/U"))
+            )
+        return self._content_fingerprint()
+
+
+class PikepdfDocument(PdfDocument):
+    """
+    pikepdf（qpdf）打开的文档
+
+    qpdf 必须在打开时提供密码：构造时先用空密码打开，失败说明设置了用户密码，
+    之后每次 try_password 用新密码重新打开。clone/raw/pages 都整体保留文档结构，
+    raw 方式不解码任何流，memory_limit 不适用（qpdf 按需读取对象）；
+    stream 方式交给 PyPDF2 的逐对象写出器，按 memory_limit 限制驻留内存。
+    """
+
+    backend_name = "pikepdf"
+
+    def __init__(self, path: str, timer: Optional[StageTimer] = None,
+                 data: Optional[memoryview] = None):
+        import pikepdf
+
+        super().__init__(path, timer, data)
+        self._pikepdf = pikepdf
+        self._pdf = None
+        self._reader: Optional[BinaryIO] = None
+        self._password = ""
+        # qpdf 打开文件时即解析交叉引用表，无法拆分两个阶段
+        try:
+            with self.timer.stage("xref_parse"):
+                self._open("")
+            self.is_encrypted = self._pdf.is_encrypted
+        except pikepdf.PasswordError:
+            self.is_encrypted = True
+
+    def _open(self, password: str) -> None:
+        """用密码打开文档，替换当前打开的文档；密码错误时抛出 PasswordError"""
+        source = self._source()
+        try:
+            pdf = self._pikepdf.open(source, password=password)
+        except BaseException:
+            if not isinstance(source, str):
+                source.close()
+            raise
+        self.close()
+        self._pdf = pdf
+        self._reader = None if isinstance(source, str) else source
+        self._password = password
+
+    def close(self) -> None:
+        if self._pdf is not None:
+            self._pdf.close()
+            self._pdf = None
+        # pikepdf 不关闭调用方传入的流
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
+
+    def try_password(self, password: str) -> bool:
+        if password == "" and self._pdf is not None:
+            return True
+        try:
+            self._open(password)
+        except self._pikepdf.PasswordError:
+            return False
+        return True
+
+    def write_decrypted(self, output: Union[str, BinaryIO], engine: str = "clone",
+                        memory_limit: int = DEFAULT_MEMORY_LIMIT) -> None:
+        pikepdf = self._pikepdf
+        if engine == "stream":
+            # qpdf 只能整体写出：用同一密码在 PyPDF2 中重新打开，逐个对象写出
+            with PyPDF2Document(self.path, self.timer, self.data) as document:
+                if document.is_encrypted and not document.try_password(self._password):
+                    raise ValueError("PyPDF2 无法用已验证的密码解密该文档，请改用其他写出方式")
+                document.write_decrypted(output, engine, memory_limit)
+        elif engine == "pages":
+            with pikepdf.new() as pdf:
+                with self.timer.stage("page_copy"):
+                    pdf.pages.extend(self._pdf.pages)
+                with self.timer.stage("write"):
+                    pdf.save(output)
+        elif engine == "raw":
+            with self.timer.stage("write"):
+                self._pdf.save(output, stream_decode_level=pikepdf.StreamDecodeLevel.none,
+                               object_stream_mode=pikepdf.ObjectStreamMode.preserve)
+        else:
+            with self.timer.stage("write"):
+                self._pdf.save(output)
+
+    def metadata(self) -> Dict[str, Any]:
+        if self._pdf is None:
+            return _info_record(None, self.file_size)
+        docinfo = self._pdf.docinfo
+        info = {
+            key[1:].lower(): str(docinfo[key])
+            for key in ("/Title", "/Author", "/Creator", "/Producer")
+            if key in docinfo
+        }
+        return _info_record(len(self._pdf.pages), self.file_size, info)
+
+    def encryption_info(self) -> Optional[Dict[str, Any]]:
+        if not self.is_encrypted or self._pdf is None or "/Encrypt" not in self._pdf.trailer:
+            return super().encryption_info()
+        encrypt = self._pdf.trailer.Encrypt
+        return describe_encryption({
+            key: str(encrypt[key]) if key == "/Filter" else int(encrypt[key])
+            for key in ("/Filter", "/V", "/R", "/Length", "/P")
+            if key in encrypt
+        })
+
+
+class PdfBackend:
+    """打开PDF文档的后端"""
+
+    name = ""
+    document_class = PdfDocument
+
+    def open(self, path: str, timer: Optional[StageTimer] = None,
+             data: Optional[memoryview] = None) -> PdfDocument:
+        """
+        打开并解析文档（加密文档在 try_password 成功前只能读取加密参数）
+
+        timer 不为None时各阶段耗时记入其中，否则文档自带一个计时器。
+        data 不为None时从该缓冲区读取文档而不是打开path。
+        """
+        return self.document_class(path, timer, data)
+
+
+class PyPDF2Backend(PdfBackend):
+    name = "pypdf2"
+    document_class = PyPDF2Document
+
+
+class PikepdfBackend(PdfBackend):
+    name = "pikepdf"
+    document_class = PikepdfDocument
+
+
+def pikepdf_available() -> bool:
+    return importlib.util.find_spec("pikepdf") is not None
+
+
+def get_backend(name: Optional[str] = None) -> PdfBackend:
+    """
+    按名称创建后端
+
+    Args:
+        name: auto/pypdf2/pikepdf（可选，默认读取环境变量 PDF_DECRYPT_BACKEND，未设置时为auto）
+
+    Raises:
+        ValueError: 名称无效，或指定了 pikepdf 但未安装
+    """
+    name = (name or os.environ.get(BACKEND_ENV) or "auto").strip().lower()
+    if name not in BACKENDS:
+        raise ValueError(f"不支持的后端: {name}，可选值: {', '.join(BACKENDS)}")
+    if name == "auto":
+        name = "pikepdf" if pikepdf_available() else "pypdf2"
+    if name == "pikepdf":
+        if not pikepdf_available():
+            raise ValueError("pikepdf 后端需要先安装 pikepdf: pip install pikepdf")
+        return PikepdfBackend()
+    return PyPDF2Backend()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+加密状态检查结果的进程内缓存
+
+同一会话中反复检查同一文件时直接返回上次的结果，不再解析PDF。
+条目以路径和检查方式（完整/快速）为键，保存文件的 (inode, 大小, mtime_ns)；
+读取时重新 stat，任何一项变化即视为过期并丢弃。条目数超过上限时淘汰最久未使用的条目，
+超过存活时间（TTL）的条目也会丢弃。
+"""
+
+import copy
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 最多缓存的条目数，设置为0禁用缓存
+CACHE_SIZE_ENV = "PDF_DECRYPT_CHECK_CACHE_SIZE"
+# 条目存活时间（秒），设置为0表示不按时间过期
+CACHE_TTL_ENV = "PDF_DECRYPT_CHECK_CACHE_TTL"
+DEFAULT_CACHE_SIZE = 1024
+DEFAULT_CACHE_TTL = 300.0
+
+# (inode, 大小, mtime_ns)
+Validator = Tuple[int, int, int]
+
+
+def stat_validator(stat: os.stat_result) -> Validator:
+    return (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+
+class CheckResultCache:
+    """线程安全的LRU缓存：(路径, 检查方式) → 检查结果"""
+
+    def __init__(self, max_entries: int = DEFAULT_CACHE_SIZE, ttl: float = DEFAULT_CACHE_TTL):
+        """
+        Args:
+            max_entries: 最多缓存的条目数
+            ttl: 条目存活时间（秒），0表示不按时间过期
+        """
+        if max_entries < 1:
+            raise ValueError(f"max_entries 必须大于0: {max_entries}")
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[Validator, float, Dict[str, Any]]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.expired = 0
+        self.evictions = 0
+
+    @classmethod
+    def from_env(cls) -> Optional["CheckResultCache"]:
+        """根据环境变量 PDF_DECRYPT_CHECK_CACHE_SIZE / PDF_DECRYPT_CHECK_CACHE_TTL 创建缓存，大小为0时返回None"""
+        try:
+            max_entries = int(os.environ.get(CACHE_SIZE_ENV, DEFAULT_CACHE_SIZE))
+            ttl = float(os.environ.get(CACHE_TTL_ENV, DEFAULT_CACHE_TTL))
+        except ValueError as e:
+            logger.warning(f"检查结果缓存配置无效，使用默认值: {e}")
+            max_entries, ttl = DEFAULT_CACHE_SIZE, DEFAULT_CACHE_TTL
+        if max_entries <= 0:
+            return None
+        return cls(max_entries, ttl)
+
+    @staticmethod
+    def _key(path: str, variant: str) -> Tuple[str, str]:
+        return (os.path.abspath(path), variant)
+
+    def get(self, path: str, variant: str, stat: os.stat_result) -> Optional[Dict[str, Any]]:
+        """返回与当前stat一致且未过期的结果副本，没有时返回None"""
+        key = self._key(path, variant)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                validator, stored_at, result = entry
+                if validator != stat_validator(stat):
+                    self.stale += 1
+                    del self._entries[key]
+                elif self.ttl and time.monotonic() - stored_at > self.ttl:
+                    self.expired += 1
+                    del self._entries[key]
+                else:
+                    self.hits += 1
+                    self._entries.move_to_end(key)
+                    return copy.deepcopy(result)
+            self.misses += 1
+            return None
+
+    def put(self, path: str, variant: str, stat: os.stat_result, result: Dict[str, Any]) -> None:
+        """保存结果；stat 应是解析之前取得的，文件在解析期间被修改时下次读取即过期"""
+        key = self._key(path, variant)
+        with self._lock:
+            self._entries[key] = (stat_validator(stat), time.monotonic(), copy.deepcopy(result))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "stale": self.stale,
+                "expired": self.expired,
+                "evictions": self.evictions,
+            }
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+命令行入口
+
+    pdf-decrypt-mcp                  以stdio方式运行MCP服务器
+    pdf-decrypt-mcp watch <目录>     监视目录，自动解密新出现的PDF文件，每个结果输出一行JSON
+
+服务器模式下只在需要时导入MCP与PDF库，保持冷启动快速。
+"""
+
+import argparse
+import json
+import sys
+from typing import List, Optional
+
+
+def _run_server() -> None:
+    import asyncio
+
+    from .server import main as server_main
+    asyncio.run(server_main())
+
+
+def _run_watch(args: argparse.Namespace) -> None:
+    from .pdf_decryptor import PDFDecryptor
+    from .watcher import DirectoryWatcher, iter_watch_results
+
+    watcher = DirectoryWatcher(
+        PDFDecryptor.from_env(),
+        args.directory,
+        password=args.password,
+        recursive=args.recursive,
+        include=args.include,
+        exclude=args.exclude,
+        max_depth=args.max_depth,
+        settle=args.settle,
+        queue_size=args.queue_size,
+        workers=args.workers,
+        poll_interval=args.poll_interval,
+        use_inotify=False if args.polling else None,
+        process_existing=args.existing,
+    )
+    try:
+        for result in iter_watch_results(watcher):
+            print(json.dumps(result, ensure_ascii=False), flush=True)
+    except KeyboardInterrupt:
+        pass
+    if watcher.error:
+        print(f"监视目录时出错: {watcher.error}", file=sys.stderr)
+        sys.exit(1)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    from .watcher import DEFAULT_POLL_INTERVAL, DEFAULT_QUEUE_SIZE, DEFAULT_SETTLE
+
+    parser = argparse.ArgumentParser(prog="pdf-decrypt-mcp", description="PDF解密MCP服务")
+    subparsers = parser.add_subparsers(dest="command")
+    subparsers.add_parser("serve", help="以stdio方式运行MCP服务器（默认）")
+
+    watch = subparsers.add_parser("watch", help="监视目录，自动解密新出现的PDF文件")
+    watch.add_argument("directory", help="监视的目录")
+    watch.add_argument("--password", help="解密密码（默认尝试常见密码）")
+    watch.add_argument("--recursive", action="store_true", help="同时监视子目录")
+    watch.add_argument("--include", nargs="+", help="文件必须匹配的通配符")
+    watch.add_argument("--exclude", nargs="+", help="排除的文件或目录通配符")
+    watch.add_argument("--max-depth", type=int, help="递归的最大深度")
+    watch.add_argument("--settle", type=float, default=DEFAULT_SETTLE,
+                       help="文件保持不变多少秒后视为写入完成")
+    watch.add_argument("--workers", type=int, default=1, help="处理文件的工作线程数")
+    watch.add_argument("--queue-size", type=int, default=DEFAULT_QUEUE_SIZE, help="等待处理的文件队列长度")
+    watch.add_argument("--poll-interval", type=float, default=DEFAULT_POLL_INTERVAL,
+                       help="轮询模式的扫描间隔（秒）")
+    watch.add_argument("--polling", action="store_true", help="不使用 inotify，始终轮询")
+    watch.add_argument("--existing", action="store_true", help="同时处理启动时已存在的文件")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        _run_server()
+        return
+    args = build_parser().parse_args(argv)
+    if args.command == "watch":
+        _run_watch(args)
+    else:
+        _run_server()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+整文档克隆写出解密后的PDF
+
+从trailer的 /Root 和 /Info 出发，沿间接引用遍历所有可达对象，
+每个对象读取（由PyPDF2去除加密）后立即以原对象号写出。
+目录（catalog）整体保留：书签、命名目标、文档元数据、AcroForm、页面树都不经过重建，
+不可达的对象（包括 /Encrypt 字典、对象流和交叉引用流容器）自然被丢弃。
+
+与逐页复制相比，不创建 PdfWriter 对象图，也不在Python中重建页面树；
+遍历使用显式队列，书签链再长也不会递归过深。
+"""
+
+from collections import deque
+from typing import Any, BinaryIO, Deque, Dict, Iterator, Set, Tuple
+
+from PyPDF2 import PdfReader
+from PyPDF2.generic import ArrayObject, DictionaryObject, IndirectObject
+
+from .stream_writer import build_trailer, write_header, write_object, write_xref_table
+
+
+def iter_references(obj: Any) -> Iterator[IndirectObject]:
+    """列出对象中直接包含的间接引用（不跟随引用）"""
+    stack = [obj]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, IndirectObject):
+            yield value
+        elif isinstance(value, DictionaryObject):
+            stack.extend(value.values())
+        elif isinstance(value, ArrayObject):
+            stack.extend(value)
+
+
+def write_cloned_document(reader: PdfReader, output: BinaryIO) -> Dict[str, int]:
+    """
+    写出从 /Root 和 /Info 可达的全部对象
+
+    Args:
+        reader: 已用正确密码解密的reader（未加密的reader也可以）
+        output: 可定位的二进制输出流
+
+    Returns:
+        写出统计：objects（写出的对象数）
+    """
+    write_header(reader, output)
+    offsets: Dict[int, Tuple[int, int]] = {}
+    seen: Set[Tuple[int, int]] = set()
+    queue: Deque[IndirectObject] = deque()
+
+    trailer = build_trailer(reader, 0)
+    for ref in iter_references(trailer):
+        if (ref.idnum, ref.generation) not in seen:
+            seen.add((ref.idnum, ref.generation))
+            queue.append(ref)
+
+    while queue:
+        ref = queue.popleft()
+        obj = reader.get_object(ref)
+        if obj is None:
+            continue
+        for child in iter_references(obj):
+            key = (child.idnum, child.generation)
+            if key not in seen:
+                seen.add(key)
+                queue.append(child)
+        offsets[ref.idnum] = (write_object(output, ref.idnum, ref.generation, obj), ref.generation)
+        # 写出后立即从缓存中移除，后续对象只以引用形式指向它
+        reader.resolved_objects.pop((ref.generation, ref.idnum), None)
+
+    write_xref_table(output, offsets, build_trailer(reader, max(offsets, default=0) + 1))
+    return {"objects": len(offsets)}
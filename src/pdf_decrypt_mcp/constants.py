@@ -0,0 +1,15 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+不依赖PDF库的公共常量
+
+服务器列出工具时只需要这些取值，放在这里可以在第一次工具调用之前不加载 PyPDF2。
+"""
+
+# 解密后的写出方式：clone 整文档克隆，stream 逐个对象流式写出，
+# raw 只去除加密层、对象流原样保留，pages 逐页复制到新的 PdfWriter
+ENGINES = ("clone", "stream", "raw", "pages")
+
+# 默认的单对象内存上限
+DEFAULT_MEMORY_LIMIT = 256 * 1024 * 1024
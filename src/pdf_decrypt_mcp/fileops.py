@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+文件复制辅助函数
+
+未加密的PDF无需解析，直接由内核复制：优先 copy_file_range，其次 sendfile，
+最后退回到固定大小缓冲区的流式复制，内存占用与文件大小无关。
+link 模式下优先使用 reflink（写时复制克隆），其次硬链接，都失败时再复制。
+"""
+
+import errno
+import os
+import sys
+
+# 流式复制的缓冲区大小
+COPY_BUFFER_SIZE = 1024 * 1024
+# 单次系统调用最多复制的字节数
+_MAX_CHUNK = 1 << 30
+# Linux ioctl FICLONE
+_FICLONE = 0x40049409
+
+# 这些错误说明当前文件系统或内核不支持对应的系统调用，应换用下一种方式
+_UNSUPPORTED_ERRNOS = {
+    errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP,
+    errno.ENOTSUP, errno.EBADF, errno.EPERM, errno.ENOTTY,
+}
+
+
+def _reflink(src: str, dst: str) -> bool:
+    if not sys.platform.startswith("linux"):
+        return False
+    import fcntl
+
+    with open(src, 'rb') as src_file:
+        with open(dst, 'wb') as dst_file:
+            try:
+                fcntl.ioctl(dst_file.fileno(), _FICLONE, src_file.fileno())
+                return True
+            except OSError as e:
+                if e.errno not in _UNSUPPORTED_ERRNOS:
+                    raise
+                return False
+
+
+def _hardlink(src: str, dst: str) -> bool:
+    if os.path.lexists(dst):
+        os.remove(dst)
+    try:
+        os.link(src, dst)
+        return True
+    except OSError as e:
+        if e.errno not in _UNSUPPORTED_ERRNOS and e.errno != errno.EMLINK:
+            raise
+        return False
+
+
+def _kernel_copy(src_fd: int, dst_fd: int, size: int) -> str:
+    """在内核中复制，返回使用的方式；不支持时抛出 OSError"""
+    if hasattr(os, "copy_file_range"):
+        try:
+            copied = 0
+            while copied < size:
+                sent = os.copy_file_range(src_fd, dst_fd, min(size - copied, _MAX_CHUNK))
+                if sent == 0:
+                    break
+                copied += sent
+            return "copy_file_range"
+        except OSError as e:
+            if e.errno not in _UNSUPPORTED_ERRNOS or copied:
+                raise
+
+    if hasattr(os, "sendfile") and sys.platform.startswith("linux"):
+        offset = 0
+        while offset < size:
+            sent = os.sendfile(dst_fd, src_fd, offset, min(size - offset, _MAX_CHUNK))
+            if sent == 0:
+                break
+            offset += sent
+        return "sendfile"
+
+    raise OSError(errno.ENOSYS, "内核复制不可用")
+
+
+def copy_file(src: str, dst: str, link: bool = False) -> str:
+    """
+    复制文件，不把文件内容读入Python对象
+
+    Args:
+        src: 源文件路径
+        dst: 目标文件路径（已存在时覆盖）
+        link: 是否优先使用reflink或硬链接
+
+    Returns:
+        实际使用的方式：reflink、hardlink、copy_file_range、sendfile 或 stream
+    """
+    if link:
+        if _reflink(src, dst):
+            return "reflink"
+        if _hardlink(src, dst):
+            return "hardlink"
+
+    with open(src, 'rb') as src_file:
+        with open(dst, 'wb') as dst_file:
+            size = os.fstat(src_file.fileno()).st_size
+            try:
+                return _kernel_copy(src_file.fileno(), dst_file.fileno(), size)
+            except OSError as e:
+                if e.errno not in _UNSUPPORTED_ERRNOS:
+                    raise
+
+            dst_file.seek(0)
+            dst_file.truncate()
+            src_file.seek(0)
+            while True:
+                chunk = src_file.read(COPY_BUFFER_SIZE)
+                if not chunk:
+                    break
+                dst_file.write(chunk)
+            return "stream"
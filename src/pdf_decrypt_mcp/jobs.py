@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+后台批量解密任务
+
+大目录的批量解密可能超过MCP客户端的请求超时。submit 只登记任务并交给后台线程池，立即返回任务ID，
+不扫描目录；客户端随后轮询任务状态（逐文件的进度计数），也可以取消任务。
+取消是协作式的：已在处理的文件完成后，不再开始新的文件。
+
+后台线程池与处理普通工具调用的线程池分开，长任务不会占满工具调用的工作线程。
+已结束的任务最多保留 MAX_FINISHED_JOBS 个，最早结束的先丢弃。
+"""
+
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# 同时运行的后台任务数，可通过环境变量 PDF_DECRYPT_JOB_WORKERS 配置
+JOB_WORKERS_ENV = "PDF_DECRYPT_JOB_WORKERS"
+DEFAULT_JOB_WORKERS = 2
+# 保留的已结束任务数
+MAX_FINISHED_JOBS = 100
+
+# 任务状态
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED_STATES = (COMPLETED, FAILED, CANCELLED)
+
+
+class BatchJob:
+    """一个后台批量解密任务及其进度"""
+
+    def __init__(self, directory: str, arguments: Dict[str, Any]):
+        self.job_id = uuid.uuid4().hex[:12]
+        self.directory = directory
+        self.arguments = arguments
+        self.state = QUEUED
+        self.cancel_event = threading.Event()
+        self.future: Optional[Future] = None
+        self.submitted_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self._lock = threading.Lock()
+        self.progress: Dict[str, Any] = {
+            "done": 0,
+            "total": None,
+            "decrypted": 0,
+            "not_encrypted": 0,
+            "failed": 0,
+            "current_file": None,
+        }
+
+    def on_progress(self, done: int, total: Optional[int], file_result: Dict[str, Any]) -> None:
+        """批量解密的进度回调，每处理完一个文件调用一次"""
+        with self._lock:
+            progress = self.progress
+            progress["done"] = done
+            progress["total"] = total
+            progress["current_file"] = file_result.get("file")
+            if not file_result.get("success"):
+                progress["failed"] += 1
+            elif file_result.get("is_encrypted"):
+                progress["decrypted"] += 1
+            else:
+                progress["not_encrypted"] += 1
+
+    def status(self, include_result: bool = True) -> Dict[str, Any]:
+        with self._lock:
+            status = {
+                "job_id": self.job_id,
+                "directory": self.directory,
+                "state": self.state,
+                "submitted_at": self.submitted_at,
+                "started_at": self.started_at,
+                "finished_at": self.finished_at,
+                "progress": dict(self.progress),
+            }
+        if self.error is not None:
+            status["error"] = self.error
+        if include_result and self.result is not None:
+            status["result"] = self.result
+        return status
+
+
+class JobManager:
+    """后台任务的登记、执行与取消"""
+
+    def __init__(self, run_batch: Callable[..., Dict[str, Any]], max_workers: Optional[int] = None):
+        """
+        Args:
+            run_batch: 执行批量解密的函数，签名同 PDFDecryptor.batch_decrypt_pdfs
+            max_workers: 同时运行的任务数（可选，默认读取 PDF_DECRYPT_JOB_WORKERS）
+        """
+        if max_workers is None:
+            max_workers = int(os.environ.get(JOB_WORKERS_ENV, DEFAULT_JOB_WORKERS))
+        if max_workers < 1:
+            raise ValueError(f"max_workers 必须大于0: {max_workers}")
+        self.run_batch = run_batch
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="pdf-job")
+        self._jobs: "OrderedDict[str, BatchJob]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, directory: str, **arguments: Any) -> BatchJob:
+        """登记任务并交给后台线程池，不等待也不扫描目录"""
+        job = BatchJob(directory, arguments)
+        with self._lock:
+            self._jobs[job.job_id] = job
+            self._prune()
+        job.future = self._executor.submit(self._run, job)
+        return job
+
+    def get(self, job_id: str) -> Optional[BatchJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list(self) -> List[BatchJob]:
+        with self._lock:
+            return list(self._jobs.values())
+
+    def cancel(self, job_id: str) -> Optional[BatchJob]:
+        """请求取消任务：排队中的任务直接取消，运行中的任务处理完当前文件后结束"""
+        job = self.get(job_id)
+        if job is None:
+            return None
+        job.cancel_event.set()
+        if job.future is not None and job.future.cancel():
+            self._finish(job, CANCELLED)
+        return job
+
+    def shutdown(self) -> None:
+        for job in self.list():
+            job.cancel_event.set()
+        self._executor.shutdown(wait=False)
+
+    def _finish(self, job: BatchJob, state: str) -> None:
+        with job._lock:
+            job.state = state
+            job.finished_at = time.time()
+
+    def _prune(self) -> None:
+        finished = [job_id for job_id, job in self._jobs.items() if job.state in FINISHED_STATES]
+        for job_id in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self._jobs[job_id]
+
+    def _run(self, job: BatchJob) -> None:
+        with job._lock:
+            if job.cancel_event.is_set():
+                job.state = CANCELLED
+                job.finished_at = time.time()
+                return
+            job.state = RUNNING
+            job.started_at = time.time()
+        try:
+            result = self.run_batch(job.directory, progress_callback=job.on_progress,
+                                    cancel=job.cancel_event, **job.arguments)
+        except Exception as e:
+            logger.error(f"后台批量任务出错: {e}")
+            job.error = f"后台批量任务出错: {str(e)}"
+            self._finish(job, FAILED)
+            return
+        job.result = result
+        if result.get("cancelled"):
+            state = CANCELLED
+        elif result.get("success"):
+            state = COMPLETED
+        else:
+            job.error = result.get("error")
+            state = FAILED
+        self._finish(job, state)
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+批量解密的状态清单
+
+每个目录一个清单文件，记录源文件的路径、大小、修改时间、inode、输出路径和处理结果。
+增量运行时，大小、修改时间和inode都未变化且已成功处理的文件直接跳过，
+重新运行只需一次stat遍历；中断的运行再次执行时从未完成的文件继续。
+
+清单是追加写入的JSON Lines文件：每处理完一个文件追加一行，同一文件以最后一行为准，
+运行结束时压缩为每个文件一行。进程崩溃时最多丢失最后一行。
+"""
+
+import json
+import logging
+import os
+import time
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = ".pdf_decrypt_manifest.jsonl"
+
+# 这些结果视为已完成，文件未变化时不再处理；失败的文件每次都会重试
+_FINAL_OUTCOMES = ("decrypted", "unencrypted")
+
+
+def outcome_of(file_result: Dict[str, Any]) -> str:
+    """根据批量任务中单个文件的结果得出清单中记录的结果"""
+    if "is_encrypted" not in file_result:
+        return "failed"
+    if not file_result["is_encrypted"]:
+        return "unencrypted"
+    return "decrypted" if file_result["success"] else "failed"
+
+
+class BatchManifest:
+    """目录的批量解密状态清单"""
+
+    def __init__(self, directory: str, path: Optional[str] = None):
+        """
+        Args:
+            directory: 批量处理的目录
+            path: 清单文件路径（可选，默认为目录下的 .pdf_decrypt_manifest.jsonl）
+        """
+        self.directory = directory
+        self.path = path or os.path.join(directory, MANIFEST_NAME)
+        self.entries: Dict[str, Dict[str, Any]] = self._load()
+        self._file = None
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        entries: Dict[str, Dict[str, Any]] = {}
+        if not os.path.exists(self.path):
+            return entries
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                    entries[entry["file"]] = entry
+                except (ValueError, KeyError, TypeError):
+                    # 崩溃时写了一半的行
+                    continue
+        return entries
+
+    def __enter__(self) -> "BatchManifest":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def is_current(self, name: str, stat: os.stat_result) -> bool:
+        """文件自上次成功处理后是否未发生变化"""
+        entry = self.entries.get(name)
+        if entry is None or entry.get("outcome") not in _FINAL_OUTCOMES:
+            return False
+        if (entry.get("size"), entry.get("mtime_ns"), entry.get("inode")) != (
+                stat.st_size, stat.st_mtime_ns, stat.st_ino):
+            return False
+        output_path = entry.get("output_path")
+        return not output_path or os.path.exists(output_path)
+
+    def record(self, name: str, stat: os.stat_result, file_result: Dict[str, Any]) -> None:
+        """记录一个文件的处理结果并立即追加到清单文件"""
+        entry = {
+            "file": name,
+            "path": os.path.join(self.directory, name),
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "inode": stat.st_ino,
+            "output_path": file_result.get("output_path"),
+            "outcome": outcome_of(file_result),
+            "updated_at": time.time(),
+        }
+        if "error" in file_result:
+            entry["error"] = file_result["error"]
+        self.entries[name] = entry
+
+        if self._file is None:
+            self._file = open(self.path, 'a', encoding='utf-8')
+        self._file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self._file.flush()
+
+    def compact(self) -> None:
+        """把追加日志压缩为每个文件一行"""
+        self.close()
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for entry in self.entries.values():
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        os.replace(tmp_path, self.path)
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
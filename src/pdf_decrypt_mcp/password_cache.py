@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+已知密码缓存
+
+把文档指纹映射到成功解密过它的密码，保存在本地SQLite数据库中。
+再次解密同一文档（或重新下载的副本）时直接命中缓存，只需一次密钥校验。
+
+注意：密码以明文保存，数据库文件权限设置为仅当前用户可读写。
+"""
+
+import logging
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+# 默认关闭；设置为 on/1/true 使用默认路径，设置为路径则使用指定的数据库文件
+CACHE_ENV = "PDF_DECRYPT_PASSWORD_CACHE"
+_DISABLED_VALUES = {"", "0", "off", "false", "no"}
+_ENABLED_VALUES = {"1", "on", "true", "yes"}
+
+
+def default_cache_path() -> str:
+    """默认缓存路径：$XDG_CACHE_HOME/pdf-decrypt-mcp/passwords.sqlite3"""
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(cache_home, "pdf-decrypt-mcp", "passwords.sqlite3")
+
+
+class PasswordCache:
+    """基于SQLite的文档指纹→密码缓存，可在多个线程和进程间共享"""
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Args:
+            path: 数据库文件路径（可选，默认见 default_cache_path）
+        """
+        self.path = path or default_cache_path()
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS passwords ("
+                " fingerprint TEXT PRIMARY KEY,"
+                " password TEXT NOT NULL,"
+                " hits INTEGER NOT NULL DEFAULT 0,"
+                " updated_at REAL NOT NULL)"
+            )
+        try:
+            os.chmod(self.path, 0o600)
+        except OSError:
+            pass
+
+    @classmethod
+    def from_env(cls) -> Optional["PasswordCache"]:
+        """
+        根据环境变量 PDF_DECRYPT_PASSWORD_CACHE 创建缓存
+
+        缓存以明文保存密码，需要显式开启：未设置或设为 off 时返回None；
+        设为 on 时使用默认路径，其他值作为缓存文件路径。创建失败时也返回None。
+        """
+        value = (os.environ.get(CACHE_ENV) or "").strip()
+        if not value or value.lower() in _DISABLED_VALUES:
+            return None
+        try:
+            return cls(None if value.lower() in _ENABLED_VALUES else value)
+        except (OSError, sqlite3.Error) as e:
+            logger.warning(f"无法打开密码缓存，已禁用: {e}")
+            return None
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # 每次操作使用独立连接，避免跨线程/跨进程共享连接
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, fingerprint: str) -> Optional[str]:
+        """查找指纹对应的密码，未命中返回None"""
+        try:
+            with self._connect() as conn:
+                row = conn.execute(
+                    "SELECT password FROM passwords WHERE fingerprint = ?", (fingerprint,)
+                ).fetchone()
+                if row is None:
+                    return None
+                conn.execute(
+                    "UPDATE passwords SET hits = hits + 1 WHERE fingerprint = ?", (fingerprint,)
+                )
+                return row[0]
+        except sqlite3.Error as e:
+            logger.warning(f"读取密码缓存时出错: {e}")
+            return None
+
+    def put(self, fingerprint: str, password: str) -> None:
+        """记录指纹对应的密码"""
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT INTO passwords (fingerprint, password, updated_at) VALUES (?, ?, ?)"
+                    " ON CONFLICT(fingerprint) DO UPDATE SET"
+                    " password = excluded.password, updated_at = excluded.updated_at",
+                    (fingerprint, password, time.time()),
+                )
+        except sqlite3.Error as e:
+            logger.warning(f"写入密码缓存时出错: {e}")
+
+    def forget(self, fingerprint: str) -> None:
+        """删除指纹对应的缓存记录"""
+        try:
+            with self._connect() as conn:
+                conn.execute("DELETE FROM passwords WHERE fingerprint = ?", (fingerprint,))
+        except sqlite3.Error as e:
+            logger.warning(f"删除密码缓存时出错: {e}")
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+批量任务内的候选密码排序
+
+同一目录下的文件通常使用相同的密码。批量任务中每命中一次就给该候选密码计数，
+后续文件按命中次数从高到低尝试，命中次数相同的保持原有顺序。
+计数可以是普通列表，也可以是 multiprocessing 共享数组，以便所有工作进程共用。
+"""
+
+from typing import Dict, List, Optional, Sequence
+
+
+class PasswordRanking:
+    """按命中次数排序候选密码"""
+
+    def __init__(self, candidates: Sequence[str], counts: Optional[Sequence[int]] = None):
+        """
+        Args:
+            candidates: 候选密码（初始顺序）
+            counts: 命中计数存储（可选，传入共享数组时在进程间共享）
+        """
+        self.candidates = list(candidates)
+        self.counts = counts if counts is not None else [0] * len(self.candidates)
+        self._index: Dict[str, int] = {}
+        for index, candidate in enumerate(self.candidates):
+            self._index.setdefault(candidate, index)
+
+    def ordered(self) -> List[str]:
+        """当前的尝试顺序"""
+        counts = list(self.counts[:])
+        order = sorted(range(len(self.candidates)), key=lambda i: (-counts[i], i))
+        return [self.candidates[i] for i in order]
+
+    def record(self, password: str) -> None:
+        """记录一次命中；不在候选列表中的密码忽略"""
+        index = self._index.get(password)
+        if index is None:
+            return
+        lock = getattr(self.counts, "get_lock", None)
+        if lock is None:
+            self.counts[index] += 1
+            return
+        with lock():
+            self.counts[index] += 1
+
+    def hits(self) -> Dict[str, int]:
+        """有命中的候选密码及其次数"""
+        counts = list(self.counts[:])
+        return {
+            self.candidates[i]: counts[i]
+            for i in sorted(range(len(self.candidates)), key=lambda i: (-counts[i], i))
+            if counts[i]
+        }
@@ -1,19 +1,102 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import io
 import os
+import json
 import logging
-from typing import Dict, List, Optional, Tuple, Any
+import multiprocessing
+import threading
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from contextlib import contextmanager
+from itertools import islice
+from typing import BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Any, Union
 from pathlib import Path
-from PyPDF2 import PdfReader, PdfWriter
+from .admission import MemoryBudget, estimate_cost
+from .archive import ArchiveWriter, PositionWriter
+from .backends import PdfDocument, get_backend
+from .check_cache import CheckResultCache
+from .constants import ENGINES
+from .fileops import copy_file
+from .manifest import BatchManifest
+from .password_cache import PasswordCache
+from .password_ranking import PasswordRanking
+from .probe import probe_encryption
+from .scanner import iter_pdf_files
+from .stream_writer import DEFAULT_MEMORY_LIMIT, MemoryLimitExceeded
+from .timings import StageTimer
 
 logger = logging.getLogger(__name__)
 
+# 批量进度回调：(已完成文件数, 待处理文件总数（递归扫描未结束时为None）, 单个文件结果)
+ProgressCallback = Callable[[int, Optional[int], Dict[str, Any]], None]
+
+# 文件列表以生成器形式提供时，每次分发给工作进程的文件数
+STREAM_CHUNKSIZE = 4
+
+# 内存中的文档在日志和结果中使用的名称
+MEMORY_SOURCE = "<memory>"
+
+# 工作进程内的解密器实例，由 _init_batch_worker 创建
+_worker_decryptor: Optional["PDFDecryptor"] = None
+
+
+# 工作进程内共享的候选密码排序
+_worker_ranking: Optional[PasswordRanking] = None
+
+
+def _init_batch_worker(common_passwords: List[str], cache_path: Optional[str],
+                       ranking_counts: Any, backend: str) -> None:
+    """进程池初始化函数：在每个工作进程中创建一次解密器"""
+    global _worker_decryptor, _worker_ranking
+    password_cache = PasswordCache(cache_path) if cache_path else None
+    _worker_decryptor = PDFDecryptor(password_cache=password_cache, backend=backend)
+    _worker_decryptor.common_passwords = list(common_passwords)
+    _worker_ranking = PasswordRanking(common_passwords, ranking_counts)
+
+
+def _batch_worker(directory: str, pdf_files: List[str],
+                  password: Optional[str]) -> List[Dict[str, Any]]:
+    """在工作进程中处理一组文件"""
+    return [
+        _worker_decryptor._process_batch_file(directory, pdf_file, password, _worker_ranking)
+        for pdf_file in pdf_files
+    ]
+
+
+def _with_timings(result: Dict[str, Any], timer: StageTimer, timings: bool) -> Dict[str, Any]:
+    """timings为True时把各阶段耗时和密码尝试次数附在结果的 timings 字段中"""
+    if timings:
+        result["timings"] = timer.report(result.get("attempts"))
+    return result
+
+
+def default_output_path(input_path: str) -> str:
+    """默认输出路径：原文件同目录下添加"_解密版"后缀"""
+    base_name = os.path.splitext(os.path.basename(input_path))[0]
+    return os.path.join(os.path.dirname(input_path), f"{base_name}_解密版.pdf")
+
+
 class PDFDecryptor:
     """PDF解密器类"""
     
-    def __init__(self):
-        """初始化PDF解密器"""
+    def __init__(self, password_cache: Optional[PasswordCache] = None,
+                 backend: Optional[str] = None,
+                 check_cache: Optional[CheckResultCache] = None,
+                 memory_budget: Optional[MemoryBudget] = None):
+        """
+        初始化PDF解密器
+        
+        Args:
+            password_cache: 已知密码缓存（可选，不提供则不使用缓存）
+            backend: PDF处理后端 auto/pypdf2/pikepdf（可选，默认读取环境变量 PDF_DECRYPT_BACKEND）
+            check_cache: 加密状态检查结果缓存（可选，不提供则每次都解析文件）
+            memory_budget: 解析与解密共用的内存预算（可选，不提供则不限制同时处理的文件）
+        """
+        self.password_cache = password_cache
+        self.check_cache = check_cache
+        self.memory_budget = memory_budget
+        self.backend = get_backend(backend)
         self.common_passwords = [
             "",  # 空密码
             "123456",
@@ -49,16 +132,49 @@ class PDFDecryptor:
             "unlock",
         ]
     
-    def check_pdf_encryption(self, file_path: str) -> Dict[str, Any]:
+    @classmethod
+    def from_env(cls) -> "PDFDecryptor":
+        """
+        按环境变量创建解密器（服务器与命令行使用）
+        
+        已知密码缓存位置由 PDF_DECRYPT_PASSWORD_CACHE 配置，检查结果缓存的大小和存活时间由
+        PDF_DECRYPT_CHECK_CACHE_SIZE、PDF_DECRYPT_CHECK_CACHE_TTL 配置，后端由 PDF_DECRYPT_BACKEND 选择，
+        内存预算由 PDF_DECRYPT_MEMORY_BUDGET 配置。
+        """
+        return cls(password_cache=PasswordCache.from_env(), check_cache=CheckResultCache.from_env(),
+                   memory_budget=MemoryBudget.from_env())
+    
+    @contextmanager
+    def _admitted(self, path: Optional[str], timer: StageTimer, size: Optional[int] = None) -> Iterator[None]:
+        """
+        在内存预算内处理一个文件：按估算开销申请预算，不足时等待，等待时间计入 admission 阶段
+        
+        内存中的文档path为None，按size估算。
+        """
+        if self.memory_budget is None:
+            yield
+            return
+        with timer.stage("admission"):
+            granted = self.memory_budget.acquire(estimate_cost(path, size))
+        try:
+            yield
+        finally:
+            self.memory_budget.release(granted)
+    
+    def check_pdf_encryption(self, file_path: str, fast: bool = False,
+                             timings: bool = False) -> Dict[str, Any]:
         """
         检查PDF文件的加密状态
         
         Args:
             file_path: PDF文件路径
+            fast: 是否使用快速探测（只读取文件尾部的trailer和/Encrypt字典，不解析页面）
+            timings: 是否在结果中附带各阶段耗时（可选）
             
         Returns:
-            包含加密状态信息的字典
+            包含加密状态信息的字典；启用检查结果缓存时 cache_hit 表示是否来自缓存
         """
+        timer = StageTimer()
         try:
             if not os.path.exists(file_path):
                 return {
@@ -68,28 +184,26 @@ class PDFDecryptor:
                     "file_info": {}
                 }
             
-            reader = PdfReader(file_path)
-            file_info = {
-                "pages": len(reader.pages),
-                "title": reader.metadata.title if reader.metadata and reader.metadata.title else "未知",
-                "author": reader.metadata.author if reader.metadata and reader.metadata.author else "未知",
-                "creator": reader.metadata.creator if reader.metadata and reader.metadata.creator else "未知",
-                "producer": reader.metadata.producer if reader.metadata and reader.metadata.producer else "未知",
-                "file_size": os.path.getsize(file_path)
-            }
+            variant = "fast" if fast else "full"
+            stat = None
+            if self.check_cache is not None:
+                with timer.stage("cache_lookup"):
+                    stat = os.stat(file_path)
+                    cached = self.check_cache.get(file_path, variant, stat)
+                if cached is not None:
+                    cached["cache_hit"] = True
+                    return _with_timings(cached, timer, timings)
             
-            if not reader.is_encrypted:
-                return {
-                    "success": True,
-                    "is_encrypted": False,
-                    "file_info": file_info
-                }
+            if fast:
+                result = self._fast_check(file_path, timer)
+            else:
+                with self.backend.open(file_path, timer) as document:
+                    result = self._check_document(document)
             
-            return {
-                "success": True,
-                "is_encrypted": True,
-                "file_info": file_info
-            }
+            if stat is not None:
+                self.check_cache.put(file_path, variant, stat, result)
+                result["cache_hit"] = False
+            return _with_timings(result, timer, timings)
             
         except Exception as e:
             logger.error(f"检查PDF加密状态时出错: {e}")
@@ -101,7 +215,10 @@ class PDFDecryptor:
             }
     
     def decrypt_pdf(self, input_path: str, output_path: Optional[str] = None, 
-                   password: Optional[str] = None) -> Dict[str, Any]:
+                   password: Optional[str] = None, link: bool = False,
+                   engine: str = "clone",
+                   memory_limit: int = DEFAULT_MEMORY_LIMIT,
+                   timings: bool = False) -> Dict[str, Any]:
         """
         解密PDF文件
         
@@ -109,171 +226,425 @@ class PDFDecryptor:
             input_path: 输入PDF文件路径
             output_path: 输出PDF文件路径（可选）
             password: 解密密码（可选，如果不提供则尝试常见密码）
+            link: 文件未加密时是否用reflink或硬链接代替复制（可选）
+            engine: 写出方式（可选）：clone 整文档克隆，保留书签、命名目标、元数据和表单；
+                stream 按交叉引用表顺序逐个对象写出；raw 只去除加密层，对象流不解压、原样保留；
+                pages 逐页复制到新文档（只保留页面）
+            memory_limit: stream/raw 方式下同时驻留内存的对象大小上限，单位字节（可选）
+            timings: 是否在结果中附带各阶段耗时和密码尝试次数（可选）
             
         Returns:
             包含解密结果的字典
         """
+        timer = StageTimer()
         try:
+            # 未加密的文件不经过写出器，但无效的 engine 不论文件是否加密都应报错
+            if engine not in ENGINES:
+                return {
+                    "success": False,
+                    "error": f"不支持的写出方式: {engine}，可选值: {', '.join(ENGINES)}"
+                }
+            
             if not os.path.exists(input_path):
                 return {
                     "success": False,
                     "error": f"输入文件不存在: {input_path}"
                 }
             
-            reader = PdfReader(input_path)
+            # 先探测尾部，未加密的文件不必整体读入解析器
+            with timer.stage("probe"):
+                probe = probe_encryption(input_path)
+            if probe is not None and not probe["is_encrypted"]:
+                with timer.stage("copy"):
+                    result = self._passthrough(input_path, output_path, link)
+                return _with_timings(result, timer, timings)
             
-            if not reader.is_encrypted:
-                # 如果文件未加密，直接复制
-                if not output_path:
-                    base_name = os.path.splitext(os.path.basename(input_path))[0]
-                    output_path = os.path.join(
-                        os.path.dirname(input_path), 
-                        f"{base_name}_解密版.pdf"
-                    )
-                
-                with open(input_path, 'rb') as input_file:
-                    with open(output_path, 'wb') as output_file:
-                        output_file.write(input_file.read())
-                
-                return {
-                    "success": True,
-                    "message": "PDF文件未加密，已直接复制",
-                    "output_path": output_path,
-                    "password_used": ""
-                }
+            with self._admitted(input_path, timer), self.backend.open(input_path, timer) as document:
+                result = self._decrypt_document(document, output_path, password, link,
+                                                engine=engine, memory_limit=memory_limit)
+            return _with_timings(result, timer, timings)
             
-            # 尝试解密
-            passwords_to_try = [password] if password else self.common_passwords
-            successful_password = None
+        except Exception as e:
+            logger.error(f"解密PDF文件时出错: {e}")
+            return {
+                "success": False,
+                "error": f"解密PDF文件时出错: {str(e)}"
+            }
+    
+    def decrypt_bytes(self, data: Union[bytes, bytearray, memoryview],
+                      password: Optional[str] = None,
+                      engine: str = "clone",
+                      memory_limit: int = DEFAULT_MEMORY_LIMIT,
+                      timings: bool = False) -> Dict[str, Any]:
+        """
+        解密内存中的PDF，不读写磁盘
+        
+        Args:
+            data: PDF内容；通过memoryview读取，不复制整个文档
+            password: 解密密码（可选，如果不提供则尝试常见密码）
+            engine: 写出方式（可选），同 decrypt_pdf
+            memory_limit: stream/raw 方式下同时驻留内存的对象大小上限，单位字节（可选）
+            timings: 是否在结果中附带各阶段耗时和密码尝试次数（可选）
             
-            for pwd in passwords_to_try:
-                if pwd is None:
-                    continue
-                try:
-                    if reader.decrypt(pwd):
-                        successful_password = pwd
-                        break
-                except Exception:
-                    continue
+        Returns:
+            包含解密结果的字典，成功时 data 为解密后PDF内容的memoryview；
+            文件未加密时 data 是引用输入本身的memoryview，释放（release）或丢弃它之前输入不能改变大小
+        """
+        output = io.BytesIO()
+        # 解密过程中对输入的导出在返回前释放，调用方之后可以改变 bytearray 等输入的大小
+        with memoryview(data) as source, source.cast("B") as view:
+            result = self._decrypt_buffer(view, output, password, engine, memory_limit, timings, passthrough=False)
+        if result["success"]:
+            result["data"] = output.getbuffer() if result["is_encrypted"] else memoryview(data).cast("B")
+        return result
+    
+    def decrypt_stream(self, input_stream: Union[BinaryIO, bytes, bytearray, memoryview],
+                       output_stream: BinaryIO,
+                       password: Optional[str] = None,
+                       engine: str = "clone",
+                       memory_limit: int = DEFAULT_MEMORY_LIMIT,
+                       timings: bool = False) -> Dict[str, Any]:
+        """
+        从可读流（或缓冲区）读取PDF，把解密结果写入可写流，不读写磁盘上的临时文件
+        
+        Args:
+            input_stream: 可读的二进制流或bytes-like对象；BytesIO 通过 getbuffer 读取，不复制
+            output_stream: 可写的二进制流，只需支持 write；写出失败时其中可能已有部分内容
+            password: 解密密码（可选，如果不提供则尝试常见密码）
+            engine: 写出方式（可选），同 decrypt_pdf
+            memory_limit: stream/raw 方式下同时驻留内存的对象大小上限，单位字节（可选）
+            timings: 是否在结果中附带各阶段耗时和密码尝试次数（可选）
             
-            if not successful_password:
+        Returns:
+            包含解密结果的字典
+        """
+        if isinstance(input_stream, (bytes, bytearray, memoryview)):
+            source = memoryview(input_stream)
+        elif isinstance(input_stream, io.BytesIO):
+            with input_stream.getbuffer() as buffer:
+                source = buffer[input_stream.tell():]
+        else:
+            source = memoryview(input_stream.read())
+        # 返回前释放对输入的导出，BytesIO 之后仍可写入
+        with source, source.cast("B") as view:
+            return self._decrypt_buffer(view, output_stream, password, engine, memory_limit, timings)
+    
+    def _decrypt_buffer(self, view: memoryview, output: BinaryIO, password: Optional[str],
+                        engine: str, memory_limit: int, timings: bool,
+                        passthrough: bool = True) -> Dict[str, Any]:
+        """解密内存中的文档并写入output；未加密的文档在passthrough为True时原样写入，否则由调用方直接使用输入"""
+        timer = StageTimer()
+        try:
+            if engine not in ENGINES:
                 return {
                     "success": False,
-                    "error": "无法解密PDF文件，所有密码都失败"
+                    "error": f"不支持的写出方式: {engine}，可选值: {', '.join(ENGINES)}"
                 }
             
-            # 生成输出路径
-            if not output_path:
-                base_name = os.path.splitext(os.path.basename(input_path))[0]
-                output_path = os.path.join(
-                    os.path.dirname(input_path), 
-                    f"{base_name}_解密版.pdf"
-                )
-            
-            # 写入解密后的文件
-            writer = PdfWriter()
-            for page in reader.pages:
-                writer.add_page(page)
-            
-            with open(output_path, 'wb') as output_file:
-                writer.write(output_file)
+            with self._admitted(None, timer, len(view)), \
+                    self.backend.open(MEMORY_SOURCE, timer, data=view) as document:
+                if not document.is_encrypted:
+                    if passthrough:
+                        with timer.stage("copy"):
+                            output.write(view)
+                    result = {
+                        "success": True,
+                        "message": "PDF文件未加密，已原样输出",
+                        "password_used": ""
+                    }
+                else:
+                    result = self._decrypt_document(document, password=password, engine=engine,
+                                                    memory_limit=memory_limit, output=output)
+            result["is_encrypted"] = document.is_encrypted
+            return _with_timings(result, timer, timings)
             
+        except Exception as e:
+            logger.error(f"解密内存中的PDF时出错: {e}")
+            return {
+                "success": False,
+                "error": f"解密内存中的PDF时出错: {str(e)}"
+            }
+    
+    def _fast_check(self, file_path: str, timer: Optional[StageTimer] = None) -> Dict[str, Any]:
+        """快速探测加密状态；交叉引用流或损坏的文件回退到完整解析器，但仍不读取页面"""
+        if timer is None:
+            timer = StageTimer()
+        with timer.stage("probe"):
+            probe = probe_encryption(file_path)
+        if probe is not None:
             return {
                 "success": True,
-                "message": "PDF文件解密成功",
-                "output_path": output_path,
-                "password_used": successful_password
+                "is_encrypted": probe["is_encrypted"],
+                "encryption": probe["encryption"],
+                "file_info": {"file_size": os.path.getsize(file_path)},
+                "probe": "trailer"
             }
-            
-        except Exception as e:
-            logger.error(f"解密PDF文件时出错: {e}")
+        
+        with self.backend.open(file_path, timer) as document:
+            return {
+                "success": True,
+                "is_encrypted": document.is_encrypted,
+                "encryption": document.encryption_info(),
+                "file_info": {"file_size": document.file_size},
+                "probe": "full"
+            }
+    
+    def _check_document(self, document: PdfDocument) -> Dict[str, Any]:
+        """根据已打开的文档生成加密状态信息"""
+        with document.timer.stage("metadata"):
+            file_info = document.metadata()
+        return {
+            "success": True,
+            "is_encrypted": document.is_encrypted,
+            "file_info": file_info
+        }
+    
+    def _passthrough(self, input_path: str, output_path: Optional[str] = None,
+                     link: bool = False) -> Dict[str, Any]:
+        """未加密的文件直接由内核复制（或链接）到输出路径"""
+        if not output_path:
+            output_path = default_output_path(input_path)
+        
+        copy_method = copy_file(input_path, output_path, link=link)
+        
+        return {
+            "success": True,
+            "message": "PDF文件未加密，已直接复制",
+            "output_path": output_path,
+            "password_used": "",
+            "copy_method": copy_method
+        }
+    
+    def _decrypt_document(self, document: PdfDocument, output_path: Optional[str] = None,
+                          password: Optional[str] = None, link: bool = False,
+                          ranking: Optional[PasswordRanking] = None, engine: str = "clone",
+                          memory_limit: int = DEFAULT_MEMORY_LIMIT,
+                          archive: Optional[ArchiveWriter] = None,
+                          output: Optional[BinaryIO] = None) -> Dict[str, Any]:
+        """
+        解密已打开的文档并写出，复用已打开的文档
+        
+        ranking不为None时按批量任务内的命中次数排序候选密码，并记录本次命中。
+        archive不为None时写为归档中名为output_path的成员，不在磁盘上生成单独的文件。
+        output不为None时写入该可写流，忽略output_path。
+        """
+        input_path = document.path
+        
+        if not document.is_encrypted:
+            # 如果文件未加密，直接复制
+            return self._passthrough(input_path, output_path, link)
+        
+        # 未给出密码时，已知文档先尝试缓存中的密码；给出的密码成功后记入缓存
+        fingerprint = None
+        cached_password = None
+        if self.password_cache is not None:
+            with document.timer.stage("password_cache"):
+                fingerprint = document.fingerprint()
+                if not password:
+                    cached_password = self.password_cache.get(fingerprint)
+        
+        # 尝试解密
+        if password:
+            passwords_to_try = [password]
+        elif ranking is not None:
+            passwords_to_try = ranking.ordered()
+        else:
+            passwords_to_try = self.common_passwords
+        if cached_password is not None:
+            passwords_to_try = [cached_password] + [p for p in passwords_to_try if p != cached_password]
+        successful_password = None
+        attempts = 0
+        
+        with document.timer.stage("password_loop"):
+            for pwd in passwords_to_try:
+                if pwd is None:
+                    continue
+                attempts += 1
+                if document.try_password(pwd):
+                    successful_password = pwd
+                    break
+        
+        if successful_password is None:
             return {
                 "success": False,
-                "error": f"解密PDF文件时出错: {str(e)}"
+                "error": "无法解密PDF文件，所有密码都失败",
+                "attempts": attempts
+            }
+        
+        if ranking is not None and not password:
+            ranking.record(successful_password)
+        cache_hit = cached_password is not None and successful_password == cached_password
+        if fingerprint is not None and not cache_hit:
+            with document.timer.stage("password_cache"):
+                self.password_cache.put(fingerprint, successful_password)
+        
+        # 生成输出路径
+        if not output_path and output is None:
+            output_path = default_output_path(input_path)
+        
+        # 写入解密后的文件
+        try:
+            if output is not None:
+                with PositionWriter(output) as writer:
+                    document.write_decrypted(writer, engine, memory_limit)
+                    writer.flush()
+            elif archive is not None:
+                with archive.entry(output_path) as writer:
+                    document.write_decrypted(writer, engine, memory_limit)
+            else:
+                document.write_decrypted(output_path, engine, memory_limit)
+        except MemoryLimitExceeded as e:
+            # 归档中的成员已由 entry 撤销；输出流中可能已写入部分内容，由调用方丢弃
+            if archive is None and output is None:
+                os.remove(output_path)
+            return {
+                "success": False,
+                "error": f"超出内存上限: {e}",
+                "password_used": successful_password,
+                "attempts": attempts
             }
+        
+        result = {
+            "success": True,
+            "message": "PDF文件解密成功",
+            "output_path": output_path,
+            "password_used": successful_password,
+            "password_cache_hit": cache_hit,
+            "attempts": attempts
+        }
+        if archive is not None:
+            result["output_path"] = archive.path
+            result["archive_member"] = output_path
+        elif output is not None:
+            del result["output_path"]
+        return result
     
-    def batch_decrypt_pdfs(self, directory: str, password: Optional[str] = None) -> Dict[str, Any]:
+    def batch_decrypt_pdfs(self, directory: str, password: Optional[str] = None,
+                           max_workers: Optional[int] = None,
+                           incremental: bool = False,
+                           progress_callback: Optional[ProgressCallback] = None,
+                           report_path: Optional[str] = None,
+                           max_results: Optional[int] = None,
+                           recursive: bool = False,
+                           include: Optional[List[str]] = None,
+                           exclude: Optional[List[str]] = None,
+                           max_depth: Optional[int] = None,
+                           timings: bool = False,
+                           cancel: Optional[threading.Event] = None,
+                           output_archive: Optional[str] = None) -> Dict[str, Any]:
         """
         批量解密目录中的所有PDF文件
         
         Args:
             directory: 目录路径
             password: 解密密码（可选）
+            max_workers: 并行工作进程数（可选，默认或为1时逐个处理）
+            incremental: 是否使用目录下的状态清单跳过未变化且已处理成功的文件（可选）
+            progress_callback: 每处理完一个文件调用一次的进度回调（可选）
+            report_path: 把每个文件的完整结果逐行写入该NDJSON文件（可选）
+            max_results: 返回结果中最多保留的单文件记录数（可选，默认全部保留）
+            recursive: 是否递归处理子目录（可选）
+            include: 文件必须匹配的通配符列表（可选）
+            exclude: 排除的文件或目录通配符列表（可选）
+            max_depth: 递归的最大深度（可选，默认不限）
+            timings: 是否在结果中附带汇总的各阶段耗时（可选）；阶段耗时是所有文件（包括
+                各工作进程中）的累加值，total_ms 是整个批量任务的实际耗时
+            cancel: 取消事件（可选）；设置后不再开始处理新的文件，已在处理的文件完成后返回，
+                结果中 cancelled 为True
+            output_archive: 把解密后的文档写入该 .zip 或 .tar 归档（可选），成员名为文件的相对路径，
+                不生成 _解密版.pdf 文件；各文件在当前进程中逐个写入归档，忽略max_workers，不能与incremental同时使用
             
         Returns:
             包含批量解密结果的字典
         """
+        timer = StageTimer()
         try:
             if not os.path.exists(directory):
                 return {
                     "success": False,
                     "error": f"目录不存在: {directory}"
                 }
-            
-            # 获取目录中所有PDF文件
-            pdf_files = []
-            for file in os.listdir(directory):
-                if file.lower().endswith('.pdf') and not file.endswith('_解密版.pdf'):
-                    pdf_files.append(file)
+            if output_archive and incremental:
+                return {
+                    "success": False,
+                    "error": "output_archive 不能与 incremental 同时使用：跳过的文件不会出现在新的归档中"
+                }
             
             results = {
                 "success": True,
-                "total_files": len(pdf_files),
+                "total_files": 0,
                 "processed_files": 0,
                 "encrypted_files": 0,
                 "decrypted_files": 0,
                 "failed_files": 0,
+                "password_attempts": 0,
                 "results": []
             }
             
-            for pdf_file in pdf_files:
-                input_path = os.path.join(directory, pdf_file)
-                
-                # 检查加密状态
-                encryption_status = self.check_pdf_encryption(input_path)
-                
-                if not encryption_status["success"]:
-                    results["failed_files"] += 1
-                    results["results"].append({
-                        "file": pdf_file,
-                        "success": False,
-                        "error": encryption_status["error"]
-                    })
-                    continue
-                
-                results["processed_files"] += 1
-                
-                if not encryption_status["is_encrypted"]:
-                    results["results"].append({
-                        "file": pdf_file,
-                        "success": True,
-                        "is_encrypted": False,
-                        "message": "文件未加密"
-                    })
-                    continue
-                
-                results["encrypted_files"] += 1
-                
-                # 尝试解密
-                decrypt_result = self.decrypt_pdf(input_path, password=password)
-                
-                if decrypt_result["success"]:
-                    results["decrypted_files"] += 1
-                    results["results"].append({
-                        "file": pdf_file,
-                        "success": True,
-                        "is_encrypted": True,
-                        "output_path": decrypt_result["output_path"],
-                        "password_used": decrypt_result["password_used"]
-                    })
-                else:
-                    results["failed_files"] += 1
-                    results["results"].append({
-                        "file": pdf_file,
-                        "success": False,
-                        "is_encrypted": True,
-                        "error": decrypt_result["error"]
-                    })
+            manifest = BatchManifest(directory) if incremental else None
+            if manifest is not None:
+                results["skipped_files"] = 0
+            stats: Dict[str, os.stat_result] = {}
+            scan_state = {"done": False}
+            
+            def pending_files() -> Iterator[str]:
+                """扫描器产出的文件中需要处理的部分；增量模式下跳过未变化的文件"""
+                for rel_path, entry in iter_pdf_files(directory, recursive, include, exclude, max_depth):
+                    results["total_files"] += 1
+                    if manifest is not None:
+                        stat = entry.stat()
+                        if manifest.is_current(rel_path, stat):
+                            results["skipped_files"] += 1
+                            continue
+                        stats[rel_path] = stat
+                    yield rel_path
+                scan_state["done"] = True
+            
+            # 递归扫描以生成器形式边扫描边解密；只扫描顶层时先取得完整列表，进度中可报告总数
+            pdf_files: Iterable[str] = pending_files() if recursive else list(pending_files())
+            
+            def progress_total() -> Optional[int]:
+                if not scan_state["done"]:
+                    return None
+                return results["total_files"] - results.get("skipped_files", 0)
+            
+            archive = None
+            if output_archive:
+                results["output_archive"] = output_archive
+                archive = ArchiveWriter(output_archive)
+            if report_path:
+                results["report_path"] = report_path
+            report = open(report_path, 'w', encoding='utf-8') if report_path else None
+            
+            # 批量任务内共享的候选密码排序，命中多的密码优先尝试
+            ranking = PasswordRanking(self.common_passwords)
+            done = 0
+            try:
+                for file_result in self._iter_batch_results(directory, pdf_files, password, max_workers, ranking,
+                                                            cancel, archive):
+                    timer.merge(file_result.pop("timings", {}))
+                    self._accumulate_batch_result(results, file_result, max_results)
+                    if manifest is not None:
+                        manifest.record(file_result["file"], stats.pop(file_result["file"]), file_result)
+                    if report is not None:
+                        report.write(json.dumps(file_result, ensure_ascii=False) + "\n")
+                    done += 1
+                    if progress_callback is not None:
+                        progress_callback(done, progress_total(), file_result)
+            finally:
+                if manifest is not None:
+                    manifest.close()
+                if report is not None:
+                    report.close()
+                if archive is not None:
+                    archive.close()
+            if manifest is not None:
+                manifest.compact()
+            results["password_hits"] = ranking.hits()
+            if cancel is not None and cancel.is_set():
+                results["cancelled"] = True
+            if timings:
+                results["timings"] = timer.report(results["password_attempts"])
             
             return results
             
@@ -282,4 +653,234 @@ class PDFDecryptor:
             return {
                 "success": False,
                 "error": f"批量解密PDF文件时出错: {str(e)}"
-            }
\ No newline at end of file
+            }
+    
+    def process_batch_file(self, directory: str, pdf_file: str, password: Optional[str] = None,
+                           ranking: Optional[PasswordRanking] = None) -> Dict[str, Any]:
+        """
+        按批量解密的单文件流程处理目录中的一个文件：未加密的跳过，加密的写出"_解密版"
+        
+        供目录监视等逐个处理文件的调用方使用。
+        
+        Args:
+            directory: 文件所在的目录
+            pdf_file: 相对于directory的文件路径
+            password: 解密密码（可选，如果不提供则尝试常见密码）
+            ranking: 候选密码排序（可选），在多次调用之间共享命中次数
+            
+        Returns:
+            与 batch_decrypt_pdfs 结果中单个文件相同的字典
+        """
+        result = self._process_batch_file(directory, pdf_file, password, ranking)
+        result.pop("timings", None)
+        return result
+    
+    def _process_batch_file(self, directory: str, pdf_file: str, password: Optional[str],
+                            ranking: Optional[PasswordRanking] = None,
+                            archive: Optional[ArchiveWriter] = None) -> Dict[str, Any]:
+        """
+        处理批量任务中的单个文件：检查加密状态，必要时解密（archive不为None时写入归档）
+        
+        Returns:
+            单个文件的处理结果，timings 字段由批量任务汇总后移除
+        """
+        timer = StageTimer()
+        with self._admitted(os.path.join(directory, pdf_file), timer):
+            result = self._process_opened_batch_file(directory, pdf_file, password, ranking, timer, archive)
+        result["timings"] = timer.report()
+        return result
+    
+    def _process_opened_batch_file(self, directory: str, pdf_file: str, password: Optional[str],
+                                   ranking: Optional[PasswordRanking], timer: StageTimer,
+                                   archive: Optional[ArchiveWriter] = None) -> Dict[str, Any]:
+        input_path = os.path.join(directory, pdf_file)
+        
+        # 打开并解析一次，检查与解密共用同一个文档对象
+        try:
+            document = self.backend.open(input_path, timer)
+        except Exception as e:
+            logger.error(f"检查PDF加密状态时出错: {e}")
+            return {
+                "file": pdf_file,
+                "success": False,
+                "error": f"检查PDF加密状态时出错: {str(e)}"
+            }
+        
+        with document:
+            if not document.is_encrypted:
+                return {
+                    "file": pdf_file,
+                    "success": True,
+                    "is_encrypted": False,
+                    "message": "文件未加密"
+                }
+            
+            # 尝试解密
+            try:
+                # 写入归档时成员名为文件的相对路径
+                decrypt_result = self._decrypt_document(document, pdf_file if archive is not None else None,
+                                                        password=password, ranking=ranking, archive=archive)
+            except Exception as e:
+                logger.error(f"解密PDF文件时出错: {e}")
+                decrypt_result = {
+                    "success": False,
+                    "error": f"解密PDF文件时出错: {str(e)}"
+                }
+        
+        if decrypt_result["success"]:
+            file_result = {
+                "file": pdf_file,
+                "success": True,
+                "is_encrypted": True,
+                "output_path": decrypt_result["output_path"],
+                "password_used": decrypt_result["password_used"],
+                "attempts": decrypt_result["attempts"]
+            }
+            if archive is not None:
+                file_result["archive_member"] = decrypt_result["archive_member"]
+            return file_result
+        
+        return {
+            "file": pdf_file,
+            "success": False,
+            "is_encrypted": True,
+            "error": decrypt_result["error"],
+            "attempts": decrypt_result.get("attempts", 0)
+        }
+    
+    def _iter_batch_results(self, directory: str, pdf_files: Iterable[str],
+                            password: Optional[str],
+                            max_workers: Optional[int] = None,
+                            ranking: Optional[PasswordRanking] = None,
+                            cancel: Optional[threading.Event] = None,
+                            archive: Optional[ArchiveWriter] = None) -> Iterator[Dict[str, Any]]:
+        """
+        逐个产出批量任务中每个文件的处理结果
+        
+        max_workers大于1时按块分发到进程池，结果按完成顺序产出。
+        pdf_files可以是生成器：同时在途的块数有上限，文件边产出边分发。
+        ranking的命中计数放在共享数组中，由所有工作进程共用。
+        cancel被设置后不再分发新的文件，尚未开始的块被取消，正在处理的块完成后结束。
+        写入归档（archive不为None）时成员只能逐个写入，所有文件都在当前进程中逐个处理。
+        设置了内存预算时，每个块在提交前按其中最大文件的估算开销申请预算，块完成后归还。
+        """
+        def cancelled() -> bool:
+            return cancel is not None and cancel.is_set()
+        
+        if ranking is None:
+            ranking = PasswordRanking(self.common_passwords)
+        
+        if isinstance(pdf_files, list) and len(pdf_files) <= 1:
+            max_workers = None
+        if not max_workers or max_workers <= 1 or archive is not None:
+            for pdf_file in pdf_files:
+                if cancelled():
+                    return
+                yield self._process_batch_file(directory, pdf_file, password, ranking, archive)
+            return
+        
+        if isinstance(pdf_files, list):
+            max_workers = min(max_workers, len(pdf_files))
+            chunksize = max(1, min(16, len(pdf_files) // (max_workers * 4)))
+        else:
+            chunksize = STREAM_CHUNKSIZE
+        files = iter(pdf_files)
+        
+        # 服务器在线程池中调用本方法，fork不安全，统一使用spawn
+        mp_context = multiprocessing.get_context("spawn")
+        ranking.counts = mp_context.Array("i", list(ranking.counts[:]))
+        # 每个在途块占用的内存预算；工作进程逐个处理块内文件，块的开销按其中最大的文件估算
+        reserved: Dict[Any, int] = {}
+        # 预算不足、等待在途块完成后再提交的块
+        waiting: List[List[str]] = []
+        
+        def release(future: Any) -> None:
+            granted = reserved.pop(future)
+            if self.memory_budget is not None:
+                self.memory_budget.release(granted)
+        
+        try:
+            with ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=mp_context,
+                initializer=_init_batch_worker,
+                initargs=(
+                    ranking.candidates,
+                    self.password_cache.path if self.password_cache else None,
+                    ranking.counts,
+                    self.backend.name,
+                ),
+            ) as executor:
+                futures: Dict[Any, List[str]] = {}
+                
+                def submit_chunks() -> None:
+                    while len(futures) < max_workers * 2 and not cancelled():
+                        chunk = waiting.pop() if waiting else list(islice(files, chunksize))
+                        if not chunk:
+                            return
+                        granted = 0
+                        if self.memory_budget is not None:
+                            cost = max(estimate_cost(os.path.join(directory, pdf_file)) for pdf_file in chunk)
+                            # 只有没有在途块时才阻塞等待，否则在途块的预算要由本循环归还
+                            if futures:
+                                granted = self.memory_budget.try_acquire(cost)
+                                if granted is None:
+                                    waiting.append(chunk)
+                                    return
+                            else:
+                                granted = self.memory_budget.acquire(cost)
+                        future = executor.submit(_batch_worker, directory, chunk, password)
+                        futures[future] = chunk
+                        reserved[future] = granted
+                
+                submit_chunks()
+                while futures:
+                    finished, _ = wait(futures, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        chunk = futures.pop(future)
+                        release(future)
+                        try:
+                            chunk_results = future.result()
+                        except Exception as e:
+                            logger.error(f"批量解密工作进程出错: {e}")
+                            chunk_results = [
+                                {"file": pdf_file, "success": False, "error": f"工作进程出错: {str(e)}"}
+                                for pdf_file in chunk
+                            ]
+                        for file_result in chunk_results:
+                            yield file_result
+                    if cancelled():
+                        for future in list(futures):
+                            if future.cancel():
+                                futures.pop(future)
+                                release(future)
+                    submit_chunks()
+        finally:
+            # 提前结束（取消或出错）时，进程池等待在途块完成后再归还它们的预算
+            for future in list(reserved):
+                release(future)
+    
+    @staticmethod
+    def _accumulate_batch_result(results: Dict[str, Any], file_result: Dict[str, Any],
+                                 max_results: Optional[int] = None) -> None:
+        """将单个文件的结果累加到批量结果的计数器中，单文件记录最多保留max_results条"""
+        if max_results is None or len(results["results"]) < max_results:
+            results["results"].append(file_result)
+        else:
+            results["results_truncated"] = True
+        
+        if "is_encrypted" not in file_result:
+            # 加密状态检查失败
+            results["failed_files"] += 1
+            return
+        
+        results["processed_files"] += 1
+        results["password_attempts"] += file_result.get("attempts", 0)
+        if not file_result["is_encrypted"]:
+            return
+        
+        results["encrypted_files"] += 1
+        if file_result["success"]:
+            results["decrypted_files"] += 1
+        else:
+            results["failed_files"] += 1
\ No newline at end of file
@@ -0,0 +1,378 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+PDF加密状态快速探测
+
+只读取文件尾部的 startxref、交叉引用表和 trailer，以及 /Encrypt 字典本身，
+不解析页面树。文件通过 mmap 映射，未访问的部分不会被读入内存。
+
+交叉引用流（PDF 1.5+ 的 xref stream）或损坏的文件无法用这种方式探测，
+此时 probe_encryption 返回 None，由调用方回退到完整解析器。
+"""
+
+import mmap
+import re
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+# 在文件末尾多少字节内查找 startxref（规范要求在最后1024字节内，这里放宽）
+TAIL_SIZE = 4096
+# 解析单个字典时最多读取的字节数
+OBJECT_WINDOW = 64 * 1024
+# 沿 /Prev 链回溯的最大次数
+MAX_XREF_SECTIONS = 32
+
+_WHITESPACE = b" \t\r\n\x0c\x00"
+_DELIMITERS = b"()<>[]{}/%"
+_NUMBER_RE = re.compile(rb"[+-]?(?:\d+\.?\d*|\.\d+)")
+_REF_TAIL_RE = re.compile(rb"\s+(\d+)\s+R(?![^\s()<>\[\]{}/%])")
+_STARTXREF_RE = re.compile(rb"startxref\s+(\d+)")
+_SUBSECTION_RE = re.compile(rb"\s*(\d+)\s+(\d+)[ \t]*\r?\n?")
+_XREF_ENTRY_RE = re.compile(rb"(\d{10}) (\d{5}) ([nf])")
+_OBJ_HEADER_RE = re.compile(rb"\s*(\d+)\s+(\d+)\s+obj\b")
+_ESCAPES = {
+    ord("n"): b"\n", ord("r"): b"\r", ord("t"): b"\t", ord("b"): b"\b",
+    ord("f"): b"\x0c", ord("("): b"(", ord(")"): b")", ord("\\"): b"\\",
+}
+
+
+class ProbeError(Exception):
+    """无法通过尾部快速探测，需要回退到完整解析"""
+
+
+class Ref(NamedTuple):
+    """间接对象引用 N G R"""
+    num: int
+    gen: int
+
+
+def _skip_whitespace(data: bytes, pos: int) -> int:
+    length = len(data)
+    while pos < length:
+        byte = data[pos]
+        if byte in _WHITESPACE:
+            pos += 1
+        elif byte == ord("%"):
+            while pos < length and data[pos] not in b"\r\n":
+                pos += 1
+        else:
+            break
+    return pos
+
+
+def _parse_name(data: bytes, pos: int) -> Tuple[str, int]:
+    end = pos + 1
+    while end < len(data) and data[end] not in _WHITESPACE and data[end] not in _DELIMITERS:
+        end += 1
+    raw = re.sub(rb"#([0-9A-Fa-f]{2})", lambda m: bytes([int(m.group(1), 16)]), data[pos:end])
+    return raw.decode("latin-1"), end
+
+
+def _parse_literal_string(data: bytes, pos: int) -> Tuple[bytes, int]:
+    out = bytearray()
+    depth = 1
+    pos += 1
+    while pos < len(data):
+        byte = data[pos]
+        if byte == ord("\\"):
+            pos += 1
+            if pos >= len(data):
+                break
+            byte = data[pos]
+            if byte in _ESCAPES:
+                out += _ESCAPES[byte]
+                pos += 1
+            elif ord("0") <= byte <= ord("7"):
+                end = pos
+                while end < pos + 3 and end < len(data) and ord("0") <= data[end] <= ord("7"):
+                    end += 1
+                out.append(int(data[pos:end], 8) & 0xFF)
+                pos = end
+            elif byte in b"\r\n":
+                # 行尾续行
+                pos += 2 if data[pos:pos + 2] == b"\r\n" else 1
+            else:
+                out.append(byte)
+                pos += 1
+            continue
+        if byte == ord("("):
+            depth += 1
+        elif byte == ord(")"):
+            depth -= 1
+            if depth == 0:
+                return bytes(out), pos + 1
+        out.append(byte)
+        pos += 1
+    raise ProbeError("字符串未结束")
+
+
+def _parse_hex_string(data: bytes, pos: int) -> Tuple[bytes, int]:
+    end = data.find(b">", pos)
+    if end < 0:
+        raise ProbeError("十六进制字符串未结束")
+    digits = bytes(b for b in data[pos + 1:end] if b not in _WHITESPACE)
+    if len(digits) % 2:
+        digits += b"0"
+    try:
+        return bytes.fromhex(digits.decode("ascii")), end + 1
+    except ValueError:
+        raise ProbeError("十六进制字符串格式错误")
+
+
+def parse_object(data: bytes, pos: int) -> Tuple[Any, int]:
+    """
+    解析一个PDF直接对象（不含流）
+
+    Returns:
+        (对象值, 结束位置)。名称为以"/"开头的str，字符串为bytes，
+        字典为dict，数组为list，间接引用为Ref
+    """
+    pos = _skip_whitespace(data, pos)
+    if pos >= len(data):
+        raise ProbeError("意外的数据结尾")
+
+    if data.startswith(b"<<", pos):
+        result: Dict[str, Any] = {}
+        pos += 2
+        while True:
+            pos = _skip_whitespace(data, pos)
+            if data.startswith(b">>", pos):
+                return result, pos + 2
+            if pos >= len(data) or data[pos] != ord("/"):
+                raise ProbeError("字典键必须是名称")
+            key, pos = _parse_name(data, pos)
+            result[key], pos = parse_object(data, pos)
+
+    byte = data[pos]
+    if byte == ord("["):
+        items: List[Any] = []
+        pos += 1
+        while True:
+            pos = _skip_whitespace(data, pos)
+            if pos >= len(data):
+                raise ProbeError("数组未结束")
+            if data[pos] == ord("]"):
+                return items, pos + 1
+            item, pos = parse_object(data, pos)
+            items.append(item)
+    if byte == ord("/"):
+        return _parse_name(data, pos)
+    if byte == ord("("):
+        return _parse_literal_string(data, pos)
+    if byte == ord("<"):
+        return _parse_hex_string(data, pos)
+
+    for keyword, value in ((b"true", True), (b"false", False), (b"null", None)):
+        if data.startswith(keyword, pos):
+            return value, pos + len(keyword)
+
+    match = _NUMBER_RE.match(data, pos)
+    if not match:
+        raise ProbeError(f"无法识别的对象，偏移 {pos}")
+    token = match.group(0)
+    if b"." in token:
+        return float(token), match.end()
+    ref = _REF_TAIL_RE.match(data, match.end())
+    if ref and not token.startswith((b"+", b"-")):
+        return Ref(int(token), int(ref.group(1))), ref.end()
+    return int(token), match.end()
+
+
+def _read_xref_section(mm: mmap.mmap, offset: int) -> Tuple[Dict[str, Any], List[Tuple[int, int, int]]]:
+    """
+    读取传统交叉引用表及其trailer
+
+    Returns:
+        (trailer字典, [(起始对象号, 条目数, 条目起始偏移), ...])
+    """
+    if not mm[offset:offset + 4] == b"xref":
+        # 交叉引用流或偏移错误
+        raise ProbeError("startxref 未指向传统交叉引用表")
+
+    pos = offset + 4
+    subsections = []
+    while True:
+        window = mm[pos:pos + 64]
+        skip = _skip_whitespace(window, 0)
+        if window.startswith(b"trailer", skip):
+            pos += skip + len(b"trailer")
+            break
+        match = _SUBSECTION_RE.match(window)
+        if not match:
+            raise ProbeError("交叉引用表格式错误")
+        first, count = int(match.group(1)), int(match.group(2))
+        entries = pos + match.end()
+        subsections.append((first, count, entries))
+        # 每个条目固定20字节，直接跳过而不逐条读取
+        pos = entries + count * 20
+
+    trailer, _ = parse_object(mm[pos:pos + OBJECT_WINDOW], 0)
+    if not isinstance(trailer, dict):
+        raise ProbeError("trailer 不是字典")
+    return trailer, subsections
+
+
+def _find_object_offset(mm: mmap.mmap, ref: Ref,
+                        subsections: List[Tuple[int, int, int]]) -> Optional[int]:
+    for first, count, entries in subsections:
+        if first <= ref.num < first + count:
+            entry = entries + (ref.num - first) * 20
+            match = _XREF_ENTRY_RE.match(mm[entry:entry + 20])
+            if not match:
+                raise ProbeError("交叉引用条目格式错误")
+            if match.group(3) != b"n" or int(match.group(2)) != ref.gen:
+                return None
+            return int(match.group(1))
+    return None
+
+
+def _resolve(mm: mmap.mmap, value: Any, xref_offset: int, trailer: Dict[str, Any],
+             subsections: List[Tuple[int, int, int]]) -> Any:
+    """解析间接引用：先查当前交叉引用段，找不到时沿 /Prev 回溯"""
+    if not isinstance(value, Ref):
+        return value
+
+    for _ in range(MAX_XREF_SECTIONS):
+        offset = _find_object_offset(mm, value, subsections)
+        if offset is not None:
+            header = _OBJ_HEADER_RE.match(mm[offset:offset + 64])
+            if not header or (int(header.group(1)), int(header.group(2))) != tuple(value):
+                raise ProbeError("对象偏移与对象头不一致")
+            obj, _ = parse_object(mm[offset + header.end():offset + OBJECT_WINDOW], 0)
+            return obj
+        prev = trailer.get("/Prev")
+        if not isinstance(prev, int) or prev == xref_offset:
+            break
+        xref_offset = prev
+        trailer, subsections = _read_xref_section(mm, xref_offset)
+    raise ProbeError(f"找不到对象 {value.num} {value.gen}")
+
+
+def describe_encryption(encrypt: Dict[str, Any]) -> Dict[str, Any]:
+    """从 /Encrypt 字典中提取过滤器、版本、修订号、密钥长度和权限位"""
+    def _int(value: Any) -> Optional[int]:
+        return int(value) if isinstance(value, int) else None
+
+    version = _int(encrypt.get("/V")) or 0
+    length = _int(encrypt.get("/Length"))
+    if length is None:
+        length = {4: 128, 5: 256}.get(version, 40)
+    if version == 5:
+        length = 256
+    filter_name = encrypt.get("/Filter")
+    return {
+        "filter": str(filter_name)[1:] if isinstance(filter_name, str) else None,
+        "v": version,
+        "r": _int(encrypt.get("/R")),
+        "length": length,
+        "permissions": _int(encrypt.get("/P")),
+    }
+
+
+def _read_trailer(mm: mmap.mmap) -> Tuple[Dict[str, Any], int, List[Tuple[int, int, int]]]:
+    """读取最后一个交叉引用段：(trailer, 交叉引用表偏移, 子段列表)"""
+    size = len(mm)
+    tail = mm[max(0, size - TAIL_SIZE):]
+    index = tail.rfind(b"startxref")
+    match = _STARTXREF_RE.match(tail, index) if index >= 0 else None
+    if not match:
+        raise ProbeError("找不到 startxref")
+
+    xref_offset = int(match.group(1))
+    if xref_offset >= size:
+        raise ProbeError("startxref 偏移超出文件范围")
+    trailer, subsections = _read_xref_section(mm, xref_offset)
+    return trailer, xref_offset, subsections
+
+
+def probe_encryption(file_path: str) -> Optional[Dict[str, Any]]:
+    """
+    通过文件尾部快速判断PDF是否加密
+
+    Args:
+        file_path: PDF文件路径
+
+    Returns:
+        包含 is_encrypted 与 encryption（加密参数，未加密时为None）的字典；
+        无法快速探测时返回None
+    """
+    try:
+        with open(file_path, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                trailer, xref_offset, subsections = _read_trailer(mm)
+
+                encrypt = trailer.get("/Encrypt")
+                if encrypt is None:
+                    return {"is_encrypted": False, "encryption": None}
+
+                encrypt = _resolve(mm, encrypt, xref_offset, trailer, subsections)
+                if not isinstance(encrypt, dict):
+                    raise ProbeError("/Encrypt 不是字典")
+                encrypt = {
+                    key: _resolve(mm, value, xref_offset, trailer, subsections)
+                    for key, value in encrypt.items()
+                    if key in ("/Filter", "/V", "/R", "/Length", "/P")
+                }
+                return {"is_encrypted": True, "encryption": describe_encryption(encrypt)}
+    except (ProbeError, ValueError, OSError, IndexError):
+        # ValueError: 空文件无法mmap
+        return None
+
+
+def read_encryption_ids(file_path: str) -> Optional[Tuple[bytes, bytes, bytes]]:
+    """
+    读取 trailer /ID 的第一个元素与 /Encrypt 中的 /O、/U，用于计算文档指纹
+
+    Returns:
+        (ID[0], O, U) 原始字节；文件未加密、缺少 /ID 或无法快速探测时返回None
+    """
+    try:
+        with open(file_path, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                trailer, xref_offset, subsections = _read_trailer(mm)
+                if "/Encrypt" not in trailer or "/ID" not in trailer:
+                    return None
+
+                def resolve(value: Any) -> Any:
+                    return _resolve(mm, value, xref_offset, trailer, subsections)
+
+                id_entry = resolve(trailer["/ID"])
+                encrypt = resolve(trailer["/Encrypt"])
+                if not isinstance(id_entry, list) or not id_entry or not isinstance(encrypt, dict):
+                    raise ProbeError("/ID 或 /Encrypt 格式错误")
+                values = (resolve(id_entry[0]), resolve(encrypt.get("/O")), resolve(encrypt.get("/U")))
+                if not all(isinstance(value, bytes) for value in values):
+                    raise ProbeError("/ID、/O 或 /U 不是字符串")
+                return values
+    except (ProbeError, ValueError, OSError, IndexError):
+        return None
+
+
+def read_object_count(file_path: str) -> Optional[int]:
+    """
+    读取最后一个交叉引用段声明的对象数（trailer 或交叉引用流字典中的 /Size），用于估算解析所需内存
+
+    Returns:
+        对象数；找不到 startxref 或 /Size 时返回None
+    """
+    try:
+        with open(file_path, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                try:
+                    trailer, _, _ = _read_trailer(mm)
+                except ProbeError:
+                    # 交叉引用流：/Size 在流对象的字典中
+                    tail = mm[max(0, len(mm) - TAIL_SIZE):]
+                    match = _STARTXREF_RE.match(tail, max(0, tail.rfind(b"startxref")))
+                    if not match:
+                        return None
+                    offset = int(match.group(1))
+                    window = mm[offset:offset + OBJECT_WINDOW]
+                    header = _OBJ_HEADER_RE.match(window)
+                    if not header:
+                        return None
+                    trailer, _ = parse_object(window, header.end())
+                size = trailer.get("/Size") if isinstance(trailer, dict) else None
+                return size if isinstance(size, int) and size > 0 else None
+    except (ProbeError, ValueError, OSError, IndexError):
+        return None
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+单次工具调用的性能剖析
+
+工具参数 profile 或环境变量 PDF_DECRYPT_PROFILE 取 cpu、memory 或 all（也可写作 cpu,memory）时，
+该次调用在线程池中执行的部分运行在 cProfile 和/或 tracemalloc 下，结果写入
+PDF_DECRYPT_PROFILE_DIR 指定的目录（默认为系统临时目录下的 pdf-decrypt-mcp-profiles）：
+
+- <标签>.pstats: cProfile 统计，可用 python -m pstats 或 snakeviz 查看
+- <标签>.tracemalloc: tracemalloc 快照，用 tracemalloc.Snapshot.load 读取
+- <标签>.json: 工具名、输入路径、耗时和内存峰值
+
+标签由时间、进程号、工具名、输入文件名和完整路径的短哈希组成。
+未开启时服务器只多一次参数与环境变量查找，不创建任何剖析对象。
+批量解密使用多进程时只能剖析主进程中的部分。
+"""
+
+import cProfile
+import hashlib
+import itertools
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, FrozenSet, Optional
+
+PROFILE_ENV = "PDF_DECRYPT_PROFILE"
+PROFILE_DIR_ENV = "PDF_DECRYPT_PROFILE_DIR"
+PROFILE_MODES = ("cpu", "memory", "all")
+
+# tracemalloc 为每次分配保存的调用栈深度
+TRACEMALLOC_FRAMES = 25
+
+_counter = itertools.count(1)
+
+# 同时进行的多个内存剖析共用 tracemalloc，最后一个结束时才停止
+_tracemalloc_lock = threading.Lock()
+_tracemalloc_users = 0
+
+
+def parse_modes(value: Optional[str]) -> FrozenSet[str]:
+    """
+    解析剖析模式
+
+    Raises:
+        ValueError: 包含未知模式
+    """
+    if not value or value.strip().lower() in ("off", "0", "false", "none"):
+        return frozenset()
+    modes = set()
+    for mode in value.lower().split(","):
+        mode = mode.strip()
+        if mode == "all":
+            modes.update(("cpu", "memory"))
+        elif mode in ("cpu", "memory"):
+            modes.add(mode)
+        elif mode:
+            raise ValueError(f"不支持的剖析模式: {mode}，可选值: {', '.join(PROFILE_MODES)}")
+    return frozenset(modes)
+
+
+def profile_directory() -> str:
+    """剖析结果目录"""
+    return os.environ.get(PROFILE_DIR_ENV) or os.path.join(tempfile.gettempdir(), "pdf-decrypt-mcp-profiles")
+
+
+def _slug(text: str) -> str:
+    return re.sub(r"[^\w.-]+", "_", text).strip("_")[:60] or "none"
+
+
+def _start_tracemalloc() -> None:
+    global _tracemalloc_users
+    with _tracemalloc_lock:
+        if _tracemalloc_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+        _tracemalloc_users += 1
+
+
+def _stop_tracemalloc() -> None:
+    global _tracemalloc_users
+    with _tracemalloc_lock:
+        _tracemalloc_users -= 1
+        if _tracemalloc_users == 0:
+            tracemalloc.stop()
+
+
+class CallProfiler:
+    """剖析一次工具调用，并把结果写入剖析目录"""
+
+    def __init__(self, tool: str, target: Optional[str], modes: FrozenSet[str],
+                 directory: Optional[str] = None):
+        self.tool = tool
+        self.target = target
+        self.modes = modes
+        self.directory = directory or profile_directory()
+        self.tag = "_".join((
+            time.strftime("%Y%m%d-%H%M%S"),
+            str(os.getpid()),
+            str(next(_counter)),
+            _slug(tool),
+            _slug(os.path.basename(target or "")),
+            hashlib.sha1((target or "").encode("utf-8")).hexdigest()[:8],
+        ))
+        self.outputs: Dict[str, Any] = {}
+
+    def _path(self, suffix: str) -> str:
+        return os.path.join(self.directory, self.tag + suffix)
+
+    def run(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """在当前线程中剖析执行func"""
+        profile = cProfile.Profile() if "cpu" in self.modes else None
+        if "memory" in self.modes:
+            _start_tracemalloc()
+        start = time.perf_counter()
+        try:
+            if profile is not None:
+                return profile.runcall(func, *args, **kwargs)
+            return func(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            snapshot = None
+            peak = None
+            if "memory" in self.modes:
+                snapshot = tracemalloc.take_snapshot()
+                peak = tracemalloc.get_traced_memory()[1]
+                _stop_tracemalloc()
+            self._write(profile, snapshot, elapsed, peak)
+
+    def _write(self, profile: Optional[cProfile.Profile], snapshot: Optional[tracemalloc.Snapshot],
+               elapsed: float, peak: Optional[int]) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        if profile is not None:
+            self.outputs["pstats"] = self._path(".pstats")
+            profile.dump_stats(self.outputs["pstats"])
+        if snapshot is not None:
+            self.outputs["tracemalloc"] = self._path(".tracemalloc")
+            snapshot.dump(self.outputs["tracemalloc"])
+        self.outputs["metadata"] = self._path(".json")
+        with open(self.outputs["metadata"], 'w', encoding='utf-8') as f:
+            json.dump({
+                "tool": self.tool,
+                "input_path": self.target,
+                "modes": sorted(self.modes),
+                "elapsed_seconds": round(elapsed, 6),
+                "traced_peak_bytes": peak,
+                "outputs": dict(self.outputs),
+            }, f, ensure_ascii=False, indent=2)
@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+目录扫描
+
+基于 os.scandir 列出PDF文件，使用 DirEntry 缓存的类型和stat信息，
+支持按名称、大小、修改时间排序以及基于游标的分页。
+分页时只保留当前页的条目（堆选择），内存占用与目录大小无关；
+按名称排序或不排序时，只对当前页的文件取stat。
+
+递归扫描时多个线程并发遍历子目录，结果通过有界队列以生成器形式产出，
+调用方可以在遍历结束前开始处理最先找到的文件。
+"""
+
+import base64
+import heapq
+import json
+import logging
+import os
+import queue
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from fnmatch import fnmatch
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+DECRYPTED_SUFFIX = '_解密版.pdf'
+SORT_KEYS = ("name", "size", "mtime", "none")
+# 递归扫描的默认并发线程数
+DEFAULT_SCAN_WORKERS = 4
+# 扫描线程与消费者之间的队列长度
+SCAN_QUEUE_SIZE = 1024
+
+# 扫描结果：(相对目录的路径，使用"/"分隔, DirEntry)
+ScanItem = Tuple[str, os.DirEntry]
+_DONE = object()
+
+
+def is_decrypted_name(name: str) -> bool:
+    """是否为解密输出文件名"""
+    return name.endswith(DECRYPTED_SUFFIX)
+
+
+def is_pdf_name(name: str, include_decrypted: bool = False) -> bool:
+    """是否为需要处理的PDF文件名"""
+    return name.lower().endswith('.pdf') and (include_decrypted or not is_decrypted_name(name))
+
+
+class PathFilter:
+    """
+    include/exclude 通配符过滤
+
+    模式按 fnmatch 规则匹配相对路径或文件名（"*" 可跨越目录层级）。
+    指定 include 时文件必须匹配其中之一；匹配 exclude 的文件被排除，
+    匹配 exclude 的目录整棵子树都不再遍历。
+    """
+
+    def __init__(self, include: Optional[Sequence[str]] = None,
+                 exclude: Optional[Sequence[str]] = None):
+        self.include = list(include or [])
+        self.exclude = list(exclude or [])
+
+    @staticmethod
+    def _matches(patterns: List[str], rel_path: str, name: str) -> bool:
+        return any(fnmatch(rel_path, pattern) or fnmatch(name, pattern) for pattern in patterns)
+
+    def accepts_file(self, rel_path: str, name: str) -> bool:
+        if self.include and not self._matches(self.include, rel_path, name):
+            return False
+        return not self._matches(self.exclude, rel_path, name)
+
+    def accepts_dir(self, rel_path: str, name: str) -> bool:
+        return not self._matches(self.exclude, rel_path, name)
+
+
+def _scan_dir(path: str, rel_dir: str, depth: int, max_depth: Optional[int],
+              path_filter: PathFilter, include_decrypted: bool
+              ) -> Iterator[Tuple[bool, str, os.DirEntry]]:
+    """扫描单个目录，产出 (是否为子目录, 相对路径, DirEntry)"""
+    with os.scandir(path) as it:
+        for entry in it:
+            rel_path = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if (max_depth is None or depth < max_depth) and path_filter.accepts_dir(rel_path, entry.name):
+                        yield True, rel_path, entry
+                elif (is_pdf_name(entry.name, include_decrypted) and entry.is_file()
+                      and path_filter.accepts_file(rel_path, entry.name)):
+                    yield False, rel_path, entry
+            except OSError as e:
+                logger.warning(f"无法读取 {entry.path}: {e}")
+
+
+def _walk_serial(directory: str, max_depth: Optional[int], path_filter: PathFilter,
+                 include_decrypted: bool) -> Iterator[ScanItem]:
+    pending = deque([(directory, "", 0)])
+    while pending:
+        path, rel_dir, depth = pending.popleft()
+        try:
+            for is_dir, rel_path, entry in _scan_dir(path, rel_dir, depth, max_depth,
+                                                     path_filter, include_decrypted):
+                if is_dir:
+                    pending.append((entry.path, rel_path, depth + 1))
+                else:
+                    yield rel_path, entry
+        except OSError as e:
+            if not rel_dir:
+                raise
+            logger.warning(f"无法扫描目录 {path}: {e}")
+
+
+def _walk_concurrent(directory: str, max_depth: Optional[int], path_filter: PathFilter,
+                     include_decrypted: bool, scan_workers: int) -> Iterator[ScanItem]:
+    # 顶层目录同步检查，不存在时直接抛出
+    os.scandir(directory).close()
+
+    results: "queue.Queue[Any]" = queue.Queue(maxsize=SCAN_QUEUE_SIZE)
+    stop = threading.Event()
+    lock = threading.Lock()
+    pending = [0]
+    executor = ThreadPoolExecutor(max_workers=scan_workers, thread_name_prefix="pdf-scan")
+
+    def put(item: Any) -> bool:
+        while not stop.is_set():
+            try:
+                results.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def submit(path: str, rel_dir: str, depth: int) -> None:
+        with lock:
+            pending[0] += 1
+        executor.submit(scan, path, rel_dir, depth)
+
+    def scan(path: str, rel_dir: str, depth: int) -> None:
+        try:
+            if stop.is_set():
+                return
+            for is_dir, rel_path, entry in _scan_dir(path, rel_dir, depth, max_depth,
+                                                     path_filter, include_decrypted):
+                if is_dir:
+                    submit(entry.path, rel_path, depth + 1)
+                elif not put((rel_path, entry)):
+                    return
+        except OSError as e:
+            logger.warning(f"无法扫描目录 {path}: {e}")
+        except RuntimeError:
+            # 消费者已提前结束，线程池关闭后无法再提交
+            pass
+        finally:
+            with lock:
+                pending[0] -= 1
+                finished = pending[0] == 0
+            if finished:
+                put(_DONE)
+
+    submit(directory, "", 0)
+    try:
+        while True:
+            item = results.get()
+            if item is _DONE:
+                return
+            yield item
+    finally:
+        stop.set()
+        executor.shutdown(wait=False)
+
+
+def iter_pdf_files(directory: str, recursive: bool = False,
+                   include: Optional[Sequence[str]] = None,
+                   exclude: Optional[Sequence[str]] = None,
+                   max_depth: Optional[int] = None,
+                   include_decrypted: bool = False,
+                   scan_workers: int = DEFAULT_SCAN_WORKERS) -> Iterator[ScanItem]:
+    """
+    逐个产出目录中的PDF文件
+
+    Args:
+        directory: 目录路径
+        recursive: 是否递归子目录
+        include: 文件必须匹配的通配符列表（可选）
+        exclude: 排除的文件或目录通配符列表（可选）
+        max_depth: 递归的最大深度，0表示只扫描顶层（可选，默认不限）
+        include_decrypted: 是否包含已解密的文件
+        scan_workers: 递归时并发扫描的线程数，为1时按广度优先顺序逐个扫描
+
+    Returns:
+        (相对路径, DirEntry) 的迭代器；并发扫描时顺序不固定
+    """
+    if not recursive:
+        max_depth = 0
+    path_filter = PathFilter(include, exclude)
+    if max_depth == 0 or scan_workers <= 1:
+        return _walk_serial(directory, max_depth, path_filter, include_decrypted)
+    return _walk_concurrent(directory, max_depth, path_filter, include_decrypted, scan_workers)
+
+
+def _encode_cursor(state: Dict[str, Any]) -> str:
+    raw = json.dumps(state, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def _decode_cursor(cursor: Optional[str], sort: str, descending: bool) -> Optional[Dict[str, Any]]:
+    if not cursor:
+        return None
+    try:
+        state = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except (ValueError, TypeError):
+        raise ValueError("无效的分页游标")
+    if state.get("sort") != sort or bool(state.get("desc")) != descending:
+        raise ValueError("分页游标与排序方式不一致")
+    return state
+
+
+def _sort_key(sort: str) -> Callable[[ScanItem], Tuple]:
+    if sort == "size":
+        return lambda item: (item[1].stat().st_size, item[0])
+    if sort == "mtime":
+        return lambda item: (item[1].stat().st_mtime_ns, item[0])
+    return lambda item: (item[0],)
+
+
+def _file_record(item: ScanItem, recursive: bool) -> Dict[str, Any]:
+    rel_path, entry = item
+    record = {
+        "name": entry.name,
+        "path": entry.path,
+        "size": entry.stat().st_size,
+        "is_decrypted": is_decrypted_name(entry.name)
+    }
+    if recursive:
+        record["relative_path"] = rel_path
+    return record
+
+
+def _select_page(items: Iterable[ScanItem], sort: str, descending: bool,
+                 after: Optional[Tuple], limit: Optional[int]) -> Tuple[List[ScanItem], int, int]:
+    """
+    选出游标之后的一页条目
+
+    Returns:
+        (当前页条目, 匹配的文件总数, 游标之后的文件数)
+    """
+    counts = {"total": 0, "remaining": 0}
+    key = _sort_key(sort)
+
+    def keyed() -> Iterator[Tuple[Tuple, ScanItem]]:
+        for item in items:
+            counts["total"] += 1
+            item_key = key(item)
+            if after is not None and (item_key <= after if not descending else item_key >= after):
+                continue
+            counts["remaining"] += 1
+            yield item_key, item
+
+    if limit is None:
+        page = sorted(keyed(), key=lambda pair: pair[0], reverse=descending)
+    elif descending:
+        page = heapq.nlargest(limit, keyed(), key=lambda pair: pair[0])
+    else:
+        page = heapq.nsmallest(limit, keyed(), key=lambda pair: pair[0])
+    return [item for _, item in page], counts["total"], counts["remaining"]
+
+
+def list_pdf_files(directory: str, include_decrypted: bool = False, limit: Optional[int] = None,
+                   cursor: Optional[str] = None, sort: str = "name",
+                   descending: bool = False, recursive: bool = False,
+                   include: Optional[Sequence[str]] = None,
+                   exclude: Optional[Sequence[str]] = None,
+                   max_depth: Optional[int] = None) -> Dict[str, Any]:
+    """
+    列出目录中的PDF文件
+
+    Args:
+        directory: 目录路径
+        include_decrypted: 是否包含已解密的文件
+        limit: 每页最多返回的文件数（可选，默认全部返回）
+        cursor: 上一页返回的 next_cursor（可选）
+        sort: 排序方式：name、size、mtime 或 none（目录原始顺序）
+        descending: 是否降序
+        recursive: 是否递归子目录（按相对路径排序）
+        include: 文件必须匹配的通配符列表（可选）
+        exclude: 排除的文件或目录通配符列表（可选）
+        max_depth: 递归的最大深度（可选）
+
+    Returns:
+        包含文件列表的字典；还有下一页时 next_cursor 不为None
+    """
+    try:
+        if sort not in SORT_KEYS:
+            return {
+                "success": False,
+                "error": f"错误: 不支持的排序方式: {sort}"
+            }
+        if limit is not None and limit < 0:
+            return {
+                "success": False,
+                "error": f"错误: limit 不能为负数: {limit}"
+            }
+        state = _decode_cursor(cursor, sort, descending)
+
+        if not os.path.isdir(directory):
+            return {
+                "success": False,
+                "error": f"错误: 目录不存在: {directory}"
+            }
+
+        # is_file/is_dir 使用 readdir 返回的类型信息，不需要额外的系统调用；
+        # 按目录原始顺序分页时需要稳定的遍历顺序，因此逐个扫描
+        items = iter_pdf_files(
+            directory, recursive, include, exclude, max_depth, include_decrypted,
+            scan_workers=1 if sort == "none" else DEFAULT_SCAN_WORKERS
+        )
+        if sort == "none":
+            offset = state["offset"] if state else 0
+            page = []
+            total = 0
+            for item in items:
+                if total >= offset and (limit is None or len(page) < limit):
+                    page.append(item)
+                total += 1
+            next_state = {"offset": offset + len(page)} if offset + len(page) < total else None
+        else:
+            after = tuple(state["after"]) if state else None
+            page, total, remaining = _select_page(items, sort, descending, after, limit)
+            next_state = {"after": list(_sort_key(sort)(page[-1]))} if page and remaining > len(page) else None
+
+        files = [_file_record(item, recursive) for item in page]
+
+        if next_state is not None:
+            next_state.update(sort=sort, desc=descending)
+
+        return {
+            "success": True,
+            "directory": directory,
+            "total_files": total,
+            "files": files,
+            "next_cursor": _encode_cursor(next_state) if next_state else None
+        }
+
+    except Exception as e:
+        return {
+            "success": False,
+            "error": f"列出PDF文件时出错: {str(e)}"
+        }
@@ -2,11 +2,19 @@
 # -*- coding: utf-8 -*-
 
 import asyncio
+import base64
+import binascii
+import contextvars
+import functools
 import json
 import logging
+import os
 import sys
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import Any, Dict, List, Optional
-from mcp.server import Server
+from mcp.server import NotificationOptions, Server
 from mcp.server.models import InitializationOptions
 from mcp.server.stdio import stdio_server
 from mcp.types import (
@@ -25,10 +33,13 @@ from mcp.types import (
     Resource,
     TextContent,
     Tool,
-    ToolInfo,
 )
 
-from .pdf_decryptor import PDFDecryptor
+from .constants import DEFAULT_MEMORY_LIMIT, ENGINES
+from .jobs import JobManager
+from .profiling import PROFILE_ENV, PROFILE_MODES, CallProfiler, parse_modes
+from .scanner import SORT_KEYS, list_pdf_files
+from .timings import StatsRegistry
 
 # 设置日志
 logging.basicConfig(level=logging.INFO)
@@ -37,8 +48,334 @@ logger = logging.getLogger(__name__)
 # 创建MCP服务器
 server = Server("pdf-decrypt-mcp")
 
-# 创建PDF解密器实例
-pdf_decryptor = PDFDecryptor()
+
+# 阻塞的PDF操作放到有界线程池中执行，避免卡住事件循环；
+# 工作线程数可通过环境变量 PDF_DECRYPT_MAX_WORKERS 配置
+DEFAULT_MAX_WORKERS = 4
+# 批量解密响应中默认最多包含的单文件记录数
+DEFAULT_MAX_RESULTS = 100
+# list_pdf_files 默认每页文件数
+DEFAULT_PAGE_SIZE = 1000
+# decrypt_pdf_base64 输入与输出PDF的默认大小上限（解码后的字节数），
+# 可通过环境变量 PDF_DECRYPT_MAX_INLINE_BYTES 配置
+MAX_INLINE_BYTES_ENV = "PDF_DECRYPT_MAX_INLINE_BYTES"
+DEFAULT_MAX_INLINE_BYTES = 20 * 1024 * 1024
+_executor: Optional[ThreadPoolExecutor] = None
+
+# 进程内按工具、按阶段累计的耗时直方图，由 get_server_stats 输出
+server_stats = StatsRegistry()
+
+# 正在运行的目录监视任务：watch_id → DirectoryWatcher
+_watchers: Dict[str, Any] = {}
+
+# 后台批量解密任务，第一次提交任务时创建
+_job_manager: Optional[JobManager] = None
+
+# 保护解密器的首次创建：并发的工具调用只创建一个解密器
+_decryptor_lock = threading.Lock()
+
+# 当前工具调用的剖析器，未开启剖析时为None
+_call_profiler = contextvars.ContextVar(
+    "pdf_decrypt_call_profiler", default=None
+)
+
+
+def get_decryptor():
+    """
+    返回服务器使用的PDF解密器，第一次调用时创建
+
+    PyPDF2 等PDF库在这里才加载，initialize 和 list_tools 不必等待它们；
+    缓存与后端的配置见 PDFDecryptor.from_env。
+    """
+    decryptor = globals().get("pdf_decryptor")
+    if decryptor is None:
+        with _decryptor_lock:
+            decryptor = globals().get("pdf_decryptor")
+            if decryptor is None:
+                from .pdf_decryptor import PDFDecryptor
+                
+                decryptor = PDFDecryptor.from_env()
+                globals()["pdf_decryptor"] = decryptor
+    return decryptor
+
+
+def __getattr__(name: str) -> Any:
+    # server.pdf_decryptor 在第一次访问时创建
+    if name == "pdf_decryptor":
+        return get_decryptor()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def get_job_manager() -> JobManager:
+    """返回后台任务管理器，第一次调用时创建；任务在执行时才取得解密器"""
+    global _job_manager
+    if _job_manager is None:
+        _job_manager = JobManager(lambda *args, **kwargs: get_decryptor().batch_decrypt_pdfs(*args, **kwargs))
+    return _job_manager
+
+
+def configure_executor(max_workers: Optional[int] = None) -> ThreadPoolExecutor:
+    """
+    (重新)创建执行PDF操作的线程池
+    
+    Args:
+        max_workers: 最大工作线程数（可选，默认读取 PDF_DECRYPT_MAX_WORKERS）
+        
+    Returns:
+        新的线程池
+    """
+    global _executor
+    if max_workers is None:
+        max_workers = int(os.environ.get("PDF_DECRYPT_MAX_WORKERS", DEFAULT_MAX_WORKERS))
+    if max_workers < 1:
+        raise ValueError(f"max_workers 必须大于0: {max_workers}")
+    
+    old_executor = _executor
+    _executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="pdf-decrypt")
+    if old_executor is not None:
+        old_executor.shutdown(wait=False)
+    return _executor
+
+
+class _ProgressReporter:
+    """
+    把批量进度转发为MCP进度通知的回调
+    
+    回调在工作线程中调用，通知通过事件循环异步发送；发送的future被保留下来，
+    返回响应前用 drain 等待它们完成，进度通知不会晚于最终结果到达客户端。
+    """
+    
+    def __init__(self, session: Any, progress_token: Any, loop: asyncio.AbstractEventLoop):
+        self._session = session
+        self._progress_token = progress_token
+        self._loop = loop
+        self._futures: List[Future] = []
+    
+    def __call__(self, done: int, total: Optional[int], file_result: Dict[str, Any]) -> None:
+        self._futures.append(asyncio.run_coroutine_threadsafe(
+            self._session.send_progress_notification(self._progress_token, done, total), self._loop
+        ))
+    
+    async def drain(self) -> None:
+        """等待已发出的进度通知全部发送完毕；发送失败只记录日志，不影响工具结果"""
+        futures, self._futures = self._futures, []
+        results = await asyncio.gather(*(asyncio.wrap_future(f) for f in futures), return_exceptions=True)
+        for result in results:
+            if isinstance(result, BaseException):
+                logger.warning(f"发送进度通知失败: {result}")
+
+
+def _progress_reporter() -> Optional[_ProgressReporter]:
+    """返回当前请求的进度回调；不在请求上下文中或客户端未提供progressToken时返回None"""
+    try:
+        ctx = server.request_context
+    except LookupError:
+        return None
+    progress_token = ctx.meta.progressToken if ctx.meta else None
+    if progress_token is None:
+        return None
+    return _ProgressReporter(ctx.session, progress_token, asyncio.get_running_loop())
+
+
+async def run_blocking(func, *args, **kwargs):
+    """在线程池中执行阻塞函数并等待结果；当前调用开启了剖析时在工作线程中剖析执行"""
+    if _executor is None:
+        configure_executor()
+    profiler = _call_profiler.get()
+    if profiler is not None:
+        func = functools.partial(profiler.run, func)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, functools.partial(func, *args, **kwargs))
+
+# batch_decrypt_pdfs 与 list_pdf_files 共用的目录遍历参数
+TRAVERSAL_PROPERTIES = {
+    "recursive": {
+        "type": "boolean",
+        "description": "是否递归处理子目录（默认为false）",
+        "default": False
+    },
+    "include": {
+        "type": "array",
+        "items": {"type": "string"},
+        "description": "文件必须匹配的通配符列表，匹配相对路径或文件名，例如 [\"*讲义*\"]（可选）"
+    },
+    "exclude": {
+        "type": "array",
+        "items": {"type": "string"},
+        "description": "排除的文件或目录通配符列表，匹配的目录整棵子树都会跳过（可选）"
+    },
+    "max_depth": {
+        "type": "integer",
+        "description": "递归的最大深度，0表示只处理顶层目录（可选，默认不限）",
+        "minimum": 0
+    }
+}
+
+
+# batch_decrypt_pdfs 与 submit_batch_job 共用的参数
+BATCH_PROPERTIES = {
+    "directory": {
+        "type": "string",
+        "description": "包含PDF文件的目录路径"
+    },
+    "password": {
+        "type": "string",
+        "description": "解密密码（可选，如果不提供则尝试常见密码）"
+    },
+    "max_workers": {
+        "type": "integer",
+        "description": "并行解密的工作进程数（可选，默认逐个处理）",
+        "minimum": 1
+    },
+    "incremental": {
+        "type": "boolean",
+        "description": "增量模式：根据目录下的状态清单跳过未变化且已处理成功的文件，中断后可继续（默认为false）",
+        "default": False
+    },
+    "report_path": {
+        "type": "string",
+        "description": "把每个文件的完整结果写入该NDJSON报告文件（可选）"
+    },
+    "max_results": {
+        "type": "integer",
+        "description": f"响应中最多包含的单文件记录数（默认为{DEFAULT_MAX_RESULTS}），完整记录请使用report_path",
+        "minimum": 0
+    },
+    "output_archive": {
+        "type": "string",
+        "description": "把解密后的文档直接写入该 .zip 或 .tar 归档，不生成 _解密版.pdf 文件；文件逐个写入，忽略max_workers，不能与incremental同时使用（可选）"
+    },
+    **TRAVERSAL_PROPERTIES
+}
+
+
+# decrypt_pdf 与 decrypt_pdf_base64 共用的写出参数
+ENGINE_PROPERTIES = {
+    "engine": {
+        "type": "string",
+        "enum": list(ENGINES),
+        "description": "写出方式：clone 整文档克隆，保留书签、命名目标、元数据和表单；stream 逐个对象流式写出、内存占用与页数无关；raw 只去除加密层，对象流不解压、原样保留，输出大小与输入基本一致；pages 逐页复制到新文档，只保留页面（可选，默认为clone）",
+        "default": "clone"
+    },
+    "memory_limit": {
+        "type": "integer",
+        "description": "stream/raw 方式下同时驻留内存的对象大小上限，单位字节，超过时报错（可选，默认256MiB）",
+        "minimum": 1
+    }
+}
+
+
+# 检查与解密工具共用的计时参数
+TIMINGS_PROPERTY = {
+    "timings": {
+        "type": "boolean",
+        "description": "是否在结果中附带各阶段（打开、解析交叉引用表、尝试密码、复制页面、写出）耗时和密码尝试次数（默认为false）",
+        "default": False
+    }
+}
+
+
+# 工具共用的剖析参数
+PROFILE_PROPERTY = {
+    "profile": {
+        "type": "string",
+        "enum": list(PROFILE_MODES),
+        "description": "剖析本次调用：cpu 使用cProfile，memory 使用tracemalloc，all 两者都用；结果写入 PDF_DECRYPT_PROFILE_DIR 目录，文件路径在响应的 profile 字段中（可选）"
+    }
+}
+
+
+def _profiler_for(name: str, arguments: Dict[str, Any]) -> Optional[CallProfiler]:
+    """根据 profile 参数或环境变量 PDF_DECRYPT_PROFILE 创建剖析器，未开启时返回None"""
+    modes = arguments.get("profile") or os.environ.get(PROFILE_ENV)
+    if not modes:
+        return None
+    modes = parse_modes(modes)
+    if not modes:
+        return None
+    target = arguments.get("input_path") or arguments.get("file_path") or arguments.get("directory")
+    return CallProfiler(name, target, modes)
+
+
+def _tool_result(result: Dict[str, Any], arguments: Dict[str, Any],
+                 outcome: Dict[str, Any]) -> CallToolResult:
+    """
+    把工具的结果字典序列化为响应
+
+    结果总是带有计时，计入 outcome 供服务器统计；客户端未要求 timings 时从响应中移除。
+    """
+    outcome["success"] = bool(result.get("success"))
+    outcome["timings"] = result.get("timings")
+    if not arguments.get("timings", False):
+        result.pop("timings", None)
+    profiler = _call_profiler.get()
+    if profiler is not None and profiler.outputs:
+        result["profile"] = profiler.outputs
+    return CallToolResult(
+        content=[TextContent(type="text", text=json.dumps(result, ensure_ascii=False, indent=2))]
+    )
+
+
+def _start_watch(directory: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+    """创建并启动目录监视任务（在线程池中执行：启动时需要扫描一次目录）"""
+    from .watcher import DEFAULT_SETTLE, DirectoryWatcher
+    
+    try:
+        watcher = DirectoryWatcher(
+            get_decryptor(),
+            directory,
+            password=arguments.get("password"),
+            settle=arguments.get("settle", DEFAULT_SETTLE),
+            workers=arguments.get("workers", 1),
+            process_existing=arguments.get("process_existing", False),
+            **_traversal_arguments(arguments),
+        ).start()
+    except (OSError, ValueError) as e:
+        logger.error(f"启动目录监视时出错: {e}")
+        return {"success": False, "error": f"启动目录监视时出错: {str(e)}"}
+    _watchers[watcher.watch_id] = watcher
+    return {"success": True, "message": "已开始监视目录", **watcher.status()}
+
+
+def _decrypt_base64(data: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+    """解码base64负载并在内存中解密，结果同样以base64返回（在线程池中执行）"""
+    limit = int(os.environ.get(MAX_INLINE_BYTES_ENV, DEFAULT_MAX_INLINE_BYTES))
+    # 每4个base64字符编码3个字节，解码前先按长度检查，超大的负载不必解码
+    if len(data) // 4 * 3 > limit + 3:
+        return {"success": False, "error": f"PDF内容超过上限 {limit} 字节，请使用 decrypt_pdf 处理文件"}
+    try:
+        payload = base64.b64decode(data, validate=True)
+    except (binascii.Error, ValueError) as e:
+        return {"success": False, "error": f"data 不是有效的base64: {e}"}
+    if len(payload) > limit:
+        return {"success": False, "error": f"PDF内容超过上限 {limit} 字节，请使用 decrypt_pdf 处理文件"}
+    
+    result = get_decryptor().decrypt_bytes(
+        payload,
+        arguments.get("password"),
+        engine=arguments.get("engine", "clone"),
+        memory_limit=arguments.get("memory_limit") or DEFAULT_MEMORY_LIMIT,
+        timings=True,
+    )
+    if not result["success"]:
+        return result
+    output = result.pop("data")
+    if len(output) > limit:
+        return {"success": False, "error": f"解密后的PDF超过上限 {limit} 字节，请使用 decrypt_pdf 处理文件"}
+    result["size"] = len(output)
+    # 未加密的文档原样返回输入
+    result["data"] = base64.b64encode(output).decode("ascii") if result["is_encrypted"] else data
+    return result
+
+
+def _traversal_arguments(arguments: Dict[str, Any]) -> Dict[str, Any]:
+    """提取目录遍历参数"""
+    return {
+        "recursive": arguments.get("recursive", False),
+        "include": arguments.get("include"),
+        "exclude": arguments.get("exclude"),
+        "max_depth": arguments.get("max_depth"),
+    }
 
 @server.list_tools()
 async def handle_list_tools() -> List[Tool]:
@@ -53,7 +390,14 @@ async def handle_list_tools() -> List[Tool]:
                     "file_path": {
                         "type": "string",
                         "description": "PDF文件的完整路径"
-                    }
+                    },
+                    "fast": {
+                        "type": "boolean",
+                        "description": "快速探测模式：只读取文件尾部的加密字典，不解析页面（默认为false）",
+                        "default": False
+                    },
+                    **TIMINGS_PROPERTY,
+                    **PROFILE_PROPERTY
                 },
                 "required": ["file_path"]
             }
@@ -75,25 +419,48 @@ async def handle_list_tools() -> List[Tool]:
                     "password": {
                         "type": "string",
                         "description": "解密密码（可选，如果不提供则尝试常见密码）"
-                    }
+                    },
+                    "link": {
+                        "type": "boolean",
+                        "description": "文件未加密时用reflink或硬链接代替复制（可选，默认为false）",
+                        "default": False
+                    },
+                    **ENGINE_PROPERTIES,
+                    **TIMINGS_PROPERTY,
+                    **PROFILE_PROPERTY
                 },
                 "required": ["input_path"]
             }
         ),
         Tool(
-            name="batch_decrypt_pdfs",
-            description="批量解密目录中的所有PDF文件",
+            name="decrypt_pdf_base64",
+            description="解密以base64传入的PDF内容，解密结果以base64返回，不读写磁盘；适合客户端已在内存中持有PDF的场景",
             inputSchema={
                 "type": "object",
                 "properties": {
-                    "directory": {
+                    "data": {
                         "type": "string",
-                        "description": "包含PDF文件的目录路径"
+                        "description": "base64编码的PDF内容，解码后不超过 PDF_DECRYPT_MAX_INLINE_BYTES（默认20MiB）"
                     },
                     "password": {
                         "type": "string",
                         "description": "解密密码（可选，如果不提供则尝试常见密码）"
-                    }
+                    },
+                    **ENGINE_PROPERTIES,
+                    **TIMINGS_PROPERTY
+                },
+                "required": ["data"]
+            }
+        ),
+        Tool(
+            name="batch_decrypt_pdfs",
+            description="批量解密目录中的所有PDF文件",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    **BATCH_PROPERTIES,
+                    **TIMINGS_PROPERTY,
+                    **PROFILE_PROPERTY
                 },
                 "required": ["directory"]
             }
@@ -112,16 +479,162 @@ async def handle_list_tools() -> List[Tool]:
                         "type": "boolean",
                         "description": "是否包含已解密的文件（默认为false）",
                         "default": False
+                    },
+                    "limit": {
+                        "type": "integer",
+                        "description": f"每页最多返回的文件数（默认为{DEFAULT_PAGE_SIZE}）",
+                        "minimum": 1
+                    },
+                    "cursor": {
+                        "type": "string",
+                        "description": "上一页响应中的next_cursor，用于获取下一页（可选）"
+                    },
+                    "sort": {
+                        "type": "string",
+                        "enum": list(SORT_KEYS),
+                        "description": "排序方式：name、size、mtime 或 none（目录原始顺序），默认为name",
+                        "default": "name"
+                    },
+                    "descending": {
+                        "type": "boolean",
+                        "description": "是否降序（默认为false）",
+                        "default": False
+                    },
+                    **TRAVERSAL_PROPERTIES,
+                    **PROFILE_PROPERTY
+                },
+                "required": ["directory"]
+            }
+        ),
+        Tool(
+            name="start_watch",
+            description="开始监视目录：新出现的PDF文件写入完成后自动解密（Linux上使用inotify，否则轮询），返回watch_id",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "directory": {
+                        "type": "string",
+                        "description": "监视的目录路径"
+                    },
+                    "password": {
+                        "type": "string",
+                        "description": "解密密码（可选，如果不提供则尝试常见密码）"
+                    },
+                    "settle": {
+                        "type": "number",
+                        "description": "文件大小和修改时间保持不变多少秒后视为写入完成（默认为1）",
+                        "minimum": 0
+                    },
+                    "workers": {
+                        "type": "integer",
+                        "description": "处理文件的工作线程数（默认为1）",
+                        "minimum": 1
+                    },
+                    "process_existing": {
+                        "type": "boolean",
+                        "description": "是否同时处理启动时已存在的文件（默认为false）",
+                        "default": False
+                    },
+                    **TRAVERSAL_PROPERTIES
+                },
+                "required": ["directory"]
+            }
+        ),
+        Tool(
+            name="get_watch_status",
+            description="获取目录监视任务的状态：检测到、已解密、未加密、失败的文件数和最近的处理结果",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "watch_id": {
+                        "type": "string",
+                        "description": "start_watch 返回的watch_id（可选，默认返回所有监视任务）"
+                    }
+                }
+            }
+        ),
+        Tool(
+            name="stop_watch",
+            description="停止目录监视任务",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "watch_id": {
+                        "type": "string",
+                        "description": "start_watch 返回的watch_id"
                     }
                 },
+                "required": ["watch_id"]
+            }
+        ),
+        Tool(
+            name="submit_batch_job",
+            description="提交后台批量解密任务并立即返回job_id，适合大目录；用 get_job_status 查询进度，用 cancel_job 取消",
+            inputSchema={
+                "type": "object",
+                "properties": BATCH_PROPERTIES,
                 "required": ["directory"]
             }
+        ),
+        Tool(
+            name="get_job_status",
+            description="获取后台批量任务的状态与进度（已处理、已解密、未加密、失败的文件数），任务结束后包含批量解密结果",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "job_id": {
+                        "type": "string",
+                        "description": "submit_batch_job 返回的job_id（可选，默认返回所有任务的状态，不含结果）"
+                    }
+                }
+            }
+        ),
+        Tool(
+            name="cancel_job",
+            description="取消后台批量任务：排队中的任务直接取消，运行中的任务处理完当前文件后停止",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "job_id": {
+                        "type": "string",
+                        "description": "submit_batch_job 返回的job_id"
+                    }
+                },
+                "required": ["job_id"]
+            }
+        ),
+        Tool(
+            name="get_server_stats",
+            description="获取服务器运行以来各工具的调用次数、失败次数，按工具和阶段统计的耗时直方图，检查结果缓存的命中与未命中次数，以及内存预算的占用与排队情况",
+            inputSchema={
+                "type": "object",
+                "properties": {}
+            }
         )
     ]
 
 @server.call_tool()
 async def handle_call_tool(name: str, arguments: Dict[str, Any]) -> CallToolResult:
-    """处理工具调用"""
+    """处理工具调用，并把调用耗时计入服务器统计"""
+    start = time.perf_counter()
+    outcome: Dict[str, Any] = {}
+    try:
+        profiler = _profiler_for(name, arguments)
+    except ValueError as e:
+        return CallToolResult(content=[TextContent(type="text", text=f"错误: {e}")])
+    token = _call_profiler.set(profiler) if profiler is not None else None
+    try:
+        return await _dispatch_tool(name, arguments, outcome)
+    finally:
+        if token is not None:
+            _call_profiler.reset(token)
+        # 参数错误和未知工具不计入统计
+        if outcome:
+            server_stats.record(name, time.perf_counter() - start, outcome["success"], outcome.get("timings"))
+
+
+async def _dispatch_tool(name: str, arguments: Dict[str, Any], outcome: Dict[str, Any]) -> CallToolResult:
+    """执行工具调用，结果通过 _tool_result 序列化"""
     try:
         if name == "check_pdf_encryption":
             file_path = arguments.get("file_path")
@@ -130,10 +643,10 @@ async def handle_call_tool(name: str, arguments: Dict[str, Any]) -> CallToolResu
                     content=[TextContent(type="text", text="错误: file_path 参数是必需的")]
                 )
             
-            result = pdf_decryptor.check_pdf_encryption(file_path)
-            return CallToolResult(
-                content=[TextContent(type="text", text=json.dumps(result, ensure_ascii=False, indent=2))]
-            )
+            fast = arguments.get("fast", False)
+            
+            result = await run_blocking(get_decryptor().check_pdf_encryption, file_path, fast, timings=True)
+            return _tool_result(result, arguments, outcome)
         
         elif name == "decrypt_pdf":
             input_path = arguments.get("input_path")
@@ -144,11 +657,23 @@ async def handle_call_tool(name: str, arguments: Dict[str, Any]) -> CallToolResu
             
             output_path = arguments.get("output_path")
             password = arguments.get("password")
+            link = arguments.get("link", False)
+            engine = arguments.get("engine", "clone")
+            memory_limit = arguments.get("memory_limit") or DEFAULT_MEMORY_LIMIT
             
-            result = pdf_decryptor.decrypt_pdf(input_path, output_path, password)
-            return CallToolResult(
-                content=[TextContent(type="text", text=json.dumps(result, ensure_ascii=False, indent=2))]
-            )
+            result = await run_blocking(get_decryptor().decrypt_pdf, input_path, output_path, password, link,
+                                        engine=engine, memory_limit=memory_limit, timings=True)
+            return _tool_result(result, arguments, outcome)
+        
+        elif name == "decrypt_pdf_base64":
+            data = arguments.get("data")
+            if not data:
+                return CallToolResult(
+                    content=[TextContent(type="text", text="错误: data 参数是必需的")]
+                )
+            
+            result = await run_blocking(_decrypt_base64, data, arguments)
+            return _tool_result(result, arguments, outcome)
         
         elif name == "batch_decrypt_pdfs":
             directory = arguments.get("directory")
@@ -158,11 +683,30 @@ async def handle_call_tool(name: str, arguments: Dict[str, Any]) -> CallToolResu
                 )
             
             password = arguments.get("password")
+            max_workers = arguments.get("max_workers")
+            incremental = arguments.get("incremental", False)
+            report_path = arguments.get("report_path")
+            max_results = arguments.get("max_results", DEFAULT_MAX_RESULTS)
             
-            result = pdf_decryptor.batch_decrypt_pdfs(directory, password)
-            return CallToolResult(
-                content=[TextContent(type="text", text=json.dumps(result, ensure_ascii=False, indent=2))]
-            )
+            progress = _progress_reporter()
+            try:
+                result = await run_blocking(
+                    get_decryptor().batch_decrypt_pdfs,
+                    directory,
+                    password,
+                    max_workers=max_workers,
+                    incremental=incremental,
+                    progress_callback=progress,
+                    report_path=report_path,
+                    max_results=max_results,
+                    timings=True,
+                    output_archive=arguments.get("output_archive"),
+                    **_traversal_arguments(arguments),
+                )
+            finally:
+                if progress is not None:
+                    await progress.drain()
+            return _tool_result(result, arguments, outcome)
         
         elif name == "list_pdf_files":
             directory = arguments.get("directory")
@@ -173,41 +717,108 @@ async def handle_call_tool(name: str, arguments: Dict[str, Any]) -> CallToolResu
             
             include_decrypted = arguments.get("include_decrypted", False)
             
-            try:
-                import os
-                if not os.path.exists(directory):
-                    return CallToolResult(
-                        content=[TextContent(type="text", text=f"错误: 目录不存在: {directory}")]
-                    )
-                
-                pdf_files = []
-                for file in os.listdir(directory):
-                    if file.lower().endswith('.pdf'):
-                        if include_decrypted or not file.endswith('_解密版.pdf'):
-                            file_path = os.path.join(directory, file)
-                            file_size = os.path.getsize(file_path)
-                            pdf_files.append({
-                                "name": file,
-                                "path": file_path,
-                                "size": file_size,
-                                "is_decrypted": file.endswith('_解密版.pdf')
-                            })
-                
-                result = {
-                    "success": True,
-                    "directory": directory,
-                    "total_files": len(pdf_files),
-                    "files": pdf_files
-                }
-                
+            result = await run_blocking(
+                list_pdf_files,
+                directory,
+                include_decrypted,
+                limit=arguments.get("limit", DEFAULT_PAGE_SIZE),
+                cursor=arguments.get("cursor"),
+                sort=arguments.get("sort", "name"),
+                descending=arguments.get("descending", False),
+                **_traversal_arguments(arguments),
+            )
+            if not result["success"]:
+                outcome["success"] = False
                 return CallToolResult(
-                    content=[TextContent(type="text", text=json.dumps(result, ensure_ascii=False, indent=2))]
+                    content=[TextContent(type="text", text=result["error"])]
                 )
-                
-            except Exception as e:
+            
+            return _tool_result(result, arguments, outcome)
+        
+        elif name == "start_watch":
+            directory = arguments.get("directory")
+            if not directory:
                 return CallToolResult(
-                    content=[TextContent(type="text", text=f"列出PDF文件时出错: {str(e)}")]
+                    content=[TextContent(type="text", text="错误: directory 参数是必需的")]
                 )
+            
+            result = await run_blocking(_start_watch, directory, arguments)
+            return _tool_result(result, arguments, outcome)
+        
+        elif name == "get_watch_status":
+            watch_id = arguments.get("watch_id")
+            if watch_id:
+                watcher = _watchers.get(watch_id)
+                if watcher is None:
+                    result = {"success": False, "error": f"监视任务不存在: {watch_id}"}
+                else:
+                    result = {"success": True, **watcher.status()}
+            else:
+                result = {"success": True, "watches": [watcher.status() for watcher in _watchers.values()]}
+            return _tool_result(result, arguments, outcome)
+        
+        elif name == "stop_watch":
+            watch_id = arguments.get("watch_id")
+            watcher = _watchers.pop(watch_id, None) if watch_id else None
+            if watcher is None:
+                result = {"success": False, "error": f"监视任务不存在: {watch_id}"}
+            else:
+                await run_blocking(watcher.stop)
+                result = {"success": True, "message": "已停止监视", **watcher.status()}
+            return _tool_result(result, arguments, outcome)
+        
+        elif name == "submit_batch_job":
+            directory = arguments.get("directory")
+            if not directory:
+                return CallToolResult(
+                    content=[TextContent(type="text", text="错误: directory 参数是必需的")]
+                )
+            
+            # 只登记任务，不扫描目录，直接在事件循环中执行
+            job = get_job_manager().submit(
+                directory,
+                password=arguments.get("password"),
+                max_workers=arguments.get("max_workers"),
+                incremental=arguments.get("incremental", False),
+                report_path=arguments.get("report_path"),
+                max_results=arguments.get("max_results", DEFAULT_MAX_RESULTS),
+                output_archive=arguments.get("output_archive"),
+                **_traversal_arguments(arguments),
+            )
+            result = {"success": True, "message": "已提交后台批量任务", **job.status()}
+            return _tool_result(result, arguments, outcome)
+        
+        elif name == "get_job_status":
+            job_id = arguments.get("job_id")
+            if job_id:
+                job = get_job_manager().get(job_id)
+                if job is None:
+                    result = {"success": False, "error": f"后台任务不存在: {job_id}"}
+                else:
+                    result = {"success": True, **job.status()}
+            else:
+                result = {"success": True,
+                          "jobs": [job.status(include_result=False) for job in get_job_manager().list()]}
+            return _tool_result(result, arguments, outcome)
+        
+        elif name == "cancel_job":
+            job_id = arguments.get("job_id")
+            job = get_job_manager().cancel(job_id) if job_id else None
+            if job is None:
+                result = {"success": False, "error": f"后台任务不存在: {job_id}"}
+            else:
+                result = {"success": True, "message": "已请求取消任务", **job.status()}
+            return _tool_result(result, arguments, outcome)
+        
+        elif name == "get_server_stats":
+            stats = {"success": True, **server_stats.snapshot()}
+            # 只读取已创建的解密器：查看统计不应加载PDF库；尚未创建时缓存与预算均为null
+            decryptor = globals().get("pdf_decryptor")
+            check_cache = decryptor.check_cache if decryptor is not None else None
+            stats["check_cache"] = check_cache.stats() if check_cache is not None else None
+            memory_budget = decryptor.memory_budget if decryptor is not None else None
+            stats["memory_budget"] = memory_budget.stats() if memory_budget is not None else None
+            return _tool_result(stats, arguments, outcome)
         
         else:
             return CallToolResult(
@@ -216,6 +827,7 @@ async def handle_call_tool(name: str, arguments: Dict[str, Any]) -> CallToolResu
     
     except Exception as e:
         logger.error(f"处理工具调用时出错: {e}")
+        outcome["success"] = False
         return CallToolResult(
             content=[TextContent(type="text", text=f"处理工具调用时出错: {str(e)}")]
         )
@@ -341,8 +953,12 @@ async def handle_get_prompt(name: str, arguments: Dict[str, str]) -> GetPromptRe
 
 - `check_pdf_encryption` - 检查PDF加密状态
 - `decrypt_pdf` - 解密单个PDF文件
+- `decrypt_pdf_base64` - 解密以base64传入的PDF内容，不读写磁盘
 - `batch_decrypt_pdfs` - 批量解密PDF文件
 - `list_pdf_files` - 列出PDF文件
+- `get_server_stats` - 查看各工具的调用次数与分阶段耗时统计
+- `start_watch` / `get_watch_status` / `stop_watch` - 监视目录，自动解密新出现的PDF文件
+- `submit_batch_job` / `get_job_status` / `cancel_job` - 在后台批量解密大目录，轮询进度或取消
 
 ## 使用提示
 
@@ -395,14 +1011,20 @@ async def main():
                     server_name="pdf-decrypt-mcp",
                     server_version="1.0.0",
                     capabilities=server.get_capabilities(
-                        notification_options=None,
-                        experimental_capabilities=None
+                        notification_options=NotificationOptions(),
+                        experimental_capabilities={}
                     )
                 )
             )
     except Exception as e:
         logger.error(f"启动MCP服务器时出错: {e}")
         sys.exit(1)
+    finally:
+        for watcher in list(_watchers.values()):
+            watcher.stop()
+        _watchers.clear()
+        if _job_manager is not None:
+            _job_manager.shutdown()
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+逐对象流式写出解密后的PDF
+
+按交叉引用表的文件偏移顺序逐个读取对象（读取时由PyPDF2去除加密），
+立即序列化到输出文件并从reader的对象缓存中移除，不构建 PdfWriter 对象图，
+内存占用与页数无关。流对象的内容保持原有编码（FlateDecode、DCTDecode等），
+只去除加密层。
+
+对象流（/ObjStm）中的对象逐个展开写出，输出使用传统交叉引用表；
+已解码的对象流只保留到其成员全部写出。任一时刻驻留的对象大小受 memory_limit 约束，
+超过上限时报错而不是继续占用内存。
+
+write_raw 是更轻的变体：对象流整体去除加密后原样写出，不解压、不解析其中的成员，
+输出使用交叉引用流引用对象流中的成员，输出大小与输入基本一致。
+"""
+
+import zlib
+
+from typing import Any, BinaryIO, Dict, List, Optional, Tuple
+
+from PyPDF2 import PdfReader
+from PyPDF2.generic import (
+    ArrayObject, DictionaryObject, IndirectObject, NameObject, NumberObject, StreamObject,
+)
+
+from .constants import DEFAULT_MEMORY_LIMIT
+
+
+# 写出时跳过的容器流：其内容已展开为独立对象或由新的交叉引用表取代
+_CONTAINER_TYPES = ("/ObjStm", "/XRef")
+
+
+class MemoryLimitExceeded(Exception):
+    """单个对象（或对象流）超过了内存上限"""
+
+
+def objects_in_xref_order(reader: PdfReader) -> List[Tuple[int, int, Optional[int], int]]:
+    """
+    列出文档中的所有对象，按文件偏移排序；对象流中的成员排在对象流所在位置
+
+    Returns:
+        [(对象号, 代号, 所在对象流的对象号或None, 对象在文件中所占字节数的估计), ...]
+        对象流成员的估计为0，其大小计入对象流本身
+    """
+    latest: Dict[int, Tuple[int, int]] = {}
+    for generation, entries in reader.xref.items():
+        free = reader.xref_free_entry.get(generation, {})
+        for num, offset in entries.items():
+            if num == 0 or free.get(num) or offset is None or offset < 0:
+                continue
+            if num not in latest or generation > latest[num][0]:
+                latest[num] = (generation, offset)
+
+    # 相邻对象的偏移之差即对象在文件中的大小
+    reader.stream.seek(0, 2)
+    boundaries = sorted({offset for _, offset in latest.values()} | {reader.stream.tell()})
+    next_boundary = dict(zip(boundaries, boundaries[1:]))
+
+    objects: List[Tuple[Tuple[int, int], int, int, Optional[int], int]] = []
+    for num, (generation, offset) in latest.items():
+        if num in reader.xref_objStm and generation == 0:
+            continue
+        objects.append(((offset, -1), num, generation, None, next_boundary[offset] - offset))
+    # 与 PdfReader.get_object 一致：代号为0时对象流中的定义优先
+    for num, (stream_num, index) in reader.xref_objStm.items():
+        offset = latest.get(stream_num, (0, 0))[1]
+        objects.append(((offset, index), num, 0, stream_num, 0))
+
+    objects.sort(key=lambda item: item[0])
+    return [item[1:] for item in objects]
+
+
+def _is_container(obj: Any) -> bool:
+    return isinstance(obj, StreamObject) and obj.get("/Type") in _CONTAINER_TYPES
+
+
+def _stream_size(obj: Any) -> int:
+    data = getattr(obj, "_data", None)
+    size = len(data) if data is not None else 0
+    decoded = getattr(obj, "decoded_self", None)
+    if decoded is not None:
+        size += len(getattr(decoded, "_data", b"") or b"")
+    return size
+
+
+def write_header(reader: PdfReader, output: BinaryIO) -> None:
+    header = reader.pdf_header or "%PDF-1.7"
+    output.write(header.encode("latin-1") + b"\n%\xe2\xe3\xcf\xd3\n")
+
+
+def write_object(output: BinaryIO, num: int, generation: int, obj: Any) -> int:
+    """写出一个间接对象，返回其起始偏移"""
+    offset = output.tell()
+    output.write(f"{num} {generation} obj\n".encode("ascii"))
+    obj.write_to_stream(output, None)
+    output.write(b"\nendobj\n")
+    return offset
+
+
+def build_trailer(reader: PdfReader, size: int) -> DictionaryObject:
+    """新trailer：保留 /Root、/Info、/ID，去掉 /Encrypt"""
+    trailer = DictionaryObject()
+    trailer[NameObject("/Size")] = NumberObject(size)
+    for key in ("/Root", "/Info", "/ID"):
+        if key in reader.trailer:
+            trailer[NameObject(key)] = reader.trailer.raw_get(key)
+    return trailer
+
+
+def write_xref_table(output: BinaryIO, offsets: Dict[int, Tuple[int, int]],
+                     trailer: DictionaryObject) -> None:
+    """写出传统交叉引用表和trailer"""
+    size = int(trailer["/Size"])
+    xref_offset = output.tell()
+    lines = [f"xref\n0 {size}\n".encode("ascii"), b"0000000000 65535 f \n"]
+    for num in range(1, size):
+        if num in offsets:
+            offset, generation = offsets[num]
+            lines.append(f"{offset:010d} {generation:05d} n \n".encode("ascii"))
+        else:
+            lines.append(b"0000000000 00000 f \n")
+    output.write(b"".join(lines))
+    output.write(b"trailer\n")
+    trailer.write_to_stream(output, None)
+    output.write(f"\nstartxref\n{xref_offset}\n%%EOF\n".encode("ascii"))
+
+
+def write_xref_stream(output: BinaryIO, entries: Dict[int, Tuple[int, int, int]],
+                      trailer: DictionaryObject) -> None:
+    """
+    写出交叉引用流（PDF 1.5）
+
+    Args:
+        entries: 对象号 → (类型, 字段2, 字段3)：类型1为(1, 偏移, 代号)，类型2为(2, 对象流号, 序号)
+        trailer: 新trailer，/Size 不含交叉引用流自身
+    """
+    xref_num = int(trailer["/Size"])
+    offset = output.tell()
+    entries = dict(entries)
+    entries[xref_num] = (1, offset, 0)
+    width = max(4, (max(field for entry in entries.values() for field in entry[1:2]).bit_length() + 7) // 8)
+    rows = [b"\x00" + (0).to_bytes(width, "big") + b"\xff\xff"]
+    for num in range(1, xref_num + 1):
+        kind, field2, field3 = entries.get(num, (0, 0, 0))
+        rows.append(bytes([kind]) + field2.to_bytes(width, "big") + field3.to_bytes(2, "big"))
+    data = zlib.compress(b"".join(rows))
+
+    header = DictionaryObject(trailer)
+    header.update({
+        NameObject("/Type"): NameObject("/XRef"),
+        NameObject("/Size"): NumberObject(xref_num + 1),
+        NameObject("/W"): ArrayObject([NumberObject(1), NumberObject(width), NumberObject(2)]),
+        NameObject("/Filter"): NameObject("/FlateDecode"),
+        NameObject("/Length"): NumberObject(len(data)),
+    })
+    output.write(f"{xref_num} 0 obj\n".encode("ascii"))
+    header.write_to_stream(output, None)
+    output.write(b"\nstream\n" + data + b"\nendstream\nendobj\n")
+    output.write(f"startxref\n{offset}\n%%EOF\n".encode("ascii"))
+
+
+def encrypt_object_number(reader: PdfReader) -> Optional[int]:
+    encrypt = reader.trailer.raw_get("/Encrypt") if "/Encrypt" in reader.trailer else None
+    return encrypt.idnum if isinstance(encrypt, IndirectObject) else None
+
+
+def write_decrypted_stream(reader: PdfReader, output: BinaryIO,
+                           memory_limit: int = DEFAULT_MEMORY_LIMIT) -> Dict[str, int]:
+    """
+    逐个对象写出已解密的文档
+
+    Args:
+        reader: 已用正确密码解密的reader（未加密的reader也可以）
+        output: 可定位的二进制输出流
+        memory_limit: 同时驻留内存的对象（含解码后的对象流）大小上限（字节）
+
+    Returns:
+        写出统计：objects（写出的对象数）与 peak_object_bytes（驻留对象大小的峰值）
+
+    Raises:
+        MemoryLimitExceeded: 某个对象超过了内存上限
+    """
+    write_header(reader, output)
+    skip = encrypt_object_number(reader)
+    offsets: Dict[int, Tuple[int, int]] = {}
+    peak = 0
+    current_stream: Optional[int] = None
+    container_size = 0
+
+    for num, generation, stream_num, size in objects_in_xref_order(reader):
+        if num == skip:
+            continue
+        if size > memory_limit:
+            # 读取前按文件中的大小拒绝，避免先把超大对象读入内存
+            raise MemoryLimitExceeded(f"对象 {num} {generation} 约 {size} 字节，超过内存上限 {memory_limit} 字节")
+
+        if stream_num != current_stream and current_stream is not None:
+            # 对象流的成员是连续写出的，离开对象流后立即释放其解码缓存
+            reader.resolved_objects.pop((0, current_stream), None)
+            current_stream, container_size = None, 0
+
+        obj = reader.get_object(IndirectObject(num, generation, reader))
+
+        if stream_num is not None and current_stream is None:
+            current_stream = stream_num
+            container_size = _stream_size(reader.resolved_objects.get((0, stream_num)))
+        peak = max(peak, size + container_size)
+        if peak > memory_limit:
+            raise MemoryLimitExceeded(f"对象流 {stream_num} 解码后约 {container_size} 字节，超过内存上限 {memory_limit} 字节")
+
+        if obj is not None and not _is_container(obj):
+            offsets[num] = (write_object(output, num, generation, obj), generation)
+        # 写出后立即从缓存中移除，后续对象只以引用形式指向它
+        reader.resolved_objects.pop((generation, num), None)
+
+    write_xref_table(output, offsets, build_trailer(reader, max(offsets, default=0) + 1))
+    return {"objects": len(offsets), "peak_object_bytes": peak}
+
+
+def write_raw(reader: PdfReader, output: BinaryIO,
+              memory_limit: int = DEFAULT_MEMORY_LIMIT) -> Dict[str, int]:
+    """
+    只去除加密层，逐个对象原样写出
+
+    对象流去除加密后整体写出，其中的成员既不解压也不解析；
+    所有流的编码数据（FlateDecode、DCTDecode等）逐字节保留。
+
+    Args:
+        reader: 已用正确密码解密的reader（未加密的reader也可以）
+        output: 可定位的二进制输出流
+        memory_limit: 单个对象的大小上限（字节）
+
+    Returns:
+        写出统计：objects（写出的顶层对象数）与 object_stream_members（原样保留的对象流成员数）
+
+    Raises:
+        MemoryLimitExceeded: 某个对象超过了内存上限
+    """
+    write_header(reader, output)
+    skip = encrypt_object_number(reader)
+    entries: Dict[int, Tuple[int, int, int]] = {}
+    members = 0
+
+    for num, generation, stream_num, size in objects_in_xref_order(reader):
+        if num == skip:
+            continue
+        if stream_num is not None:
+            # 成员随对象流一起原样写出，这里只记录引用
+            entries[num] = (2, stream_num, reader.xref_objStm[num][1])
+            members += 1
+            continue
+        if size > memory_limit:
+            raise MemoryLimitExceeded(f"对象 {num} {generation} 约 {size} 字节，超过内存上限 {memory_limit} 字节")
+
+        obj = reader.get_object(IndirectObject(num, generation, reader))
+        is_xref = isinstance(obj, StreamObject) and obj.get("/Type") == "/XRef"
+        if obj is not None and not is_xref:
+            entries[num] = (1, write_object(output, num, generation, obj), generation)
+        reader.resolved_objects.pop((generation, num), None)
+
+    trailer = build_trailer(reader, max(entries, default=0) + 1)
+    written = sum(1 for entry in entries.values() if entry[0] == 1)
+    if members:
+        # 对象流中的成员只能通过交叉引用流引用
+        write_xref_stream(output, entries, trailer)
+    else:
+        write_xref_table(output, {num: (entry[1], entry[2]) for num, entry in entries.items()}, trailer)
+    return {"objects": written, "object_stream_members": members}
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+分阶段计时与延迟直方图
+
+StageTimer 记录一次操作中各阶段（打开文件、解析交叉引用表、尝试密码、复制页面、写出）的耗时，
+结果以可选的 timings 字段附在返回的字典中。
+StatsRegistry 在服务器进程内按工具和阶段累计固定分桶的延迟直方图，由 get_server_stats 工具输出；
+每次调用的密码尝试次数单独记在一个按次数分桶的直方图中，不与毫秒混在一起。
+
+每个阶段只有两次 perf_counter 调用，直方图记录是一次二分查找加计数，可以一直开启。
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# 直方图分桶上界（毫秒），最后一个桶收集更慢的调用
+BUCKET_BOUNDS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 30000, 60000)
+# 密码尝试次数直方图的分桶上界（次）
+ATTEMPT_BUCKET_BOUNDS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+
+class StageTimer:
+    """记录一次操作中各阶段的耗时，同名阶段累加"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages: Dict[str, float] = {}
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - start
+
+    def merge(self, report: Dict[str, Any]) -> None:
+        """累加另一次操作 report() 中的各阶段耗时（批量任务汇总单个文件的计时）"""
+        for name, milliseconds in report.get("stages_ms", {}).items():
+            self.stages[name] = self.stages.get(name, 0.0) + milliseconds / 1000
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def report(self, attempts: Optional[int] = None) -> Dict[str, Any]:
+        """结果中的 timings 字段：各阶段与总耗时（毫秒），以及密码尝试次数"""
+        report: Dict[str, Any] = {
+            "stages_ms": {name: round(seconds * 1000, 3) for name, seconds in self.stages.items()},
+            "total_ms": round(self.elapsed() * 1000, 3),
+        }
+        if attempts is not None:
+            report["attempts"] = attempts
+        return report
+
+
+class Histogram:
+    """固定分桶的直方图，默认记录延迟（毫秒）；unit 为输出字段名的后缀，为空时不加后缀"""
+
+    def __init__(self, bounds: Tuple[float, ...] = BUCKET_BOUNDS_MS, unit: str = "ms"):
+        self.bounds = bounds
+        self.suffix = f"_{unit}" if unit else ""
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q: float) -> Optional[float]:
+        """分位数的估计值：所在分桶的上界（最后一个桶取最大值）"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return float(self.bounds[index]) if index < len(self.bounds) else self.max
+        return self.max
+
+    def snapshot(self) -> Dict[str, Any]:
+        buckets: List[Tuple[str, int]] = []
+        for index, count in enumerate(self.counts):
+            if count:
+                label = f"<={self.bounds[index]}" if index < len(self.bounds) else f">{self.bounds[-1]}"
+                buckets.append((label, count))
+        suffix = self.suffix
+        return {
+            "count": self.count,
+            f"mean{suffix}": round(self.total / self.count, 3) if self.count else None,
+            f"p50{suffix}": self.quantile(0.5),
+            f"p90{suffix}": self.quantile(0.9),
+            f"p99{suffix}": self.quantile(0.99),
+            f"max{suffix}": round(self.max, 3),
+            f"buckets{suffix}": dict(buckets),
+        }
+
+
+class StatsRegistry:
+    """服务器进程内按工具、按阶段累计的调用统计，可在多个线程中记录"""
+
+    def __init__(self):
+        self.started = time.time()
+        self._lock = threading.Lock()
+        self._calls: Dict[str, Histogram] = {}
+        self._errors: Dict[str, int] = {}
+        self._stages: Dict[str, Dict[str, Histogram]] = {}
+        self._attempts: Dict[str, Histogram] = {}
+
+    def record(self, tool: str, seconds: float, success: bool = True,
+               timings: Optional[Dict[str, Any]] = None) -> None:
+        """记录一次工具调用的总耗时与（如果有）各阶段耗时"""
+        with self._lock:
+            self._calls.setdefault(tool, Histogram()).observe(seconds * 1000)
+            if not success:
+                self._errors[tool] = self._errors.get(tool, 0) + 1
+            if timings:
+                stages = self._stages.setdefault(tool, {})
+                for name, milliseconds in timings.get("stages_ms", {}).items():
+                    stages.setdefault(name, Histogram()).observe(milliseconds)
+                if "attempts" in timings:
+                    self._attempts.setdefault(
+                        tool, Histogram(ATTEMPT_BUCKET_BOUNDS, unit="")
+                    ).observe(timings["attempts"])
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "uptime_seconds": round(time.time() - self.started, 3),
+                "tools": {
+                    tool: {
+                        "calls": histogram.count,
+                        "errors": self._errors.get(tool, 0),
+                        "latency": histogram.snapshot(),
+                        "stages": {
+                            name: stage.snapshot()
+                            for name, stage in self._stages.get(tool, {}).items()
+                        },
+                        "password_attempts": (
+                            self._attempts[tool].snapshot() if tool in self._attempts else None
+                        ),
+                    }
+                    for tool, histogram in self._calls.items()
+                },
+            }
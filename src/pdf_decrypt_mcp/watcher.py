@@ -0,0 +1,464 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+目录监视模式
+
+监视目录中新出现的PDF文件，写入完成后放入有界队列，由工作线程按批量解密的单文件流程处理
+（未加密的文件跳过，加密的文件写出"_解密版"）。
+
+- Linux 上使用 inotify（通过 ctypes 调用，不需要额外依赖），只在文件关闭写入或移入目录时收到事件，
+  不做周期性的全量扫描；递归模式下新建的子目录会自动加入监视。
+  内核事件队列溢出时对监视的目录补扫一次。
+- 其他平台或 inotify 不可用时退回到轮询：每隔 poll_interval 秒扫描一次，比较文件大小和修改时间。
+- 去抖动：文件在 settle 秒内大小和修改时间都没有变化才视为写入完成，仍在写入的文件会推迟处理。
+- 已处理文件的记录在文件被删除或移出目录时（轮询模式下扫描不再看到它时）清除，长时间运行的监视不会无限增长。
+- 队列已满时监视线程等待工作线程，形成背压。
+"""
+
+import ctypes
+import ctypes.util
+import logging
+import os
+import queue
+import select
+import struct
+import threading
+import time
+import uuid
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+from .check_cache import Validator, stat_validator
+from .password_ranking import PasswordRanking
+from .scanner import PathFilter, is_pdf_name, iter_pdf_files
+
+logger = logging.getLogger(__name__)
+
+# 文件写入完成后等待的秒数
+DEFAULT_SETTLE = 1.0
+# 轮询模式的扫描间隔
+DEFAULT_POLL_INTERVAL = 2.0
+# 等待处理的文件队列长度
+DEFAULT_QUEUE_SIZE = 256
+# 状态中保留的最近结果数
+RECENT_RESULTS = 20
+
+# inotify 常量（linux/inotify.h）
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+_WATCH_MASK = (IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+               | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR)
+_EVENT_HEADER = struct.Struct("iIII")
+
+# 结果回调：单个文件的处理结果
+ResultCallback = Callable[[Dict[str, Any]], None]
+_STOP = object()
+
+
+class _InotifySource:
+    """inotify 事件源，产出 (相对目录, 文件或子目录名, 事件掩码)"""
+
+    name = "inotify"
+
+    def __init__(self):
+        libc_name = ctypes.util.find_library("c")
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        self._libc.inotify_add_watch.argtypes = (ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32)
+        self.fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+        self._dirs: Dict[int, Tuple[str, int]] = {}
+
+    def add_watch(self, path: str, rel_dir: str, depth: int) -> None:
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), _WATCH_MASK)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno), path)
+        self._dirs[wd] = (rel_dir, depth)
+
+    def depth_of(self, rel_dir: str) -> int:
+        for watched_dir, depth in self._dirs.values():
+            if watched_dir == rel_dir:
+                return depth
+        return 0
+
+    def read(self, timeout: float) -> Optional[List[Tuple[str, str, int]]]:
+        """等待最多timeout秒；内核队列溢出时返回None"""
+        readable, _, _ = select.select([self.fd], [], [], max(timeout, 0))
+        if not readable:
+            return []
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        events = []
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            wd, mask, _cookie, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b"\0"))
+            offset += length
+            if mask & IN_Q_OVERFLOW:
+                return None
+            if mask & IN_IGNORED:
+                self._dirs.pop(wd, None)
+                continue
+            if wd in self._dirs and name:
+                events.append((self._dirs[wd][0], name, mask))
+        return events
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class DirectoryWatcher:
+    """监视目录并自动解密新出现的PDF文件"""
+
+    def __init__(self, decryptor: Any, directory: str, password: Optional[str] = None,
+                 recursive: bool = False, include: Optional[Sequence[str]] = None,
+                 exclude: Optional[Sequence[str]] = None, max_depth: Optional[int] = None,
+                 settle: float = DEFAULT_SETTLE, queue_size: int = DEFAULT_QUEUE_SIZE,
+                 workers: int = 1, poll_interval: float = DEFAULT_POLL_INTERVAL,
+                 use_inotify: Optional[bool] = None, process_existing: bool = False,
+                 on_result: Optional[ResultCallback] = None):
+        """
+        Args:
+            decryptor: PDFDecryptor 实例
+            directory: 监视的目录
+            password: 解密密码（可选，默认尝试常见密码）
+            recursive / include / exclude / max_depth: 与批量解密相同的目录遍历参数
+            settle: 文件大小和修改时间保持不变多少秒后视为写入完成
+            queue_size: 等待处理的文件队列长度
+            workers: 处理文件的工作线程数
+            poll_interval: 轮询模式的扫描间隔（秒）
+            use_inotify: 是否使用 inotify（可选，默认可用时使用）
+            process_existing: 是否也处理启动时已存在的文件
+            on_result: 每处理完一个文件调用一次的回调（可选，在工作线程中调用）
+        """
+        if not os.path.isdir(directory):
+            raise ValueError(f"目录不存在: {directory}")
+        if workers < 1 or queue_size < 1:
+            raise ValueError("workers 和 queue_size 必须大于0")
+        self.watch_id = uuid.uuid4().hex[:12]
+        self.decryptor = decryptor
+        self.directory = directory
+        self.password = password
+        self.max_depth = (max_depth if recursive else 0)
+        self.path_filter = PathFilter(include, exclude)
+        self._traversal = (recursive, include, exclude, max_depth)
+        self.settle = settle
+        self.poll_interval = poll_interval
+        self.process_existing = process_existing
+        self.on_result = on_result
+        self.queue: "queue.Queue[Any]" = queue.Queue(maxsize=queue_size)
+        self.workers = workers
+        self._use_inotify = use_inotify
+        self._source: Optional[_InotifySource] = None
+        # 事件来源：inotify 或 polling，启动时确定
+        self.mode = "polling"
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+        # 等待写入完成的文件：相对路径 → (到期时间, 上次看到的stat)
+        self._pending: Dict[str, Tuple[float, Optional[Validator]]] = {}
+        # 已在队列中或正在处理的文件
+        self._active: Set[str] = set()
+        # 已处理文件的stat，内容未变化的重复事件不再处理
+        self._processed: Dict[str, Validator] = {}
+        self._recent: Deque[Dict[str, Any]] = deque(maxlen=RECENT_RESULTS)
+        self.counters = {"detected": 0, "queued": 0, "decrypted": 0, "not_encrypted": 0, "failed": 0}
+        self.started_at: Optional[float] = None
+        self.error: Optional[str] = None
+        self._ranking = PasswordRanking(decryptor.common_passwords)
+
+    @property
+    def running(self) -> bool:
+        return bool(self._threads) and not self._stop.is_set()
+
+    def start(self) -> "DirectoryWatcher":
+        if self._use_inotify is not False:
+            try:
+                self._source = _InotifySource()
+                self._watch_tree(self.directory, "", 0)
+            except (OSError, AttributeError) as e:
+                if self._source is not None:
+                    self._source.close()
+                    self._source = None
+                if self._use_inotify:
+                    raise
+                logger.info(f"inotify 不可用，改用轮询: {e}")
+        self.mode = self._source.name if self._source is not None else "polling"
+        self.started_at = time.time()
+        snapshot = self._scan()
+        if self.process_existing:
+            now = time.monotonic()
+            for rel_path in snapshot:
+                self._detect(rel_path, now)
+        target = self._watch_events if self._source is not None else self._poll
+        self._threads = [threading.Thread(target=target, args=(snapshot,), name=f"pdf-watch-{self.watch_id}",
+                                          daemon=True)]
+        self._threads += [
+            threading.Thread(target=self._work, name=f"pdf-watch-{self.watch_id}-worker-{i}", daemon=True)
+            for i in range(self.workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def stop(self, timeout: Optional[float] = 10.0) -> None:
+        """停止监视；队列中尚未开始处理的文件被丢弃"""
+        self._stop.set()
+        while True:
+            try:
+                self.queue.get_nowait()
+            except queue.Empty:
+                break
+        for _ in range(self.workers):
+            try:
+                self.queue.put(_STOP, timeout=timeout)
+            except queue.Full:
+                break
+        for thread in self._threads:
+            thread.join(timeout)
+        if self._source is not None:
+            self._source.close()
+            self._source = None
+
+    def wait(self) -> None:
+        """阻塞到监视停止（命令行模式）"""
+        while not self._stop.wait(0.5):
+            pass
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "watch_id": self.watch_id,
+                "directory": self.directory,
+                "running": self.running,
+                "mode": self.mode,
+                "started_at": self.started_at,
+                "pending_files": len(self._pending),
+                "queued_files": self.queue.qsize(),
+                **self.counters,
+                "recent_results": list(self._recent),
+                "error": self.error,
+            }
+
+    def _watch_tree(self, path: str, rel_dir: str, depth: int) -> None:
+        """把目录（递归模式下连同允许的子目录）加入 inotify 监视"""
+        self._source.add_watch(path, rel_dir, depth)
+        if self.max_depth is not None and depth >= self.max_depth:
+            return
+        with os.scandir(path) as it:
+            for entry in it:
+                rel_path = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+                if entry.is_dir(follow_symlinks=False) and self.path_filter.accepts_dir(rel_path, entry.name):
+                    self._watch_tree(entry.path, rel_path, depth + 1)
+
+    def _scan(self, rel_dir: str = "") -> Dict[str, Validator]:
+        """扫描目录（或其中的子目录），返回 相对路径 → stat"""
+        recursive, include, exclude, max_depth = self._traversal
+        root = os.path.join(self.directory, rel_dir) if rel_dir else self.directory
+        if rel_dir and max_depth is not None:
+            max_depth -= rel_dir.count("/") + 1
+            if max_depth < 0:
+                return {}
+        snapshot = {}
+        for rel_path, entry in iter_pdf_files(root, recursive, include, exclude, max_depth, scan_workers=1):
+            rel_path = f"{rel_dir}/{rel_path}" if rel_dir else rel_path
+            try:
+                snapshot[rel_path] = stat_validator(entry.stat())
+            except OSError:
+                continue
+        return snapshot
+
+    def _accepts(self, rel_path: str, name: str) -> bool:
+        return is_pdf_name(name) and self.path_filter.accepts_file(rel_path, name)
+
+    def _detect(self, rel_path: str, now: float) -> None:
+        """收到文件事件：记录当前stat并（重新）开始去抖动计时"""
+        try:
+            seen: Optional[Validator] = stat_validator(os.stat(os.path.join(self.directory, rel_path)))
+        except OSError:
+            seen = None
+        with self._lock:
+            if rel_path not in self._pending:
+                self.counters["detected"] += 1
+            self._pending[rel_path] = (now + self.settle, seen)
+
+    def _forget(self, rel_path: str, is_dir: bool = False) -> None:
+        """文件（或目录下的所有文件）被删除或移出：清除已处理和等待中的记录"""
+        prefix = rel_path + "/"
+        with self._lock:
+            for table in (self._processed, self._pending):
+                table.pop(rel_path, None)
+                if is_dir:
+                    for key in [key for key in table if key.startswith(prefix)]:
+                        del table[key]
+
+    def _prune(self, snapshot: Dict[str, Validator]) -> None:
+        """全量扫描后清除已不存在的文件的处理记录"""
+        with self._lock:
+            for rel_path in [rel_path for rel_path in self._processed if rel_path not in snapshot]:
+                del self._processed[rel_path]
+
+    def _handle_events(self, events: List[Tuple[str, str, int]], now: float) -> None:
+        for rel_dir, name, mask in events:
+            rel_path = f"{rel_dir}/{name}" if rel_dir else name
+            if mask & (IN_DELETE | IN_MOVED_FROM):
+                self._forget(rel_path, bool(mask & IN_ISDIR))
+            elif mask & IN_ISDIR:
+                if not (mask & (IN_CREATE | IN_MOVED_TO)) or not self.path_filter.accepts_dir(rel_path, name):
+                    continue
+                depth = self._source.depth_of(rel_dir) + 1
+                if self.max_depth is not None and depth > self.max_depth:
+                    continue
+                try:
+                    self._watch_tree(os.path.join(self.directory, rel_path), rel_path, depth)
+                except OSError as e:
+                    logger.warning(f"无法监视目录 {rel_path}: {e}")
+                    continue
+                # 加入监视之前已写入的文件
+                for found in self._scan(rel_path):
+                    self._detect(found, now)
+            elif mask & (IN_CLOSE_WRITE | IN_MOVED_TO) and self._accepts(rel_path, name):
+                self._detect(rel_path, now)
+
+    def _next_timeout(self, default: float) -> float:
+        with self._lock:
+            if not self._pending:
+                return default
+            return max(0.0, min(deadline for deadline, _ in self._pending.values()) - time.monotonic())
+
+    def _settle_pending(self) -> None:
+        """把到期且stat不再变化的文件放入队列"""
+        now = time.monotonic()
+        with self._lock:
+            due = [(rel_path, seen) for rel_path, (deadline, seen) in self._pending.items() if deadline <= now]
+        for rel_path, seen in due:
+            try:
+                current = stat_validator(os.stat(os.path.join(self.directory, rel_path)))
+            except OSError:
+                with self._lock:
+                    self._pending.pop(rel_path, None)
+                continue
+            if current != seen:
+                # 仍在变化：再等一个去抖动周期
+                with self._lock:
+                    self._pending[rel_path] = (now + self.settle, current)
+                continue
+            with self._lock:
+                self._pending.pop(rel_path, None)
+                if rel_path in self._active or self._processed.get(rel_path) == current:
+                    continue
+                self._active.add(rel_path)
+            self._enqueue((rel_path, current))
+
+    def _enqueue(self, item: Tuple[str, Validator]) -> None:
+        while not self._stop.is_set():
+            try:
+                self.queue.put(item, timeout=0.5)
+            except queue.Full:
+                continue
+            with self._lock:
+                self.counters["queued"] += 1
+            return
+
+    def _watch_events(self, snapshot: Dict[str, Validator]) -> None:
+        try:
+            while not self._stop.is_set():
+                events = self._source.read(min(self._next_timeout(1.0), 1.0))
+                now = time.monotonic()
+                if events is None:
+                    logger.warning("inotify 事件队列溢出，补扫监视的目录")
+                    current = self._scan()
+                    for rel_path, validator in current.items():
+                        if self._processed.get(rel_path) != validator and snapshot.get(rel_path) != validator:
+                            self._detect(rel_path, now)
+                    self._prune(current)
+                else:
+                    self._handle_events(events, now)
+                self._settle_pending()
+        except Exception as e:
+            logger.error(f"监视目录时出错: {e}")
+            self.error = str(e)
+            self._stop.set()
+
+    def _poll(self, snapshot: Dict[str, Validator]) -> None:
+        try:
+            next_scan = time.monotonic() + self.poll_interval
+            while not self._stop.wait(min(self._next_timeout(self.poll_interval),
+                                          max(0.0, next_scan - time.monotonic()))):
+                now = time.monotonic()
+                if now >= next_scan:
+                    current = self._scan()
+                    for rel_path, validator in current.items():
+                        if snapshot.get(rel_path) != validator:
+                            self._detect(rel_path, now)
+                    self._prune(current)
+                    snapshot = current
+                    next_scan = now + self.poll_interval
+                self._settle_pending()
+        except Exception as e:
+            logger.error(f"监视目录时出错: {e}")
+            self.error = str(e)
+            self._stop.set()
+
+    def _work(self) -> None:
+        while True:
+            item = self.queue.get()
+            if item is _STOP:
+                return
+            rel_path, validator = item
+            try:
+                result = self.decryptor.process_batch_file(self.directory, rel_path, self.password, self._ranking)
+            except Exception as e:
+                logger.error(f"处理文件 {rel_path} 时出错: {e}")
+                result = {"file": rel_path, "success": False, "error": str(e)}
+            result["processed_at"] = time.time()
+            # 处理期间被删除的文件不再记录，删除事件可能已先于此到达
+            exists = os.path.exists(os.path.join(self.directory, rel_path))
+            with self._lock:
+                self._active.discard(rel_path)
+                if exists:
+                    self._processed[rel_path] = validator
+                if result.get("success") and result.get("is_encrypted"):
+                    self.counters["decrypted"] += 1
+                elif result.get("success"):
+                    self.counters["not_encrypted"] += 1
+                else:
+                    self.counters["failed"] += 1
+                self._recent.append(result)
+            if self.on_result is not None:
+                try:
+                    self.on_result(result)
+                except Exception as e:
+                    logger.error(f"监视结果回调出错: {e}")
+
+
+def iter_watch_results(watcher: DirectoryWatcher) -> Iterator[Dict[str, Any]]:
+    """命令行模式：启动监视并逐个产出处理结果，直到监视停止"""
+    results: "queue.Queue[Dict[str, Any]]" = queue.Queue()
+    watcher.on_result = results.put
+    watcher.start()
+    try:
+        while watcher.running:
+            try:
+                yield results.get(timeout=0.5)
+            except queue.Empty:
+                continue
+    finally:
+        watcher.stop()
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+
+"""
+测试公共配置与夹具
+"""
+
+import asyncio
+import json
+import os
+import sys
+import time
+from typing import Any, Callable, Dict, Optional
+
+import pytest
+
+# 添加src目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), 'src'))
+
+# 测试中不读写用户目录下的密码缓存
+os.environ["PDF_DECRYPT_PASSWORD_CACHE"] = "off"
+
+
+def write_pdf(path: str, pages: int = 1, password: Optional[str] = None,
+              use_128bit: bool = True) -> str:
+    """生成测试用PDF文件，password不为None时使用RC4加密"""
+    from PyPDF2 import PdfWriter
+    
+    writer = PdfWriter()
+    for _ in range(pages):
+        writer.add_blank_page(width=200, height=200)
+    if password is not None:
+        writer.encrypt(password, use_128bit=use_128bit)
+    with open(path, 'wb') as f:
+        writer.write(f)
+    return str(path)
+
+
+@pytest.fixture
+def make_pdf(tmp_path):
+    """在临时目录中生成PDF文件的工厂夹具"""
+    def _make(name: str = "sample.pdf", **kwargs) -> str:
+        return write_pdf(os.path.join(tmp_path, name), **kwargs)
+    return _make
+
+
+@pytest.fixture
+def wait_for():
+    """轮询等待条件成立的夹具，超时返回False"""
+    def _wait(predicate: Callable[[], bool], timeout: float = 10.0) -> bool:
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if predicate():
+                return True
+            time.sleep(0.02)
+        return False
+    return _wait
+
+
+@pytest.fixture
+def call_tool():
+    """在新的事件循环中调用MCP工具，返回解析后的JSON结果"""
+    from pdf_decrypt_mcp import server
+    
+    def _call(name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        return json.loads(asyncio.run(server.handle_call_tool(name, arguments)).content[0].text)
+    return _call
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+
+import os
+import threading
+
+from pdf_decrypt_mcp import PDFDecryptor
+from pdf_decrypt_mcp.admission import BASE_COST, MemoryBudget, estimate_cost
+
+
+def test_estimate_grows_with_size_and_objects(make_pdf, tmp_path):
+    small = make_pdf("small.pdf", pages=1)
+    large = make_pdf("large.pdf", pages=50)
+    
+    assert BASE_COST < estimate_cost(small) < estimate_cost(large)
+    assert estimate_cost(str(tmp_path / "missing.pdf")) == BASE_COST
+
+
+def test_budget_admits_in_order(wait_for):
+    budget = MemoryBudget(100)
+    first = budget.acquire(60)
+    admitted = []
+    
+    def worker(name, cost):
+        granted = budget.acquire(cost)
+        admitted.append(name)
+        budget.release(granted)
+    
+    big = threading.Thread(target=worker, args=("big", 80))
+    big.start()
+    assert wait_for(lambda: budget.stats()["waiting"] == 1)
+    # 有更早的等待者时，放得下的小请求也不插队
+    assert budget.try_acquire(10) is None
+    small = threading.Thread(target=worker, args=("small", 10))
+    small.start()
+    assert wait_for(lambda: budget.stats()["waiting"] == 2)
+    
+    budget.release(first)
+    big.join(5)
+    small.join(5)
+    
+    assert admitted == ["big", "small"]
+    stats = budget.stats()
+    assert (stats["in_use_bytes"], stats["running"], stats["queued"]) == (0, 0, 2)
+    assert stats["peak_bytes"] <= 100
+
+
+def test_oversized_request_runs_alone():
+    budget = MemoryBudget(100)
+    
+    granted = budget.try_acquire(500)
+    assert granted == 100
+    assert budget.try_acquire(1) is None
+    budget.release(granted)
+    assert budget.try_acquire(1) == 1
+
+
+def test_decrypt_waits_for_budget(make_pdf, tmp_path, wait_for):
+    input_path = make_pdf("locked.pdf", password="password")
+    budget = MemoryBudget(estimate_cost(input_path))
+    decryptor = PDFDecryptor(backend="pypdf2", memory_budget=budget)
+    
+    held = budget.acquire(1)
+    result = {}
+    thread = threading.Thread(target=lambda: result.update(decryptor.decrypt_pdf(input_path, timings=True)))
+    thread.start()
+    assert wait_for(lambda: budget.stats()["waiting"] == 1)
+    budget.release(held)
+    thread.join(10)
+    
+    assert result["success"] is True
+    assert result["timings"]["stages_ms"]["admission"] > 0
+    assert budget.stats()["in_use_bytes"] == 0
+
+
+def test_batch_releases_budget(make_pdf, tmp_path):
+    for i in range(3):
+        make_pdf(f"{i}.pdf", password="password")
+    budget = MemoryBudget(estimate_cost(str(tmp_path / "0.pdf")) * 2)
+    decryptor = PDFDecryptor(memory_budget=budget)
+    
+    serial = decryptor.batch_decrypt_pdfs(str(tmp_path))
+    for name in os.listdir(tmp_path):
+        if "_解密版" in name:
+            os.remove(tmp_path / name)
+    parallel = decryptor.batch_decrypt_pdfs(str(tmp_path), max_workers=2)
+    
+    assert serial["decrypted_files"] == parallel["decrypted_files"] == 3
+    stats = budget.stats()
+    assert (stats["in_use_bytes"], stats["running"]) == (0, 0)
+    assert stats["peak_bytes"] <= budget.limit
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+
+import io
+import os
+import tarfile
+import zipfile
+
+import pytest
+from PyPDF2 import PdfReader
+
+from pdf_decrypt_mcp import PDFDecryptor
+from pdf_decrypt_mcp import archive as archive_module
+from pdf_decrypt_mcp.archive import ArchiveWriter, archive_format
+from pdf_decrypt_mcp.backends import pikepdf_available
+
+AVAILABLE = ["pypdf2"] + (["pikepdf"] if pikepdf_available() else [])
+
+
+def _members(path):
+    if path.endswith(".zip"):
+        with zipfile.ZipFile(path) as archive:
+            assert archive.testzip() is None
+            return {name: archive.read(name) for name in archive.namelist()}
+    with tarfile.open(path) as archive:
+        return {member.name: archive.extractfile(member).read() for member in archive.getmembers()}
+
+
+@pytest.mark.parametrize("backend", AVAILABLE)
+@pytest.mark.parametrize("extension", ["zip", "tar"])
+def test_batch_writes_archive(make_pdf, tmp_path, extension, backend):
+    make_pdf("讲义.pdf", pages=2, password="password")
+    os.makedirs(tmp_path / "sub")
+    make_pdf(os.path.join("sub", "b.pdf"), password="123456")
+    make_pdf("plain.pdf")
+    make_pdf("locked.pdf", password="not-a-common-password")
+    archive_path = str(tmp_path.parent / f"{tmp_path.name}.{extension}")
+    
+    result = PDFDecryptor(backend=backend).batch_decrypt_pdfs(
+        str(tmp_path), recursive=True, max_workers=2, output_archive=archive_path)
+    
+    assert result["output_archive"] == archive_path
+    assert (result["decrypted_files"], result["failed_files"]) == (2, 1)
+    assert not [name for _, _, files in os.walk(tmp_path) for name in files if "_解密版" in name]
+    members = _members(archive_path)
+    assert sorted(members) == ["sub/b.pdf", "讲义.pdf"]
+    reader = PdfReader(io.BytesIO(members["讲义.pdf"]))
+    assert not reader.is_encrypted
+    assert len(reader.pages) == 2
+    decrypted = {item["file"]: item for item in result["results"] if item.get("archive_member")}
+    assert decrypted["讲义.pdf"]["output_path"] == archive_path
+    # 未加密的文件与写到磁盘时一样被跳过
+    plain = next(item for item in result["results"] if item["file"] == "plain.pdf")
+    assert plain["message"] == "文件未加密" and "archive_member" not in plain
+
+
+@pytest.mark.parametrize("extension", ["zip", "tar"])
+def test_failed_member_is_rolled_back(tmp_path, extension):
+    path = str(tmp_path / f"out.{extension}")
+    with ArchiveWriter(path) as archive:
+        with archive.entry("first.pdf") as output:
+            output.write(b"first")
+        with pytest.raises(RuntimeError):
+            with archive.entry("broken.pdf") as output:
+                output.write(b"x" * 5000)
+                raise RuntimeError("写出失败")
+        with archive.entry("last.pdf") as output:
+            output.write(b"last")
+    
+    assert archive.members == ["first.pdf", "last.pdf"]
+    assert _members(path) == {"first.pdf": b"first", "last.pdf": b"last"}
+
+
+def test_large_zip_member_spills_to_disk(tmp_path, monkeypatch):
+    monkeypatch.setattr(archive_module, "ARCHIVE_SPOOL_SIZE", 1024)
+    payload = bytes(range(256)) * 64
+    path = str(tmp_path / "out.zip")
+    with ArchiveWriter(path) as archive:
+        with archive.entry("big.pdf") as output:
+            output.write(payload)
+    
+    assert _members(path) == {"big.pdf": payload}
+
+
+def test_archive_options_are_validated(make_pdf, tmp_path):
+    make_pdf("a.pdf", password="password")
+    decryptor = PDFDecryptor(backend="pypdf2")
+    
+    with pytest.raises(ValueError):
+        archive_format("out.rar")
+    assert decryptor.batch_decrypt_pdfs(str(tmp_path), output_archive=str(tmp_path / "out.rar"))["success"] is False
+    assert decryptor.batch_decrypt_pdfs(str(tmp_path), incremental=True,
+                                        output_archive=str(tmp_path / "out.zip"))["success"] is False
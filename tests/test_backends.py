@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+from PyPDF2 import PdfReader
+
+from pdf_decrypt_mcp import PDFDecryptor
+from pdf_decrypt_mcp.backends import BACKEND_ENV, get_backend, pikepdf_available
+
+AVAILABLE = ["pypdf2"] + (["pikepdf"] if pikepdf_available() else [])
+
+
+def test_backend_setting(monkeypatch):
+    monkeypatch.setenv(BACKEND_ENV, "pypdf2")
+    assert PDFDecryptor().backend.name == "pypdf2"
+    assert get_backend("auto").name == AVAILABLE[-1]
+    with pytest.raises(ValueError):
+        get_backend("qpdf")
+
+
+@pytest.mark.parametrize("backend", AVAILABLE)
+def test_backends_agree(make_pdf, backend):
+    path = make_pdf("locked.pdf", pages=3, password="password")
+    decryptor = PDFDecryptor(backend=backend)
+
+    check = decryptor.check_pdf_encryption(path)
+    result = decryptor.decrypt_pdf(path)
+
+    assert check["is_encrypted"] is True
+    assert check["file_info"]["pages"] is None
+    assert result["success"] and result["password_used"] == "password"
+    reader = PdfReader(result["output_path"])
+    assert not reader.is_encrypted
+    assert len(reader.pages) == 3
+    assert decryptor.check_pdf_encryption(result["output_path"])["file_info"]["pages"] == 3
+
+
+@pytest.mark.parametrize("backend", AVAILABLE)
+def test_wrong_password_fails(make_pdf, backend):
+    path = make_pdf("locked.pdf", password="not-common")
+
+    result = PDFDecryptor(backend=backend).decrypt_pdf(path, password="wrong")
+
+    assert not result["success"]
+    assert result["attempts"] == 1
+
+
+@pytest.mark.parametrize("backend", AVAILABLE)
+def test_stream_engine_honors_memory_limit(make_pdf, backend):
+    path = make_pdf("locked.pdf", pages=2, password="password")
+    decryptor = PDFDecryptor(backend=backend)
+
+    limited = decryptor.decrypt_pdf(path, str(path) + ".limited", engine="stream", memory_limit=16)
+    result = decryptor.decrypt_pdf(path, engine="stream")
+
+    assert limited["success"] is False
+    assert result["success"] is True
+    assert len(PdfReader(result["output_path"]).pages) == 2
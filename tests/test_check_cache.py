@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+
+import os
+import time
+
+from pdf_decrypt_mcp import PDFDecryptor, server
+from pdf_decrypt_mcp.check_cache import CheckResultCache
+
+
+def _counting_decryptor(monkeypatch, **cache_kwargs):
+    decryptor = PDFDecryptor(backend="pypdf2", check_cache=CheckResultCache(**cache_kwargs))
+    opened = []
+    original_open = decryptor.backend.open
+    
+    def counting_open(path, timer=None):
+        opened.append(path)
+        return original_open(path, timer)
+    
+    monkeypatch.setattr(decryptor.backend, "open", counting_open)
+    return decryptor, opened
+
+
+def test_repeated_check_is_served_from_cache(make_pdf, monkeypatch):
+    path = make_pdf("locked.pdf", pages=2, password="secret")
+    decryptor, opened = _counting_decryptor(monkeypatch)
+    
+    first = decryptor.check_pdf_encryption(path)
+    second = decryptor.check_pdf_encryption(path)
+    
+    assert first["cache_hit"] is False
+    assert second["cache_hit"] is True
+    assert second["is_encrypted"] is True
+    assert len(opened) == 1
+    assert decryptor.check_cache.stats()["hits"] == 1
+    # 快速探测与完整检查分别缓存
+    assert decryptor.check_pdf_encryption(path, fast=True)["cache_hit"] is False
+
+
+def test_changed_file_invalidates_entry(make_pdf, monkeypatch):
+    path = make_pdf("doc.pdf", pages=1)
+    decryptor, opened = _counting_decryptor(monkeypatch)
+    
+    assert decryptor.check_pdf_encryption(path)["file_info"]["pages"] == 1
+    stat = os.stat(path)
+    make_pdf("doc.pdf", pages=3)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    result = decryptor.check_pdf_encryption(path)
+    
+    assert result["cache_hit"] is False
+    assert result["file_info"]["pages"] == 3
+    assert decryptor.check_cache.stats()["stale"] == 1
+    assert len(opened) == 2
+
+
+def test_ttl_and_lru_eviction(make_pdf, monkeypatch):
+    paths = [make_pdf(f"doc_{i}.pdf") for i in range(3)]
+    decryptor, opened = _counting_decryptor(monkeypatch, max_entries=2, ttl=0.05)
+    
+    for path in paths:
+        decryptor.check_pdf_encryption(path)
+    assert decryptor.check_cache.stats()["evictions"] == 1
+    assert decryptor.check_pdf_encryption(paths[0])["cache_hit"] is False
+    
+    time.sleep(0.1)
+    assert decryptor.check_pdf_encryption(paths[2])["cache_hit"] is False
+    assert decryptor.check_cache.stats()["expired"] == 1
+
+
+def test_from_env(monkeypatch):
+    monkeypatch.setenv("PDF_DECRYPT_CHECK_CACHE_SIZE", "0")
+    assert CheckResultCache.from_env() is None
+    
+    monkeypatch.setenv("PDF_DECRYPT_CHECK_CACHE_SIZE", "8")
+    monkeypatch.setenv("PDF_DECRYPT_CHECK_CACHE_TTL", "2.5")
+    cache = CheckResultCache.from_env()
+    assert (cache.max_entries, cache.ttl) == (8, 2.5)
+
+
+def test_server_stats_report_cache_counts(make_pdf, monkeypatch, call_tool):
+    monkeypatch.setattr(server, "pdf_decryptor", PDFDecryptor(check_cache=CheckResultCache()))
+    path = make_pdf("doc.pdf")
+    
+    for _ in range(3):
+        call_tool("check_pdf_encryption", {"file_path": path})
+    stats = call_tool("get_server_stats", {})
+    
+    assert stats["check_cache"]["hits"] == 2
+    assert stats["check_cache"]["misses"] == 1
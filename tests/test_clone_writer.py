@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+
+from PyPDF2 import PdfReader, PdfWriter
+from PyPDF2.generic import ArrayObject, DictionaryObject, NameObject, TextStringObject
+
+from pdf_decrypt_mcp import PDFDecryptor
+
+
+def _write_book(path: str) -> str:
+    writer = PdfWriter()
+    for _ in range(3):
+        writer.add_blank_page(width=200, height=200)
+    chapter = writer.add_outline_item("第一章", 0)
+    writer.add_outline_item("1.1 节", 1, parent=chapter)
+    writer.add_outline_item("第二章", 2)
+    writer.add_named_destination("appendix", 2)
+    writer.add_metadata({"/Title": TextStringObject("讲义")})
+    writer._root_object[NameObject("/AcroForm")] = writer._add_object(DictionaryObject({
+        NameObject("/Fields"): ArrayObject(),
+    }))
+    writer.encrypt("password", use_128bit=True)
+    with open(path, "wb") as f:
+        writer.write(f)
+    return path
+
+
+def test_clone_preserves_document_structure(tmp_path):
+    input_path = _write_book(str(tmp_path / "book.pdf"))
+
+    result = PDFDecryptor(backend="pypdf2").decrypt_pdf(input_path)
+
+    assert result["success"], result
+    reader = PdfReader(result["output_path"], strict=True)
+    assert not reader.is_encrypted
+    assert len(reader.pages) == 3
+    assert [item.title for item in reader.outline if not isinstance(item, list)] == ["第一章", "第二章"]
+    assert reader.outline[1][0].title == "1.1 节"
+    assert list(reader.named_destinations) == ["appendix"]
+    assert reader.metadata.title == "讲义"
+    assert "/AcroForm" in reader.trailer["/Root"]
+
+
+def test_pages_engine_keeps_only_pages(tmp_path):
+    input_path = _write_book(str(tmp_path / "book.pdf"))
+
+    result = PDFDecryptor(backend="pypdf2").decrypt_pdf(input_path, engine="pages")
+
+    reader = PdfReader(result["output_path"])
+    assert len(reader.pages) == 3
+    assert reader.outline == []
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+
+import os
+import tracemalloc
+
+from pdf_decrypt_mcp import PDFDecryptor
+from pdf_decrypt_mcp.fileops import copy_file
+
+
+def test_copy_file_keeps_memory_flat(tmp_path):
+    src = tmp_path / "big.bin"
+    with open(src, "wb") as f:
+        f.write(os.urandom(1024 * 1024) * 16)
+    dst = tmp_path / "copy.bin"
+    
+    tracemalloc.start()
+    try:
+        method = copy_file(str(src), str(dst))
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    
+    assert method in ("copy_file_range", "sendfile", "stream")
+    assert dst.read_bytes() == src.read_bytes()
+    assert peak < 4 * 1024 * 1024
+
+
+def test_copy_file_link_mode(tmp_path):
+    src = tmp_path / "a.pdf"
+    src.write_bytes(b"%PDF-1.4 data")
+    dst = tmp_path / "b.pdf"
+    dst.write_bytes(b"old")
+    
+    method = copy_file(str(src), str(dst), link=True)
+    
+    assert method in ("reflink", "hardlink")
+    assert dst.read_bytes() == b"%PDF-1.4 data"
+    if method == "hardlink":
+        assert os.stat(src).st_ino == os.stat(dst).st_ino
+
+
+def test_decrypt_unencrypted_pdf_copies_without_parsing(make_pdf, monkeypatch):
+    path = make_pdf("plain.pdf", pages=3)
+    
+    def no_open(*args, **kwargs):
+        raise AssertionError("未加密文件不应打开解析")
+    
+    decryptor = PDFDecryptor()
+    monkeypatch.setattr(decryptor.backend, "open", no_open)
+    result = decryptor.decrypt_pdf(path)
+    
+    assert result["success"] is True
+    assert result["copy_method"] in ("copy_file_range", "sendfile", "stream")
+    with open(path, "rb") as src, open(result["output_path"], "rb") as dst:
+        assert src.read() == dst.read()
+
+
+def test_invalid_engine_is_rejected_for_unencrypted_input(make_pdf, tmp_path):
+    decryptor = PDFDecryptor(backend="pypdf2")
+    
+    for path in (make_pdf("plain.pdf"), make_pdf("locked.pdf", password="password")):
+        result = decryptor.decrypt_pdf(path, engine="bogus")
+        assert result["success"] is False
+        assert "不支持的写出方式" in result["error"]
+    assert not os.path.exists(tmp_path / "plain_解密版.pdf")
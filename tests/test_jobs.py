@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+
+import os
+import threading
+import time
+
+from pdf_decrypt_mcp import PDFDecryptor
+from pdf_decrypt_mcp.jobs import CANCELLED, COMPLETED, QUEUED, JobManager
+
+
+def test_job_progress_and_result(make_pdf, tmp_path, wait_for):
+    make_pdf("a.pdf", password="password")
+    make_pdf("b.pdf")
+    make_pdf("c.pdf", password="not-a-common-password")
+    manager = JobManager(PDFDecryptor(backend="pypdf2").batch_decrypt_pdfs, max_workers=1)
+    
+    job = manager.submit(str(tmp_path))
+    assert wait_for(lambda: job.status()["state"] == COMPLETED)
+    
+    status = job.status()
+    assert status["progress"]["done"] == status["progress"]["total"] == 3
+    assert (status["progress"]["decrypted"], status["progress"]["not_encrypted"], status["progress"]["failed"]) == (1, 1, 1)
+    assert status["result"]["decrypted_files"] == 1
+    assert status["started_at"] <= status["finished_at"]
+
+
+def test_cancel_between_files(make_pdf, tmp_path, wait_for):
+    for i in range(5):
+        make_pdf(f"{i}.pdf", password="password")
+    decryptor = PDFDecryptor(backend="pypdf2")
+    
+    def run_batch(directory, progress_callback, cancel, **kwargs):
+        def progress(done, total, file_result):
+            progress_callback(done, total, file_result)
+            # 第一个文件处理完后取消
+            cancel.set()
+        return decryptor.batch_decrypt_pdfs(directory, progress_callback=progress, cancel=cancel, **kwargs)
+    
+    job = JobManager(run_batch, max_workers=1).submit(str(tmp_path))
+    assert wait_for(lambda: job.status()["finished_at"] is not None)
+    
+    status = job.status()
+    assert status["state"] == CANCELLED
+    assert status["result"]["cancelled"] is True
+    assert status["progress"]["done"] == 1
+    assert len([name for name in os.listdir(tmp_path) if "_解密版" in name]) == 1
+
+
+def test_cancel_queued_job(tmp_path, wait_for):
+    release = threading.Event()
+    manager = JobManager(lambda directory, **kwargs: release.wait() and {"success": True}, max_workers=1)
+    
+    running = manager.submit(str(tmp_path))
+    queued = manager.submit(str(tmp_path))
+    assert queued.status()["state"] == QUEUED
+    
+    manager.cancel(queued.job_id)
+    release.set()
+    assert wait_for(lambda: running.status()["state"] == COMPLETED)
+    assert queued.status()["state"] == CANCELLED
+    assert queued.started_at is None
+
+
+def test_batch_respects_preset_cancel(make_pdf, tmp_path):
+    make_pdf("a.pdf", password="password")
+    cancel = threading.Event()
+    cancel.set()
+    
+    result = PDFDecryptor(backend="pypdf2").batch_decrypt_pdfs(str(tmp_path), cancel=cancel)
+    
+    assert result["cancelled"] is True
+    assert not os.path.exists(tmp_path / "a_解密版.pdf")
+
+
+def test_job_tools(make_pdf, tmp_path, wait_for, call_tool):
+    make_pdf("a.pdf", password="password")
+    
+    start = time.perf_counter()
+    submitted = call_tool("submit_batch_job", {"directory": str(tmp_path)})
+    assert time.perf_counter() - start < 1.0
+    job_id = submitted["job_id"]
+    
+    assert wait_for(lambda: call_tool("get_job_status", {"job_id": job_id})["state"] == COMPLETED)
+    status = call_tool("get_job_status", {"job_id": job_id})
+    assert status["result"]["decrypted_files"] == 1
+    assert job_id in [job["job_id"] for job in call_tool("get_job_status", {})["jobs"]]
+    assert call_tool("get_job_status", {"job_id": "missing"})["success"] is False
+    assert call_tool("cancel_job", {"job_id": "missing"})["success"] is False
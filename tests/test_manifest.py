@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+
+import os
+
+from pdf_decrypt_mcp import PDFDecryptor
+from pdf_decrypt_mcp.manifest import MANIFEST_NAME, BatchManifest
+
+
+def test_incremental_rerun_skips_unchanged_files(make_pdf, tmp_path):
+    make_pdf("a.pdf", password="password")
+    make_pdf("b.pdf")
+    make_pdf("c.pdf", password="not-in-list")
+    decryptor = PDFDecryptor()
+    
+    first = decryptor.batch_decrypt_pdfs(str(tmp_path), incremental=True)
+    second = decryptor.batch_decrypt_pdfs(str(tmp_path), incremental=True)
+    make_pdf("a.pdf", pages=2, password="password")
+    third = decryptor.batch_decrypt_pdfs(str(tmp_path), incremental=True)
+    
+    assert first["skipped_files"] == 0
+    assert first["processed_files"] == 3
+    # 失败的文件每次都会重试
+    assert second["skipped_files"] == 2
+    assert [r["file"] for r in second["results"]] == ["c.pdf"]
+    assert third["skipped_files"] == 1
+    assert sorted(r["file"] for r in third["results"]) == ["a.pdf", "c.pdf"]
+    
+    entries = BatchManifest(str(tmp_path)).entries
+    assert entries["a.pdf"]["outcome"] == "decrypted"
+    assert entries["b.pdf"]["outcome"] == "unencrypted"
+    assert entries["c.pdf"]["outcome"] == "failed"
+    with open(os.path.join(tmp_path, MANIFEST_NAME), encoding="utf-8") as f:
+        assert len(f.readlines()) == 3
+
+
+def test_interrupted_run_resumes(make_pdf, tmp_path, monkeypatch):
+    for i in range(4):
+        make_pdf(f"doc_{i}.pdf", password="password")
+    decryptor = PDFDecryptor()
+    real_process = decryptor._process_batch_file
+    processed = []
+    
+    def crash_on_third(directory, pdf_file, *args):
+        if len(processed) == 2:
+            raise KeyboardInterrupt
+        processed.append(pdf_file)
+        return real_process(directory, pdf_file, *args)
+    
+    monkeypatch.setattr(decryptor, "_process_batch_file", crash_on_third)
+    try:
+        decryptor.batch_decrypt_pdfs(str(tmp_path), incremental=True)
+    except KeyboardInterrupt:
+        pass
+    monkeypatch.undo()
+    
+    resumed = decryptor.batch_decrypt_pdfs(str(tmp_path), incremental=True)
+    
+    assert resumed["skipped_files"] == 2
+    assert resumed["decrypted_files"] == 2
+    assert {r["file"] for r in resumed["results"]}.isdisjoint(processed)
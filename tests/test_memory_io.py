@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+
+import base64
+import io
+
+import pytest
+from PyPDF2 import PdfReader
+
+from pdf_decrypt_mcp import PDFDecryptor, server
+from pdf_decrypt_mcp.backends import pikepdf_available
+
+AVAILABLE = ["pypdf2"] + (["pikepdf"] if pikepdf_available() else [])
+
+
+class _WriteOnly(io.RawIOBase):
+    """只支持 write 的输出流，模拟管道或套接字"""
+    
+    def __init__(self):
+        super().__init__()
+        self.chunks = []
+    
+    def writable(self):
+        return True
+    
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+
+def _read(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+@pytest.mark.parametrize("backend", AVAILABLE)
+@pytest.mark.parametrize("wrap", [bytes, bytearray, memoryview])
+def test_decrypt_bytes(make_pdf, backend, wrap):
+    data = wrap(_read(make_pdf("locked.pdf", pages=2, password="password")))
+    
+    result = PDFDecryptor(backend=backend).decrypt_bytes(data, timings=True)
+    
+    assert result["success"] is True
+    assert (result["is_encrypted"], result["password_used"]) == (True, "password")
+    assert isinstance(result["data"], memoryview)
+    reader = PdfReader(io.BytesIO(result["data"]))
+    assert not reader.is_encrypted
+    assert len(reader.pages) == 2
+    assert "password_loop" in result["timings"]["stages_ms"]
+
+
+def test_unencrypted_bytes_are_returned_without_copy(make_pdf):
+    data = _read(make_pdf("plain.pdf"))
+    
+    result = PDFDecryptor(backend="pypdf2").decrypt_bytes(data)
+    
+    assert result["is_encrypted"] is False
+    assert result["data"].obj is data
+
+
+@pytest.mark.parametrize("backend", AVAILABLE)
+def test_decrypt_stream(make_pdf, backend):
+    data = _read(make_pdf("locked.pdf", password="123456"))
+    output = _WriteOnly()
+    
+    result = PDFDecryptor(backend=backend).decrypt_stream(io.BytesIO(data), output, engine="stream")
+    
+    assert result["success"] is True
+    assert "output_path" not in result
+    assert not PdfReader(io.BytesIO(b"".join(output.chunks))).is_encrypted
+
+
+@pytest.mark.parametrize("backend", AVAILABLE)
+def test_input_can_be_resized_after_call(make_pdf, backend):
+    data = bytearray(_read(make_pdf("locked.pdf", password="password")))
+    src = io.BytesIO(bytes(data))
+    invalid = bytearray(b"not a pdf")
+    decryptor = PDFDecryptor(backend=backend)
+    
+    assert decryptor.decrypt_bytes(data)["success"] is True
+    assert decryptor.decrypt_stream(src, _WriteOnly())["success"] is True
+    assert decryptor.decrypt_bytes(invalid)["success"] is False
+    
+    # 返回后不再持有对输入的导出，否则改变大小会抛出 BufferError
+    data.extend(b"%%EOF\n")
+    src.write(b"%%EOF\n")
+    invalid.extend(b"!")
+
+
+def test_unencrypted_result_view_can_be_released(make_pdf):
+    data = bytearray(_read(make_pdf("plain.pdf")))
+    
+    result = PDFDecryptor(backend="pypdf2").decrypt_bytes(data)
+    result["data"].release()
+    data.extend(b"%%EOF\n")
+
+
+def test_wrong_password_and_invalid_input(make_pdf):
+    decryptor = PDFDecryptor(backend="pypdf2")
+    data = _read(make_pdf("locked.pdf", password="not-a-common-password"))
+    
+    assert decryptor.decrypt_bytes(data)["success"] is False
+    assert decryptor.decrypt_bytes(data, password="not-a-common-password")["success"] is True
+    assert decryptor.decrypt_bytes(b"not a pdf")["success"] is False
+
+
+def test_base64_tool(make_pdf, monkeypatch, call_tool):
+    data = _read(make_pdf("locked.pdf", password="password"))
+    encoded = base64.b64encode(data).decode("ascii")
+    
+    result = call_tool("decrypt_pdf_base64", {"data": encoded})
+    assert result["success"] is True
+    assert result["size"] == len(base64.b64decode(result["data"]))
+    assert not PdfReader(io.BytesIO(base64.b64decode(result["data"]))).is_encrypted
+    assert "timings" not in result
+    
+    assert call_tool("decrypt_pdf_base64", {"data": "not base64!"})["success"] is False
+    monkeypatch.setenv(server.MAX_INLINE_BYTES_ENV, str(len(data) - 1))
+    assert "超过上限" in call_tool("decrypt_pdf_base64", {"data": encoded})["error"]
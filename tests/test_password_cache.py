@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+
+import shutil
+
+import pytest
+
+from pdf_decrypt_mcp import PDFDecryptor
+from pdf_decrypt_mcp.backends import PyPDF2Document
+from pdf_decrypt_mcp.password_cache import PasswordCache
+
+
+def test_cache_round_trip(tmp_path):
+    cache = PasswordCache(str(tmp_path / "cache.sqlite3"))
+    
+    assert cache.get("id:abc") is None
+    cache.put("id:abc", "secret")
+    assert PasswordCache(cache.path).get("id:abc") == "secret"
+    cache.forget("id:abc")
+    assert cache.get("id:abc") is None
+
+
+def test_known_document_hits_cache(make_pdf, tmp_path):
+    path = make_pdf("locked.pdf", password="not-a-common-password")
+    copy = str(tmp_path / "redownloaded.pdf")
+    shutil.copyfile(path, copy)
+    cache = PasswordCache(str(tmp_path / "cache.sqlite3"))
+    decryptor = PDFDecryptor(password_cache=cache)
+    
+    first = decryptor.decrypt_pdf(path, password="not-a-common-password")
+    again = decryptor.decrypt_pdf(path)
+    redownloaded = decryptor.decrypt_pdf(copy)
+    
+    assert first["password_cache_hit"] is False
+    assert again["success"] is True and again["password_cache_hit"] is True
+    assert redownloaded["password_used"] == "not-a-common-password"
+    assert redownloaded["password_cache_hit"] is True
+
+
+def test_fingerprint_uses_trailer_id(make_pdf):
+    with PyPDF2Document(make_pdf("a.pdf", password="secret")) as document:
+        first = document.fingerprint()
+    with PyPDF2Document(make_pdf("b.pdf", password="secret")) as document:
+        second = document.fingerprint()
+    with PyPDF2Document(make_pdf("plain.pdf")) as document:
+        plain = document.fingerprint()
+    
+    assert first.startswith("id:")
+    assert first != second
+    assert plain.startswith("sha256:")
+
+
+def test_fingerprint_is_backend_independent(make_pdf):
+    pytest.importorskip("pikepdf")
+    from pdf_decrypt_mcp.backends import PikepdfDocument
+    
+    path = make_pdf("a.pdf", password="secret")
+    with PyPDF2Document(path) as pypdf2_document, PikepdfDocument(path) as pikepdf_document:
+        assert pikepdf_document.fingerprint() == pypdf2_document.fingerprint()
+
+
+def test_explicit_password_does_not_use_cache(make_pdf, tmp_path):
+    path = make_pdf("locked.pdf", password="not-a-common-password")
+    cache = PasswordCache(str(tmp_path / "cache.sqlite3"))
+    decryptor = PDFDecryptor(password_cache=cache)
+    decryptor.decrypt_pdf(path, password="not-a-common-password")
+    
+    wrong = decryptor.decrypt_pdf(path, password="wrong-password")
+    
+    # 给出的密码错误时如实失败，不回退到缓存的密码
+    assert wrong["success"] is False
+    assert wrong["attempts"] == 1
+
+
+def test_cache_is_opt_in(tmp_path, monkeypatch):
+    monkeypatch.delenv("PDF_DECRYPT_PASSWORD_CACHE", raising=False)
+    assert PasswordCache.from_env() is None
+    monkeypatch.setenv("PDF_DECRYPT_PASSWORD_CACHE", "off")
+    assert PasswordCache.from_env() is None
+    
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "xdg"))
+    monkeypatch.setenv("PDF_DECRYPT_PASSWORD_CACHE", "on")
+    assert PasswordCache.from_env().path == str(tmp_path / "xdg" / "pdf-decrypt-mcp" / "passwords.sqlite3")
+    monkeypatch.setenv("PDF_DECRYPT_PASSWORD_CACHE", str(tmp_path / "custom.sqlite3"))
+    assert PasswordCache.from_env().path == str(tmp_path / "custom.sqlite3")
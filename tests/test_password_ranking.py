@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+
+from pdf_decrypt_mcp import PDFDecryptor
+from pdf_decrypt_mcp.password_ranking import PasswordRanking
+
+
+def test_ranking_moves_hits_to_front():
+    ranking = PasswordRanking(["", "a", "b", "c"])
+    
+    ranking.record("c")
+    ranking.record("c")
+    ranking.record("b")
+    ranking.record("not-a-candidate")
+    
+    assert ranking.ordered() == ["c", "b", "", "a"]
+    assert ranking.hits() == {"c": 2, "b": 1}
+
+
+def test_batch_attempts_drop_after_first_hit(make_pdf, tmp_path):
+    for i in range(5):
+        make_pdf(f"lecture_{i}.pdf", password="unlock")
+    decryptor = PDFDecryptor()
+    last_index = decryptor.common_passwords.index("unlock") + 1
+    
+    result = decryptor.batch_decrypt_pdfs(str(tmp_path))
+    
+    attempts = sorted(r["attempts"] for r in result["results"])
+    assert attempts == [1, 1, 1, 1, last_index]
+    assert result["password_attempts"] == last_index + 4
+    assert result["password_hits"] == {"unlock": 5}
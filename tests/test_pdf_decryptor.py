@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+
+import os
+
+from pdf_decrypt_mcp import PDFDecryptor
+
+
+def _counters(result):
+    keys = ("total_files", "processed_files", "encrypted_files", "decrypted_files", "failed_files")
+    return {key: result[key] for key in keys}
+
+
+def test_decrypt_pdf_with_common_password(make_pdf):
+    path = make_pdf("locked.pdf", pages=2, password="123456")
+    
+    result = PDFDecryptor().decrypt_pdf(path)
+    
+    assert result["success"] is True
+    assert result["password_used"] == "123456"
+    assert os.path.exists(result["output_path"])
+
+
+def test_batch_decrypt_parallel_matches_serial(make_pdf, tmp_path):
+    for i in range(4):
+        make_pdf(f"locked_{i}.pdf", password="password")
+    make_pdf("plain.pdf")
+    make_pdf("unknown.pdf", password="not-in-list")
+    with open(os.path.join(tmp_path, "broken.pdf"), "wb") as f:
+        f.write(b"not a pdf")
+    
+    decryptor = PDFDecryptor()
+    serial = decryptor.batch_decrypt_pdfs(str(tmp_path))
+    for name in os.listdir(tmp_path):
+        if name.endswith("_解密版.pdf"):
+            os.remove(os.path.join(tmp_path, name))
+    parallel = decryptor.batch_decrypt_pdfs(str(tmp_path), max_workers=2)
+    
+    assert _counters(parallel) == _counters(serial) == {
+        "total_files": 7,
+        "processed_files": 6,
+        "encrypted_files": 5,
+        "decrypted_files": 4,
+        "failed_files": 2,
+    }
+    assert sorted(r["file"] for r in parallel["results"]) == sorted(r["file"] for r in serial["results"])
+
+
+def test_batch_parses_each_file_once(make_pdf, tmp_path, monkeypatch):
+    from pdf_decrypt_mcp import backends
+    
+    make_pdf("locked.pdf", password="password")
+    make_pdf("plain.pdf")
+    opened = []
+    real_reader = backends.PdfReader
+    
+    def counting_reader(stream, *args, **kwargs):
+        opened.append(os.path.basename(stream.name))
+        return real_reader(stream, *args, **kwargs)
+    
+    monkeypatch.setattr(backends, "PdfReader", counting_reader)
+    result = PDFDecryptor(backend="pypdf2").batch_decrypt_pdfs(str(tmp_path))
+    
+    assert result["decrypted_files"] == 1
+    assert sorted(opened) == ["locked.pdf", "plain.pdf"]
+
+
+def test_recursive_parallel_batch_streams_from_scanner(make_pdf, tmp_path):
+    for i in range(6):
+        os.makedirs(tmp_path / f"term_{i % 3}", exist_ok=True)
+        make_pdf(f"term_{i % 3}/lecture_{i}.pdf", password="password")
+    
+    result = PDFDecryptor().batch_decrypt_pdfs(str(tmp_path), max_workers=2, recursive=True)
+    
+    assert _counters(result) == {
+        "total_files": 6,
+        "processed_files": 6,
+        "encrypted_files": 6,
+        "decrypted_files": 6,
+        "failed_files": 0,
+    }
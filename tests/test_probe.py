@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+
+from pdf_decrypt_mcp import PDFDecryptor, pdf_decryptor
+from pdf_decrypt_mcp.probe import Ref, parse_object, probe_encryption
+
+
+def test_parse_object_handles_nested_values():
+    data = b"<< /Filter /Standard /O (a\\)b\\101) /U <4142 43> /CF << /StdCF << /Length 16 >> >> /Encrypt 5 0 R /K [1 -2 3.5] >>"
+    
+    value, _ = parse_object(data, 0)
+    
+    assert value["/Filter"] == "/Standard"
+    assert value["/O"] == b"a)bA"
+    assert value["/U"] == b"ABC"
+    assert value["/CF"]["/StdCF"]["/Length"] == 16
+    assert value["/Encrypt"] == Ref(5, 0)
+    assert value["/K"] == [1, -2, 3.5]
+
+
+def test_probe_reports_encryption_parameters(make_pdf):
+    rc4_128 = make_pdf("rc4_128.pdf", password="secret")
+    rc4_40 = make_pdf("rc4_40.pdf", password="secret", use_128bit=False)
+    plain = make_pdf("plain.pdf")
+    
+    assert probe_encryption(plain) == {"is_encrypted": False, "encryption": None}
+    assert probe_encryption(rc4_128)["encryption"] == {
+        "filter": "Standard", "v": 2, "r": 3, "length": 128, "permissions": 2147483644,
+    }
+    assert probe_encryption(rc4_40)["encryption"]["length"] == 40
+
+
+def test_probe_returns_none_for_damaged_file(tmp_path):
+    path = tmp_path / "broken.pdf"
+    path.write_bytes(b"%PDF-1.4\nnot really a pdf")
+    
+    assert probe_encryption(str(path)) is None
+
+
+def test_fast_check_matches_full_parser_without_parsing(make_pdf, monkeypatch):
+    path = make_pdf("locked.pdf", password="secret")
+    full = PDFDecryptor().check_pdf_encryption(path)
+    
+    def no_open(*args, **kwargs):
+        raise AssertionError("快速探测不应打开文档")
+    
+    decryptor = PDFDecryptor()
+    monkeypatch.setattr(decryptor.backend, "open", no_open)
+    fast = decryptor.check_pdf_encryption(path, fast=True)
+    
+    assert fast["success"] is True
+    assert fast["probe"] == "trailer"
+    assert fast["is_encrypted"] is full["is_encrypted"] is True
+
+
+def test_fast_check_falls_back_to_full_parser(make_pdf, monkeypatch):
+    path = make_pdf("locked.pdf", password="secret")
+    monkeypatch.setattr(pdf_decryptor, "probe_encryption", lambda file_path: None)
+    
+    result = PDFDecryptor().check_pdf_encryption(path, fast=True)
+    
+    assert result["probe"] == "full"
+    assert result["is_encrypted"] is True
+    assert result["encryption"]["v"] == 2
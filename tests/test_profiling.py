@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+
+import json
+import os
+import pstats
+import tracemalloc
+
+import pytest
+
+from pdf_decrypt_mcp import profiling
+
+
+def test_parse_modes():
+    assert profiling.parse_modes(None) == frozenset()
+    assert profiling.parse_modes("off") == frozenset()
+    assert profiling.parse_modes("all") == {"cpu", "memory"}
+    assert profiling.parse_modes("cpu, memory") == {"cpu", "memory"}
+    with pytest.raises(ValueError):
+        profiling.parse_modes("gpu")
+
+
+def test_profile_argument_writes_pstats_and_snapshot(make_pdf, tmp_path, monkeypatch, call_tool):
+    profile_dir = tmp_path / "profiles"
+    monkeypatch.setenv(profiling.PROFILE_DIR_ENV, str(profile_dir))
+    path = make_pdf("客户文件.pdf", password="password")
+    
+    result = call_tool("decrypt_pdf", {"input_path": path, "profile": "all"})
+    
+    assert result["success"] is True
+    outputs = result["profile"]
+    assert "decrypt_pdf" in os.path.basename(outputs["pstats"])
+    assert "客户文件" in os.path.basename(outputs["pstats"])
+    stats = pstats.Stats(outputs["pstats"])
+    assert any(func[2] == "decrypt_pdf" for func in stats.stats)
+    assert tracemalloc.Snapshot.load(outputs["tracemalloc"]).traces
+    with open(outputs["metadata"], encoding="utf-8") as f:
+        assert json.load(f)["input_path"] == path
+    assert not tracemalloc.is_tracing()
+
+
+def test_profile_env_and_off_by_default(make_pdf, tmp_path, monkeypatch, call_tool):
+    profile_dir = tmp_path / "profiles"
+    monkeypatch.setenv(profiling.PROFILE_DIR_ENV, str(profile_dir))
+    path = make_pdf("plain.pdf")
+    
+    assert "profile" not in call_tool("check_pdf_encryption", {"file_path": path})
+    assert not profile_dir.exists()
+    
+    monkeypatch.setenv(profiling.PROFILE_ENV, "cpu")
+    result = call_tool("check_pdf_encryption", {"file_path": path})
+    
+    assert set(result["profile"]) == {"pstats", "metadata"}
+    assert len(os.listdir(profile_dir)) == 2
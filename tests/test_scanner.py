@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+
+import os
+
+import pytest
+
+from pdf_decrypt_mcp.scanner import iter_pdf_files, list_pdf_files
+
+
+@pytest.fixture
+def pdf_dir(tmp_path):
+    for i, size in enumerate([30, 10, 50, 20, 40]):
+        with open(tmp_path / f"doc_{i}.pdf", "wb") as f:
+            f.write(b"x" * size)
+        os.utime(tmp_path / f"doc_{i}.pdf", ns=(0, (10 - i) * 10**9))
+    (tmp_path / "doc_0_解密版.pdf").write_bytes(b"x")
+    (tmp_path / "notes.txt").write_bytes(b"x")
+    (tmp_path / "folder.pdf").mkdir()
+    return str(tmp_path)
+
+
+def _all_pages(directory, **kwargs):
+    names, cursor, pages = [], None, 0
+    while True:
+        result = list_pdf_files(directory, cursor=cursor, **kwargs)
+        assert result["success"] is True, result
+        names.extend(f["name"] for f in result["files"])
+        pages += 1
+        cursor = result["next_cursor"]
+        if cursor is None:
+            return names, pages, result["total_files"]
+
+
+@pytest.mark.parametrize("sort, descending, expected", [
+    ("name", False, [0, 1, 2, 3, 4]),
+    ("name", True, [4, 3, 2, 1, 0]),
+    ("size", False, [1, 3, 0, 4, 2]),
+    ("mtime", False, [4, 3, 2, 1, 0]),
+])
+def test_pagination_covers_every_file_once(pdf_dir, sort, descending, expected):
+    names, pages, total = _all_pages(pdf_dir, limit=2, sort=sort, descending=descending)
+    
+    assert names == [f"doc_{i}.pdf" for i in expected]
+    assert pages == 3
+    assert total == 5
+
+
+def test_unsorted_pagination(pdf_dir):
+    names, pages, _ = _all_pages(pdf_dir, limit=2, sort="none")
+    
+    assert sorted(names) == [f"doc_{i}.pdf" for i in range(5)]
+    assert pages == 3
+
+
+def test_include_decrypted_and_unbounded(pdf_dir):
+    result = list_pdf_files(pdf_dir, include_decrypted=True)
+    
+    assert result["total_files"] == 6
+    assert result["next_cursor"] is None
+    assert result["files"][1] == {
+        "name": "doc_0_解密版.pdf",
+        "path": os.path.join(pdf_dir, "doc_0_解密版.pdf"),
+        "size": 1,
+        "is_decrypted": True,
+    }
+
+
+def test_cursor_must_match_sort(pdf_dir):
+    cursor = list_pdf_files(pdf_dir, limit=2, sort="size")["next_cursor"]
+    
+    result = list_pdf_files(pdf_dir, limit=2, sort="name", cursor=cursor)
+    
+    assert result["success"] is False
+    assert "游标" in result["error"]
+
+
+def test_missing_directory(tmp_path):
+    result = list_pdf_files(str(tmp_path / "missing"))
+    
+    assert result == {"success": False, "error": f"错误: 目录不存在: {tmp_path / 'missing'}"}
+
+
+@pytest.fixture
+def tree(tmp_path):
+    for rel in ["top.pdf", "c1/t1/l1.pdf", "c1/t1/l2.pdf", "c1/t2/讲义.pdf", "c2/drafts/d.pdf", "c2/x.pdf"]:
+        path = tmp_path / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b"x")
+    return str(tmp_path)
+
+
+@pytest.mark.parametrize("scan_workers", [1, 4])
+def test_iter_pdf_files_recursive_filters(tree, scan_workers):
+    def walk(**kwargs):
+        return sorted(rel for rel, _ in iter_pdf_files(tree, recursive=True, scan_workers=scan_workers, **kwargs))
+    
+    assert walk() == ["c1/t1/l1.pdf", "c1/t1/l2.pdf", "c1/t2/讲义.pdf", "c2/drafts/d.pdf", "c2/x.pdf", "top.pdf"]
+    assert walk(max_depth=1) == ["c2/x.pdf", "top.pdf"]
+    assert walk(exclude=["drafts"]) == ["c1/t1/l1.pdf", "c1/t1/l2.pdf", "c1/t2/讲义.pdf", "c2/x.pdf", "top.pdf"]
+    assert walk(include=["c1/t1/*"]) == ["c1/t1/l1.pdf", "c1/t1/l2.pdf"]
+    assert walk(include=["*讲义*"]) == ["c1/t2/讲义.pdf"]
+
+
+def test_iter_pdf_files_top_level_only(tree):
+    assert [rel for rel, _ in iter_pdf_files(tree)] == ["top.pdf"]
+
+
+def test_recursive_listing_uses_relative_paths(tree):
+    result = list_pdf_files(tree, recursive=True, limit=4)
+    
+    assert result["total_files"] == 6
+    assert [f["relative_path"] for f in result["files"]] == [
+        "c1/t1/l1.pdf", "c1/t1/l2.pdf", "c1/t2/讲义.pdf", "c2/drafts/d.pdf",
+    ]
+    assert result["next_cursor"] is not None
+
+
+def test_batch_processes_files_before_walk_finishes(make_pdf, tmp_path, monkeypatch):
+    from pdf_decrypt_mcp import PDFDecryptor, pdf_decryptor
+    
+    for rel in ["a/1.pdf", "b/2.pdf", "c/3.pdf"]:
+        os.makedirs(tmp_path / os.path.dirname(rel), exist_ok=True)
+        make_pdf(rel, password="password")
+    events = []
+    real_iter = pdf_decryptor.iter_pdf_files
+    
+    def traced_iter(*args, **kwargs):
+        for item in real_iter(*args, **kwargs):
+            events.append("found")
+            yield item
+        events.append("walk done")
+    
+    decryptor = PDFDecryptor()
+    real_process = decryptor._process_batch_file
+    
+    def traced_process(*args):
+        events.append("processed")
+        return real_process(*args)
+    
+    monkeypatch.setattr(pdf_decryptor, "iter_pdf_files", traced_iter)
+    monkeypatch.setattr(decryptor, "_process_batch_file", traced_process)
+    result = decryptor.batch_decrypt_pdfs(str(tmp_path), recursive=True)
+    
+    assert result["total_files"] == result["decrypted_files"] == 3
+    assert sorted(r["file"] for r in result["results"]) == ["a/1.pdf", "b/2.pdf", "c/3.pdf"]
+    assert events.index("processed") < events.index("walk done")
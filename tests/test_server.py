@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+
+from pdf_decrypt_mcp import server
+
+
+def _call(name, arguments):
+    return server.handle_call_tool(name, arguments)
+
+
+def _payload(result):
+    return json.loads(result.content[0].text)
+
+
+def test_overlapping_calls_run_concurrently(monkeypatch):
+    """慢的批量调用不应阻塞同时进行的检查调用"""
+    def slow_batch(directory, *args, **kwargs):
+        time.sleep(0.6)
+        return {"success": True, "directory": directory}
+    
+    def slow_check(file_path, *args, **kwargs):
+        time.sleep(0.4)
+        return {"success": True, "is_encrypted": False, "file_path": file_path}
+    
+    monkeypatch.setattr(server.pdf_decryptor, "batch_decrypt_pdfs", slow_batch)
+    monkeypatch.setattr(server.pdf_decryptor, "check_pdf_encryption", slow_check)
+    server.configure_executor(2)
+    
+    async def run_both():
+        return await asyncio.gather(
+            _call("batch_decrypt_pdfs", {"directory": "/data"}),
+            _call("check_pdf_encryption", {"file_path": "/data/a.pdf"}),
+        )
+    
+    start = time.perf_counter()
+    batch_result, check_result = asyncio.run(run_both())
+    elapsed = time.perf_counter() - start
+    
+    assert _payload(batch_result)["directory"] == "/data"
+    assert _payload(check_result)["file_path"] == "/data/a.pdf"
+    # 串行执行需要1.0秒，并发执行约等于较慢调用的0.6秒
+    assert elapsed < 0.9
+
+
+def test_concurrent_first_calls_create_one_decryptor(monkeypatch):
+    from pdf_decrypt_mcp.pdf_decryptor import PDFDecryptor
+    
+    created = []
+    
+    def slow_from_env():
+        time.sleep(0.1)
+        created.append(object())
+        return created[-1]
+    
+    monkeypatch.delitem(vars(server), "pdf_decryptor", raising=False)
+    monkeypatch.setattr(PDFDecryptor, "from_env", staticmethod(slow_from_env))
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(server.get_decryptor())) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+    
+    assert len(created) == 1
+    assert results == created * 4
+
+
+def test_configure_executor_rejects_invalid_worker_count():
+    with pytest.raises(ValueError):
+        server.configure_executor(0)
+
+
+def test_list_pdf_files(make_pdf, tmp_path, call_tool):
+    make_pdf("a.pdf")
+    make_pdf("a_解密版.pdf")
+    
+    result = call_tool("list_pdf_files", {"directory": str(tmp_path)})
+    
+    assert result["success"] is True
+    assert [f["name"] for f in result["files"]] == ["a.pdf"]
+
+
+def test_batch_sends_progress_and_bounded_summary(make_pdf, tmp_path):
+    from mcp.server.lowlevel.server import request_ctx
+    from mcp.shared.context import RequestContext
+    from mcp.types import RequestParams
+    
+    for i in range(3):
+        make_pdf(f"doc_{i}.pdf", password="password")
+    report_path = str(tmp_path / "report.ndjson")
+    notifications = []
+    
+    class FakeSession:
+        async def send_progress_notification(self, progress_token, progress, total=None):
+            await asyncio.sleep(0.01)
+            notifications.append((progress_token, progress, total))
+    
+    async def run():
+        token = request_ctx.set(RequestContext(
+            request_id=1,
+            meta=RequestParams.Meta(progressToken="tok"),
+            session=FakeSession(),
+            lifespan_context=None,
+        ))
+        try:
+            # 进度通知在返回结果前全部发送完毕
+            return await _call("batch_decrypt_pdfs", {
+                "directory": str(tmp_path),
+                "report_path": report_path,
+                "max_results": 1,
+            })
+        finally:
+            request_ctx.reset(token)
+    
+    result = _payload(asyncio.run(run()))
+    
+    assert result["decrypted_files"] == 3
+    assert len(result["results"]) == 1
+    assert result["results_truncated"] is True
+    assert result["report_path"] == report_path
+    with open(report_path, encoding="utf-8") as f:
+        assert len([json.loads(line) for line in f]) == 3
+    assert sorted(notifications) == [("tok", 1, 3), ("tok", 2, 3), ("tok", 3, 3)]
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+
+"""
+冷启动：initialize 与 list_tools 不应加载 PDF 与加密库，本项目的导入开销不超过预算
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+
+# 本项目在mcp运行时之外增加的导入时间上限（毫秒）；本地约20ms，留出慢速CI的余量
+IMPORT_BUDGET_MS = 100
+
+DEFERRED_MODULES = ("PyPDF2", "Crypto", "pikepdf", "pdf_decrypt_mcp.pdf_decryptor", "pdf_decrypt_mcp.backends")
+
+
+def _run(*args):
+    env = dict(os.environ, PYTHONPATH=SRC)
+    return subprocess.run([sys.executable, *args], env=env, check=True, capture_output=True, text=True)
+
+
+def _self_times(statement):
+    times = {}
+    for line in _run("-X", "importtime", "-c", statement).stderr.splitlines():
+        parts = line[len("import time:"):].split("|")
+        if line.startswith("import time:") and parts[0].strip().isdigit():
+            times[parts[2].strip()] = int(parts[0])
+    return times
+
+
+def test_handshake_does_not_load_pdf_libraries():
+    script = f"""
+import asyncio, json, sys
+from mcp.shared.memory import create_connected_server_and_client_session
+from pdf_decrypt_mcp import server
+
+async def handshake():
+    async with create_connected_server_and_client_session(server.server) as session:
+        return await session.list_tools()
+
+tools = asyncio.run(handshake())
+print(json.dumps({{
+    "tools": [tool.name for tool in tools.tools],
+    "loaded": [name for name in {DEFERRED_MODULES!r} if name in sys.modules],
+}}))
+"""
+    result = json.loads(_run("-c", script).stdout.strip().splitlines()[-1])
+    
+    assert "decrypt_pdf" in result["tools"]
+    assert result["loaded"] == []
+
+
+def test_package_import_is_lazy():
+    script = "import sys, pdf_decrypt_mcp; assert 'PyPDF2' not in sys.modules; pdf_decrypt_mcp.PDFDecryptor; print('PyPDF2' in sys.modules)"
+    
+    assert _run("-c", script).stdout.strip() == "True"
+
+
+def test_import_overhead_within_budget():
+    floor = _self_times("import mcp.server.lowlevel, mcp.server.models, mcp.server.stdio, mcp.types")
+    ours = _self_times("import pdf_decrypt_mcp.server")
+    
+    added = {name: self_us for name, self_us in ours.items() if name not in floor}
+    
+    assert not any(name.split(".")[0] in ("PyPDF2", "Crypto", "pikepdf") for name in added)
+    assert sum(added.values()) / 1000 < IMPORT_BUDGET_MS, sorted(added.items(), key=lambda item: -item[1])[:10]
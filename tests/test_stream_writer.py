@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+
+import io
+import zlib
+
+import pytest
+from PyPDF2 import PdfReader, PdfWriter
+from PyPDF2.generic import DecodedStreamObject, NameObject, TextStringObject
+
+from pdf_decrypt_mcp import PDFDecryptor
+from pdf_decrypt_mcp.stream_writer import MemoryLimitExceeded, write_decrypted_stream, write_raw
+
+
+def _object_stream_pdf() -> bytes:
+    """手工构造一个用对象流和交叉引用流保存页面树的未加密PDF"""
+    members = [b"<< /Type /Catalog /Pages 2 0 R >>", b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+               b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 100 100] >>"]
+    header, body, offset = [], b"", 0
+    for num, member in enumerate(members, start=1):
+        header.append(f"{num} {offset}".encode())
+        body += member + b"\n"
+        offset += len(member) + 1
+    prefix = b" ".join(header) + b"\n"
+    data = zlib.compress(prefix + body)
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.5\n")
+    objstm_offset = out.tell()
+    out.write(b"4 0 obj\n<< /Type /ObjStm /N 3 /First %d /Filter /FlateDecode /Length %d >>\nstream\n"
+              % (len(prefix), len(data)) + data + b"\nendstream\nendobj\n")
+    xref_offset = out.tell()
+    rows = [b"\x00\x00\x00\xff\xff", b"\x02\x00\x04\x00\x00", b"\x02\x00\x04\x00\x01",
+            b"\x02\x00\x04\x00\x02", b"\x01" + objstm_offset.to_bytes(2, "big") + b"\x00\x00",
+            b"\x01" + xref_offset.to_bytes(2, "big") + b"\x00\x00"]
+    xref = b"".join(rows)
+    out.write(b"5 0 obj\n<< /Type /XRef /Size 6 /W [1 2 2] /Root 1 0 R /Length %d >>\nstream\n"
+              % len(xref) + xref + b"\nendstream\nendobj\n")
+    out.write(b"startxref\n%d\n%%%%EOF\n" % xref_offset)
+    return out.getvalue()
+
+
+def test_stream_engine_keeps_content_and_drops_encryption(tmp_path):
+    writer = PdfWriter()
+    for index in range(3):
+        writer.add_blank_page(width=200, height=200)
+        content = DecodedStreamObject()
+        content.set_data(f"BT /F1 12 Tf (page {index}) Tj ET".encode())
+        writer.get_page(index)[NameObject("/Contents")] = writer._add_object(content.flate_encode())
+    writer.add_metadata({"/Title": TextStringObject("教材")})
+    writer.encrypt("password", use_128bit=True)
+    input_path = str(tmp_path / "locked.pdf")
+    with open(input_path, "wb") as f:
+        writer.write(f)
+
+    result = PDFDecryptor(backend="pypdf2").decrypt_pdf(input_path, engine="stream")
+
+    assert result["success"], result
+    reader = PdfReader(result["output_path"], strict=True)
+    assert not reader.is_encrypted
+    assert reader.metadata.title == "教材"
+    assert [page.get_contents().get_data() for page in reader.pages] == [
+        f"BT /F1 12 Tf (page {index}) Tj ET".encode() for index in range(3)
+    ]
+
+
+def test_object_stream_members_are_written_as_objects():
+    output = io.BytesIO()
+    stats = write_decrypted_stream(PdfReader(io.BytesIO(_object_stream_pdf())), output)
+
+    reader = PdfReader(io.BytesIO(output.getvalue()), strict=True)
+    assert stats["objects"] == 3
+    assert b"/ObjStm" not in output.getvalue()
+    assert reader.pages[0].mediabox.width == 100
+
+
+def test_raw_keeps_object_streams_compressed():
+    source = _object_stream_pdf()
+    output = io.BytesIO()
+    stats = write_raw(PdfReader(io.BytesIO(source)), output)
+
+    data = output.getvalue()
+    reader = PdfReader(io.BytesIO(data), strict=True)
+    assert stats == {"objects": 1, "object_stream_members": 3}
+    assert source[source.index(b"stream\n"):source.index(b"endstream")] in data
+    assert reader.pages[0].mediabox.width == 100
+
+
+def test_raw_engine_copies_encoded_streams(make_pdf):
+    input_path = make_pdf(pages=4, password="password")
+
+    result = PDFDecryptor(backend="pypdf2").decrypt_pdf(input_path, engine="raw")
+
+    assert result["success"], result
+    reader = PdfReader(result["output_path"], strict=True)
+    assert not reader.is_encrypted
+    assert len(reader.pages) == 4
+
+
+def test_memory_limit_rejects_oversized_objects(make_pdf):
+    input_path = make_pdf(password="password")
+
+    result = PDFDecryptor(backend="pypdf2").decrypt_pdf(input_path, engine="stream", memory_limit=16)
+
+    assert not result["success"]
+    assert "内存上限" in result["error"]
+    with pytest.raises(MemoryLimitExceeded):
+        write_decrypted_stream(PdfReader(input_path, password="password"), io.BytesIO(), memory_limit=16)
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+
+from pdf_decrypt_mcp import PDFDecryptor, server
+from pdf_decrypt_mcp.timings import Histogram, StatsRegistry
+
+
+def test_histogram_buckets_and_quantiles():
+    histogram = Histogram()
+    for milliseconds in (0.5, 3, 3, 40, 90000):
+        histogram.observe(milliseconds)
+    
+    snapshot = histogram.snapshot()
+    
+    assert snapshot["count"] == 5
+    assert snapshot["buckets_ms"] == {"<=1": 1, "<=5": 2, "<=50": 1, ">60000": 1}
+    assert snapshot["p50_ms"] == 5.0
+    assert snapshot["p99_ms"] == 90000
+    assert Histogram().snapshot()["p50_ms"] is None
+
+
+def test_stats_registry_counts_errors_and_stages():
+    stats = StatsRegistry()
+    stats.record("decrypt_pdf", 0.01, True, {"stages_ms": {"open": 1.0, "write": 5.0}, "attempts": 3})
+    stats.record("decrypt_pdf", 0.02, False)
+    
+    tool = stats.snapshot()["tools"]["decrypt_pdf"]
+    
+    assert tool["calls"] == 2
+    assert tool["errors"] == 1
+    assert set(tool["stages"]) == {"open", "write"}
+    assert tool["password_attempts"]["max"] == 3
+    assert tool["password_attempts"]["buckets"] == {"<=5": 1}
+    assert "max_ms" not in tool["password_attempts"]
+
+
+def test_decrypt_pdf_reports_stage_timings(make_pdf):
+    path = make_pdf("locked.pdf", pages=2, password="password")
+    decryptor = PDFDecryptor(backend="pypdf2")
+    
+    result = decryptor.decrypt_pdf(path, timings=True, engine="pages")
+    
+    assert result["success"] is True
+    assert result["timings"]["attempts"] == result["attempts"]
+    assert set(result["timings"]["stages_ms"]) == {"probe", "open", "xref_parse", "password_loop", "page_copy", "write"}
+    assert "timings" not in decryptor.decrypt_pdf(path)
+
+
+def test_batch_timings_are_aggregated(make_pdf, tmp_path):
+    for i in range(2):
+        make_pdf(f"locked_{i}.pdf", password="password")
+    
+    result = PDFDecryptor(backend="pypdf2").batch_decrypt_pdfs(str(tmp_path), timings=True)
+    
+    assert result["timings"]["attempts"] == result["password_attempts"]
+    assert "write" in result["timings"]["stages_ms"]
+    assert all("timings" not in file_result for file_result in result["results"])
+
+
+def test_get_server_stats_tool(make_pdf, monkeypatch, call_tool):
+    monkeypatch.setattr(server, "server_stats", StatsRegistry())
+    path = make_pdf("locked.pdf", password="password")
+    
+    plain = call_tool("decrypt_pdf", {"input_path": path})
+    timed = call_tool("check_pdf_encryption", {"file_path": path, "timings": True})
+    stats = call_tool("get_server_stats", {})
+    
+    assert "timings" not in plain
+    assert "xref_parse" in timed["timings"]["stages_ms"]
+    assert stats["tools"]["decrypt_pdf"]["calls"] == 1
+    assert "password_loop" in stats["tools"]["decrypt_pdf"]["stages"]
+    assert stats["tools"]["check_pdf_encryption"]["errors"] == 0
+    assert stats["tools"]["decrypt_pdf"]["password_attempts"]["count"] == 1
+    assert stats["tools"]["check_pdf_encryption"]["password_attempts"] is None
+
+
+def test_get_server_stats_does_not_create_decryptor(monkeypatch, call_tool):
+    monkeypatch.delitem(vars(server), "pdf_decryptor", raising=False)
+    
+    stats = call_tool("get_server_stats", {})
+    
+    assert (stats["check_cache"], stats["memory_budget"]) == (None, None)
+    assert "pdf_decryptor" not in vars(server)
@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+
+import os
+import time
+
+import pytest
+
+from pdf_decrypt_mcp import PDFDecryptor
+from pdf_decrypt_mcp.cli import build_parser
+from pdf_decrypt_mcp.watcher import DirectoryWatcher, _InotifySource
+
+
+def _inotify_available():
+    try:
+        _InotifySource().close()
+    except (OSError, AttributeError):
+        return False
+    return True
+
+
+MODES = [pytest.param(True, id="inotify", marks=pytest.mark.skipif(not _inotify_available(), reason="无 inotify")),
+         pytest.param(False, id="polling")]
+
+
+@pytest.mark.parametrize("use_inotify", MODES)
+def test_new_files_are_decrypted(make_pdf, tmp_path, use_inotify, wait_for):
+    make_pdf("existing.pdf", password="password")
+    os.makedirs(tmp_path / "sub")
+    watcher = DirectoryWatcher(PDFDecryptor(backend="pypdf2"), str(tmp_path), recursive=True,
+                               settle=0.1, poll_interval=0.1, use_inotify=use_inotify).start()
+    try:
+        make_pdf("new.pdf", password="password")
+        make_pdf("plain.pdf")
+        os.makedirs(tmp_path / "sub" / "later")
+        make_pdf(os.path.join("sub", "later", "deep.pdf"), password="123456")
+        
+        assert wait_for(lambda: watcher.status()["decrypted"] + watcher.status()["not_encrypted"] == 3)
+    finally:
+        watcher.stop()
+    
+    status = watcher.status()
+    assert status["mode"] == ("inotify" if use_inotify else "polling")
+    assert (status["decrypted"], status["not_encrypted"], status["failed"]) == (2, 1, 0)
+    assert os.path.exists(tmp_path / "new_解密版.pdf")
+    assert os.path.exists(tmp_path / "sub" / "later" / "deep_解密版.pdf")
+    # 启动前已存在的文件不处理
+    assert not os.path.exists(tmp_path / "existing_解密版.pdf")
+
+
+@pytest.mark.parametrize("use_inotify", MODES)
+def test_file_still_being_written_is_debounced(make_pdf, tmp_path, use_inotify, wait_for):
+    source = make_pdf("source.bin", password="password")
+    with open(source, "rb") as f:
+        data = f.read()
+    watcher = DirectoryWatcher(PDFDecryptor(backend="pypdf2"), str(tmp_path), settle=0.4,
+                               poll_interval=0.05, use_inotify=use_inotify).start()
+    try:
+        target = tmp_path / "slow.pdf"
+        half = len(data) // 2
+        for chunk in (data[:half], data[half:]):
+            with open(target, "ab") as f:
+                f.write(chunk)
+            time.sleep(0.2)
+            assert watcher.status()["queued"] == 0
+        
+        assert wait_for(lambda: watcher.status()["decrypted"] == 1)
+    finally:
+        watcher.stop()
+    assert watcher.status()["failed"] == 0
+
+
+@pytest.mark.parametrize("use_inotify", MODES)
+def test_deleted_files_are_forgotten(make_pdf, tmp_path, use_inotify, wait_for):
+    os.makedirs(tmp_path / "sub")
+    watcher = DirectoryWatcher(PDFDecryptor(backend="pypdf2"), str(tmp_path), recursive=True,
+                               settle=0.05, poll_interval=0.05, use_inotify=use_inotify).start()
+    try:
+        make_pdf("moved.pdf")
+        make_pdf("deleted.pdf")
+        make_pdf(os.path.join("sub", "inner.pdf"))
+        assert wait_for(lambda: watcher.status()["not_encrypted"] == 3)
+        assert set(watcher._processed) == {"moved.pdf", "deleted.pdf", "sub/inner.pdf"}
+        
+        os.rename(tmp_path / "moved.pdf", tmp_path.parent / f"{tmp_path.name}-moved.pdf")
+        os.remove(tmp_path / "deleted.pdf")
+        os.remove(tmp_path / "sub" / "inner.pdf")
+        
+        assert wait_for(lambda: not watcher._processed)
+    finally:
+        watcher.stop()
+
+
+def test_process_existing_and_missing_directory(make_pdf, tmp_path, wait_for):
+    make_pdf("existing.pdf", password="password")
+    
+    watcher = DirectoryWatcher(PDFDecryptor(backend="pypdf2"), str(tmp_path), settle=0.05,
+                               process_existing=True).start()
+    try:
+        assert wait_for(lambda: watcher.status()["decrypted"] == 1)
+    finally:
+        watcher.stop()
+    
+    with pytest.raises(ValueError):
+        DirectoryWatcher(PDFDecryptor(backend="pypdf2"), str(tmp_path / "missing"))
+
+
+def test_watch_tools(make_pdf, tmp_path, wait_for, call_tool):
+    started = call_tool("start_watch", {"directory": str(tmp_path), "settle": 0.05})
+    watch_id = started["watch_id"]
+    try:
+        make_pdf("new.pdf", password="password")
+        assert wait_for(lambda: call_tool("get_watch_status", {"watch_id": watch_id})["decrypted"] == 1)
+        assert [w["watch_id"] for w in call_tool("get_watch_status", {})["watches"]] == [watch_id]
+    finally:
+        stopped = call_tool("stop_watch", {"watch_id": watch_id})
+    
+    assert stopped["running"] is False
+    assert stopped["recent_results"][0]["file"] == "new.pdf"
+    assert call_tool("stop_watch", {"watch_id": watch_id})["success"] is False
+
+
+def test_cli_parser():
+    args = build_parser().parse_args(["watch", "/data", "--recursive", "--settle", "2", "--polling"])
+    
+    assert (args.command, args.directory, args.recursive, args.settle, args.polling) == \
+        ("watch", "/data", True, 2.0, True)